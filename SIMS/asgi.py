@@ -3,6 +3,11 @@ ASGI config for SIMS project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under ASGI the async login and register views (api/async_views.py) hash
+passwords on a bounded thread pool, so the event loop stays free while a
+burst of logins is in progress. The pool is started here so the first
+requests don't pay for it.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
 """
@@ -14,3 +19,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'SIMS.settings')
 
 application = get_asgi_application()
+
+from api.hashing import get_hashing_pool  # noqa: E402
+
+get_hashing_pool()
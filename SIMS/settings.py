@@ -49,7 +49,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
-    "api",
+    "api.apps.ApiConfig",
     "rest_framework.authtoken",
     "corsheaders",
 ]
@@ -60,7 +60,11 @@ ROOT_URLCONF = "SIMS.urls"
 
 # Configure the JWT settings
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(days=10),
+    # Access tokens carry role and profile claims, so keep them short lived;
+    # refreshing reads the claims from the user again
+    "ACCESS_TOKEN_LIFETIME": timedelta(
+        minutes=int(os.getenv("ACCESS_TOKEN_LIFETIME_MINUTES", default=15))
+    ),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=10),
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": True,
@@ -96,6 +100,8 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    # Outermost, so queries made by the other middleware are counted too
+    "api.instrumentation.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -120,7 +126,7 @@ CORS_ORIGIN_WHITELIST = (
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ProfileJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ),
@@ -154,6 +160,34 @@ DATABASES = {
     }
 }
 
+# Pre-rendered list responses shared by every student in a classroom. Set
+# RESPONSE_CACHE_URL to a redis:// URL to share them between processes.
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", default=600))
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "responses": (
+        {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": RESPONSE_CACHE_URL}
+        if RESPONSE_CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "responses",
+        }
+    ),
+}
+
+# Bounded pool that runs password hashing for the async login/register views
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", default=0)) or None
+PASSWORD_HASHING_QUEUE = int(os.getenv("PASSWORD_HASHING_QUEUE", default=64))
+
+# How long authentication trusts a cached "user is active" check, in seconds
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", default=60))
+
+# Run deferred jobs inside the request instead of queueing them for
+# `manage.py run_jobs`
+JOBS_EAGER = bool(int(os.getenv("JOBS_EAGER", default=0)))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -203,11 +237,36 @@ AWS_S3_SECRET_ACCESS_KEY = os.getenv("AWS_S3_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION_NAME")
 AWS_S3_SIGNATURE_VERSION = os.getenv("AWS_S3_SIGNATURE_VERSION", default="s3v4")
+# Point at a local S3-compatible server (MinIO, moto) for development and benchmarks
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", default=10))
 
 # https://docs.aws.amazon.com/AmazonS3/latest/userguide/acl-overview.html#canned-acl
 AWS_DEFAULT_ACL = os.getenv("AWS_DEFAULT_ACL", default="private")
 FILE_MAX_SIZE = int(os.getenv("FILE_MAX_SIZE", default=10485760))  # 10 MiB
+# Larger files go through S3 multipart uploads, in parts of at least 5 MiB
+FILE_MULTIPART_MAX_SIZE = int(
+    os.getenv("FILE_MULTIPART_MAX_SIZE", default=5368709120)
+)  # 5 GiB
+FILE_MULTIPART_PART_SIZE = int(
+    os.getenv("FILE_MULTIPART_PART_SIZE", default=8388608)
+)  # 8 MiB
 AWS_PRESIGNED_EXPIRY = os.getenv("AWS_PRESIGNED_EXPIRY", default=1000)  # seconds
+# Lifetime of the presigned download links in listings, in seconds
+AWS_QUERYSTRING_EXPIRE = int(os.getenv("AWS_QUERYSTRING_EXPIRE", default=3600))
+# Cached download links are only handed out while they have this long left,
+# on top of however long a cached list response may hold them
+DOWNLOAD_URL_MIN_LIFETIME = int(os.getenv("DOWNLOAD_URL_MIN_LIFETIME", default=300))
 
 
 django_heroku.settings(locals())
+
+# django_heroku prepends WhiteNoise's sync-only middleware, which would push
+# every ASGI request through a thread; serve static files from the
+# async-capable subclass instead
+MIDDLEWARE = [
+    "api.middleware.AsyncWhiteNoiseMiddleware"
+    if middleware == "whitenoise.middleware.WhiteNoiseMiddleware"
+    else middleware
+    for middleware in MIDDLEWARE
+]
@@ -0,0 +1,128 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import serializers, status
+
+from .hashing import HashingPoolSaturated, get_hashing_pool
+from .models import User
+from .serializers import AsyncUserLoginSerializer, UserRegistrationSerializer
+from .utils import cookie_details, get_tokens_for_user
+
+# Login and registration for ASGI deployments. Password hashing runs on the
+# bounded hashing pool and the ORM work on Django's sync thread, so the
+# event loop stays free for everything else while a burst of logins lands.
+
+
+def _parse_body(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    return request.POST
+
+
+def _error_response(message, status_code):
+    return JsonResponse({"success": False, "message": message}, status=status_code)
+
+
+def _saturated_response(error):
+    response = _error_response(str(error), status.HTTP_503_SERVICE_UNAVAILABLE)
+    response["Retry-After"] = "1"
+    return response
+
+
+def _auth_response(data, auth_tokens, status_code):
+    data["token"] = auth_tokens["access"]
+    response = JsonResponse(data, status=status_code)
+    response.set_cookie(value=auth_tokens["refresh"], **cookie_details)
+    response["X-Password-Queue-Depth"] = get_hashing_pool().metrics()["queue_depth"]
+    return response
+
+
+def _get_user(email):
+    try:
+        return User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        return None
+
+
+def _complete_login(attrs, user):
+    attrs = AsyncUserLoginSerializer.get_login_attrs(attrs, user)
+    data = {
+        "success": True,
+        "message": "You have logged in successfully",
+        "user": AsyncUserLoginSerializer(attrs).data,
+    }
+    return data, get_tokens_for_user(user)
+
+
+def _complete_registration(serializer, password_hash):
+    user = serializer.save(password_hash=password_hash)
+    data = {
+        "success": True,
+        "message": "Registration complete, welcome to SIMS!",
+        "user": serializer.data,
+    }
+    return data, get_tokens_for_user(user)
+
+
+async def login(request):
+    if request.method != "POST":
+        return _error_response("Method not allowed", status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    serializer = AsyncUserLoginSerializer(data=_parse_body(request))
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    attrs = serializer.validated_data
+
+    user = await sync_to_async(_get_user, thread_sensitive=True)(attrs["email"])
+    try:
+        valid = await get_hashing_pool().check_password(
+            attrs["password"], user.password if user else None
+        )
+    except HashingPoolSaturated as e:
+        return _saturated_response(e)
+    if not valid or not user.is_active:
+        return _error_response(
+            "Email or password is incorrect!", status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        data, auth_tokens = await sync_to_async(
+            _complete_login, thread_sensitive=True
+        )(dict(attrs), user)
+    except serializers.ValidationError as e:
+        return JsonResponse({"detail": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+    return _auth_response(data, auth_tokens, status.HTTP_200_OK)
+
+
+async def register(request):
+    if request.method != "POST":
+        return _error_response("Method not allowed", status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    serializer = UserRegistrationSerializer(data=_parse_body(request))
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        password_hash = await get_hashing_pool().make_password(
+            serializer.validated_data["password"]
+        )
+    except HashingPoolSaturated as e:
+        return _saturated_response(e)
+
+    try:
+        data, auth_tokens = await sync_to_async(
+            _complete_registration, thread_sensitive=True
+        )(serializer, password_hash)
+    except serializers.ValidationError as e:
+        return JsonResponse({"detail": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+    return _auth_response(data, auth_tokens, status.HTTP_201_CREATED)
+
+
+# Token-based endpoints; django.views.decorators.csrf.csrf_exempt would hide
+# the coroutine from Django's async detection, so set the flag directly
+login.csrf_exempt = True
+register.csrf_exempt = True
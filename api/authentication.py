@@ -0,0 +1,64 @@
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Instructor, Student, User
+from .tokens import PROFILE_CLAIM, is_user_active
+
+
+class ProfileTokenUser(TokenUser):
+    """
+    Stateless user built from the profile claims of an access token.
+    `student` and `instructor` are unsaved model instances carrying only
+    their ids, which is all the managers and permissions need to filter.
+    Claims are as fresh as the token, so role changes apply once the
+    short-lived access token is refreshed.
+    """
+
+    @cached_property
+    def is_student(self):
+        return self.token.get("is_student", False)
+
+    @cached_property
+    def is_instructor(self):
+        return self.token.get("is_instructor", False)
+
+    @cached_property
+    def student(self):
+        if self.token.get("student_id") is None:
+            raise User.student.RelatedObjectDoesNotExist("User has no student.")
+        return Student(
+            id=self.token["student_id"],
+            user_id=self.id,
+            classroom_id=self.token["classroom_id"],
+        )
+
+    @cached_property
+    def instructor(self):
+        if self.token.get("instructor_id") is None:
+            raise User.instructor.RelatedObjectDoesNotExist("User has no instructor.")
+        return Instructor(id=self.token["instructor_id"], user_id=self.id)
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """
+    Returns a ProfileTokenUser for tokens carrying profile claims so that
+    authenticated requests need no user lookup, only a cached check that
+    the user is still active. Tokens issued before the claims existed
+    still load the user from the database.
+    """
+
+    def get_user(self, validated_token):
+        if PROFILE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if not is_user_active(validated_token[api_settings.USER_ID_CLAIM]):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return ProfileTokenUser(validated_token)
@@ -1,7 +1,27 @@
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timezone
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import quote, urlencode, urlsplit
+
 from .utils import assert_settings
 from attrs import define
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from django.conf import settings
 import boto3
 
+# Credentials and the client are built once per process and shared by all
+# request threads; boto3 clients are thread-safe but must not cross a fork.
+_s3_lock = threading.Lock()
+_s3_credentials = None
+_s3_client = None
+_s3_client_pid = None
+
 
 @define
 class S3Credentials:
@@ -12,9 +32,10 @@ class S3Credentials:
     default_acl: str
     presigned_expiry: int
     max_size: int
+    endpoint_url: Optional[str] = None
 
 
-def s3_get_credentials() -> S3Credentials:
+def s3_load_credentials() -> S3Credentials:
     required_config = assert_settings(
         [
             "AWS_S3_ACCESS_KEY_ID",
@@ -36,20 +57,66 @@ def s3_get_credentials() -> S3Credentials:
         default_acl=required_config["AWS_DEFAULT_ACL"],
         presigned_expiry=required_config["AWS_PRESIGNED_EXPIRY"],
         max_size=required_config["FILE_MAX_SIZE"],
+        endpoint_url=getattr(settings, "AWS_S3_ENDPOINT_URL", None),
     )
 
 
-def s3_get_client():
-    credentials = s3_get_credentials()
+def s3_get_credentials() -> S3Credentials:
+    global _s3_credentials
+
+    credentials = _s3_credentials
+    if credentials is None:
+        with _s3_lock:
+            if _s3_credentials is None:
+                _s3_credentials = s3_load_credentials()
+            credentials = _s3_credentials
+    return credentials
+
+
+def s3_max_pool_connections() -> int:
+    return getattr(settings, "AWS_S3_MAX_POOL_CONNECTIONS", 10)
 
-    return boto3.client(
+
+def s3_create_client(credentials: S3Credentials):
+    return boto3.session.Session().client(
         service_name="s3",
         aws_access_key_id=credentials.access_key_id,
         aws_secret_access_key=credentials.secret_access_key,
         region_name=credentials.region_name,
+        endpoint_url=credentials.endpoint_url,
+        config=Config(max_pool_connections=s3_max_pool_connections()),
     )
 
 
+def s3_get_client():
+    global _s3_client, _s3_client_pid
+
+    pid = os.getpid()
+    client = _s3_client
+    if client is None or _s3_client_pid != pid:
+        credentials = s3_get_credentials()
+        with _s3_lock:
+            if _s3_client is None or _s3_client_pid != pid:
+                _s3_client = s3_create_client(credentials)
+                _s3_client_pid = pid
+            client = _s3_client
+    return client
+
+
+def s3_reset_client():
+    """
+    Drops the cached credentials and client so the next call rebuilds them.
+    Call after rotating credentials or changing S3 settings (tests do this
+    automatically through the setting_changed signal).
+    """
+    global _s3_credentials, _s3_client, _s3_client_pid
+
+    with _s3_lock:
+        _s3_credentials = None
+        _s3_client = None
+        _s3_client_pid = None
+
+
 def s3_generate_presigned_post(file_path, file_type):
     credentials = s3_get_credentials()
     s3_client = s3_get_client()
@@ -70,3 +137,183 @@ def s3_generate_presigned_post(file_path, file_type):
     )
 
     return presigned_data
+
+
+def s3_create_multipart_upload(file_path, file_type):
+    credentials = s3_get_credentials()
+    s3_client = s3_get_client()
+
+    response = s3_client.create_multipart_upload(
+        Bucket=credentials.bucket_name,
+        Key=file_path,
+        ACL=credentials.default_acl,
+        ContentType=file_type,
+    )
+
+    return response["UploadId"]
+
+
+def s3_generate_presigned_part_urls(file_path, upload_id, part_count):
+    credentials = s3_get_credentials()
+    s3_client = s3_get_client()
+
+    expires_in = int(credentials.presigned_expiry)
+
+    return [
+        {
+            "part_number": part_number,
+            "url": s3_client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": credentials.bucket_name,
+                    "Key": file_path,
+                    "UploadId": upload_id,
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=expires_in,
+            ),
+        }
+        for part_number in range(1, part_count + 1)
+    ]
+
+
+def s3_complete_multipart_upload(file_path, upload_id, parts):
+    credentials = s3_get_credentials()
+    s3_client = s3_get_client()
+
+    s3_client.complete_multipart_upload(
+        Bucket=credentials.bucket_name,
+        Key=file_path,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                for part in sorted(parts, key=lambda part: part["part_number"])
+            ]
+        },
+    )
+
+
+def s3_abort_multipart_upload(file_path, upload_id):
+    credentials = s3_get_credentials()
+    s3_client = s3_get_client()
+
+    try:
+        s3_client.abort_multipart_upload(
+            Bucket=credentials.bucket_name, Key=file_path, UploadId=upload_id
+        )
+    except s3_client.exceptions.NoSuchUpload:
+        # Already completed, aborted or expired by a lifecycle rule
+        pass
+
+
+def s3_list_multipart_uploads(prefix):
+    credentials = s3_get_credentials()
+    s3_client = s3_get_client()
+
+    paginator = s3_client.get_paginator("list_multipart_uploads")
+    for page in paginator.paginate(Bucket=credentials.bucket_name, Prefix=prefix):
+        yield from page.get("Uploads", [])
+
+
+def s3_head_object(file_path):
+    """The object's metadata, or None if there is no such object."""
+    credentials = s3_get_credentials()
+    s3_client = s3_get_client()
+
+    try:
+        return s3_client.head_object(
+            Bucket=credentials.bucket_name, Key=file_path, ChecksumMode="ENABLED"
+        )
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def s3_head_objects(file_paths):
+    """
+    HEADs every object in `file_paths` concurrently over the shared client,
+    never more at once than it has pooled connections. Returns a dict of
+    file path to `s3_head_object`'s result, or to the exception raised
+    for that object, so one failure doesn't lose the other answers.
+    """
+    file_paths = list(dict.fromkeys(file_paths))
+
+    def head(file_path):
+        try:
+            return s3_head_object(file_path)
+        except Exception as e:
+            return e
+
+    workers = min(s3_max_pool_connections(), len(file_paths)) or 1
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3") as pool:
+        return dict(zip(file_paths, pool.map(head, file_paths)))
+
+
+@lru_cache(maxsize=8)
+def s3_signing_key(secret_access_key, region_name, date_stamp):
+    """The SigV4 key for S3 requests signed on `date_stamp` (YYYYMMDD)."""
+    key = f"AWS4{secret_access_key}".encode()
+    for part in (date_stamp, region_name, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return key
+
+
+def s3_object_url_base(credentials: S3Credentials):
+    """The scheme, host and path prefix the bucket's objects are addressed by."""
+    bucket = credentials.bucket_name
+    if credentials.endpoint_url:
+        endpoint = urlsplit(credentials.endpoint_url)
+        prefix = f"{endpoint.path.rstrip('/')}/{bucket}/"
+        return endpoint.scheme, endpoint.netloc, prefix
+    host = f"s3.{credentials.region_name}.amazonaws.com"
+    if "." in bucket:
+        # Dotted names don't match the wildcard certificate as a subdomain
+        return "https", host, f"/{bucket}/"
+    return "https", f"{bucket}.{host}", "/"
+
+
+def s3_generate_presigned_get_urls(file_paths, signed_at, expires_in):
+    """
+    Presigned GET URLs for many objects at once, by file path, valid for
+    `expires_in` seconds from `signed_at` (an aware datetime). Signs with
+    SigV4 query auth directly: the signing key and the query string are
+    derived once for the batch, leaving two hashes per URL where botocore's
+    generate_presigned_url builds and signs a whole request each time.
+    """
+    credentials = s3_get_credentials()
+    scheme, host, prefix = s3_object_url_base(credentials)
+
+    amz_date = signed_at.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    scope = f"{amz_date[:8]}/{credentials.region_name}/s3/aws4_request"
+    # Already in the sorted order SigV4 canonicalises it to
+    query = urlencode(
+        {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{credentials.access_key_id}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(int(expires_in)),
+            "X-Amz-SignedHeaders": "host",
+        },
+        quote_via=quote,
+    )
+    signing_key = s3_signing_key(
+        credentials.secret_access_key, credentials.region_name, amz_date[:8]
+    )
+
+    urls = {}
+    for file_path in file_paths:
+        path = prefix + quote(file_path, safe="/~")
+        canonical_request = (
+            f"GET\n{path}\n{query}\nhost:{host}\n\nhost\nUNSIGNED-PAYLOAD"
+        )
+        string_to_sign = (
+            f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n"
+            f"{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+        )
+        signature = hmac.new(
+            signing_key, string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+        urls[file_path] = f"{scheme}://{host}{path}?{query}&X-Amz-Signature={signature}"
+    return urls
@@ -0,0 +1,129 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.renderers import JSONRenderer
+
+
+class ClassroomResponseCache:
+    """
+    Pre-rendered list responses shared by every student in a classroom.
+
+    Entries are keyed by the classroom's current version number, which the
+    Assignment/CourseMaterial signals bump on every change. Old entries
+    are never deleted, they just stop being looked up and expire. The
+    version is read before the response is built, so a change made while
+    building it leaves the entry under a version nobody asks for again.
+    """
+
+    alias = "responses"
+    # Headers replayed on a hit, along with the rendered body; list
+    # responses are validated by ETag alone (see ResourceVersion)
+    stored_headers = ("ETag",)
+
+    _lock = threading.Lock()
+    _counts = {}
+
+    def __init__(self, resource):
+        self.resource = resource
+
+    @property
+    def timeout(self):
+        return settings.RESPONSE_CACHE_TIMEOUT
+
+    @classmethod
+    def get_cache(cls):
+        return caches[cls.alias]
+
+    @staticmethod
+    def version_key(classroom_id):
+        return f"responses:classroom:{classroom_id}:version"
+
+    @classmethod
+    def get_version(cls, classroom_id):
+        cache = cls.get_cache()
+        key = cls.version_key(classroom_id)
+        version = cache.get(key)
+        if version is None:
+            # Seeded from the clock, so an evicted version can't come back
+            # as a number older entries were stored under
+            cache.add(key, time.time_ns() // 1000, timeout=None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def bump(cls, classroom_ids):
+        """
+        Moves the classrooms on to a new version now, and again once the
+        surrounding transaction commits, so a response built from rows read
+        before the commit can't be stored under the final version.
+        """
+        classroom_ids = set(classroom_ids)
+        cls._incr_versions(classroom_ids)
+        transaction.on_commit(lambda: cls._incr_versions(classroom_ids))
+
+    @classmethod
+    def _incr_versions(cls, classroom_ids):
+        cache = cls.get_cache()
+        for classroom_id in classroom_ids:
+            if classroom_id is None:
+                continue
+            try:
+                cache.incr(cls.version_key(classroom_id))
+            except ValueError:
+                # Nothing cached for this classroom yet
+                pass
+
+    def get_key(self, request, classroom_id):
+        version = self.get_version(classroom_id)
+        params = sorted(request.query_params.lists())
+        digest = hashlib.md5(repr(params).encode()).hexdigest()
+        return f"responses:{self.resource}:classroom:{classroom_id}:{version}:{digest}"
+
+    def get_response(self, request, key):
+        """The cached response for `key`, a 304 if it is still fresh, or None."""
+        entry = self.get_cache().get(key)
+        self._count("hits" if entry is not None else "misses")
+        if entry is None:
+            return None
+
+        headers, body = entry
+        response = get_conditional_response(request, etag=headers.get("ETag"))
+        if response is None:
+            response = HttpResponse(body, content_type="application/json")
+        for header, value in headers.items():
+            response[header] = value
+        patch_cache_control(response, private=True, no_cache=True)
+        response["X-Cache"] = "HIT"
+        return response
+
+    def set_response(self, key, response):
+        headers = {
+            header: response[header]
+            for header in self.stored_headers
+            if response.has_header(header)
+        }
+        body = JSONRenderer().render(response.data)
+        self.get_cache().set(key, (headers, body), self.timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def _count(self, outcome):
+        with self._lock:
+            counts = self._counts.setdefault(self.resource, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    @classmethod
+    def metrics(cls):
+        """Hit/miss counts for this process, per resource."""
+        with cls._lock:
+            counts = {resource: dict(c) for resource, c in cls._counts.items()}
+        for c in counts.values():
+            lookups = c["hits"] + c["misses"]
+            c["hit_ratio"] = round(c["hits"] / lookups, 3) if lookups else 0
+        return counts
@@ -0,0 +1,139 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+# Characters XML 1.0 cannot carry, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Characters Excel refuses in sheet names
+_SHEET_NAME_ILLEGAL = re.compile(r"[\[\]:*?/\\]")
+# Leading characters spreadsheet apps take as the start of a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/'
+    'package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={name} sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/'
+    'package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+_XLSX_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+class _Echo:
+    """A write-only file that hands back what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+class _ChunkBuffer:
+    """An unseekable file that collects writes until they are drained."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _text(value):
+    """
+    `value` as cell text. Text that would start a formula, such as a name
+    entered as =HYPERLINK(...), is quoted so it is shown, not evaluated.
+    """
+    text = str(value)
+    if text.startswith(_FORMULA_PREFIXES):
+        return f"'{text}"
+    return text
+
+
+def stream_csv(rows):
+    """Yields `rows` as CSV lines, one row at a time."""
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(
+            [_text(value) if isinstance(value, str) else value for value in row]
+        )
+
+
+def _xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value!r}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", _text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(rows, sheet_name="Sheet1", rows_per_chunk=100):
+    """
+    Yields a single-sheet XLSX workbook holding `rows`. Strings are written
+    inline and the zip is built on an unseekable buffer, so nothing but the
+    current chunk of rows is ever held in memory.
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        workbook.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        workbook.writestr(
+            "xl/workbook.xml",
+            _XLSX_WORKBOOK.format(
+                # Excel also caps sheet names at 31 characters
+                name=quoteattr(_SHEET_NAME_ILLEGAL.sub(" ", sheet_name)[:31])
+            ),
+        )
+        workbook.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        yield buffer.drain()
+
+        with workbook.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(_XLSX_SHEET_HEAD.encode())
+            for i, row in enumerate(rows, start=1):
+                cells = "".join(_xlsx_cell(value) for value in row)
+                sheet.write(f"<row>{cells}</row>".encode())
+                if i % rows_per_chunk == 0:
+                    yield buffer.drain()
+            sheet.write(_XLSX_SHEET_TAIL.encode())
+    yield buffer.drain()
@@ -0,0 +1,158 @@
+import importlib
+import pkgutil
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Fixture:
+    """
+    Static rows for one model, declared by a module-level `obj` dict:
+
+        obj = dict(model=ClassRoom, data=[dict(name="CPE 100L"), ...])
+
+    Rows are matched to existing ones on `unique_fields`, which defaults to
+    the model's single unique field (other than the primary key).
+    """
+
+    def __init__(self, name, model, data, unique_fields=None):
+        self.name = name
+        self.model = model
+        self.data = data
+        self.unique_fields = tuple(unique_fields or self._default_unique_fields())
+
+    @classmethod
+    def from_module(cls, module):
+        declaration = getattr(module, "obj", None)
+        if declaration is None:
+            return None
+        name = module.__name__.rsplit(".", 1)[-1]
+        try:
+            return cls(
+                name,
+                declaration["model"],
+                declaration["data"],
+                declaration.get("unique_fields"),
+            )
+        except KeyError as e:
+            raise ImproperlyConfigured(f"Fixture {name} is missing {e}")
+
+    def _is_model(self):
+        return isinstance(self.model, type) and issubclass(self.model, models.Model)
+
+    def _default_unique_fields(self):
+        if not self._is_model():
+            return ()
+        unique = [
+            field.attname
+            for field in self.model._meta.concrete_fields
+            if field.unique and not field.primary_key
+        ]
+        return unique[:1]
+
+    def validate(self):
+        """Raises ImproperlyConfigured listing everything wrong with the fixture."""
+        if not self._is_model():
+            raise ImproperlyConfigured(f"Fixture {self.name}: model is not a model")
+        if not isinstance(self.data, (list, tuple)):
+            raise ImproperlyConfigured(f"Fixture {self.name}: data is not a list")
+        if not self.unique_fields:
+            raise ImproperlyConfigured(
+                f"Fixture {self.name}: {self.model.__name__} has no unique field to "
+                "match rows on, set unique_fields"
+            )
+
+        fields = {field.attname for field in self.model._meta.concrete_fields}
+        fields |= {field.name for field in self.model._meta.concrete_fields}
+        errors = []
+        unknown = set(self.unique_fields) - fields
+        if unknown:
+            errors.append(f"unknown unique_fields {', '.join(sorted(unknown))}")
+        seen = set()
+        for i, row in enumerate(self.data):
+            if not isinstance(row, dict):
+                errors.append(f"row {i} is not a dict")
+                continue
+            unknown = set(row) - fields
+            if unknown:
+                errors.append(f"row {i} has unknown {', '.join(sorted(unknown))}")
+            missing = [field for field in self.unique_fields if field not in row]
+            if missing:
+                errors.append(f"row {i} is missing {', '.join(missing)}")
+                continue
+            key = self.key(row)
+            if key in seen:
+                errors.append(f"row {i} repeats {key}")
+            seen.add(key)
+        if errors:
+            raise ImproperlyConfigured(f"Fixture {self.name}: {'; '.join(errors)}")
+
+    def key(self, row):
+        return tuple(row[field] for field in self.unique_fields)
+
+    def existing(self):
+        """Rows already in the table for this fixture, by key."""
+        if not self.data:
+            return {}
+        if len(self.unique_fields) == 1:
+            (field,) = self.unique_fields
+            lookup = Q(**{f"{field}__in": [row[field] for row in self.data]})
+        else:
+            rows = (zip(self.unique_fields, self.key(row)) for row in self.data)
+            lookup = reduce(or_, (Q(**dict(row)) for row in rows))
+        return {
+            tuple(getattr(instance, field) for field in self.unique_fields): instance
+            for instance in self.model.objects.filter(lookup)
+        }
+
+    def upsert(self):
+        """
+        Creates the missing rows and updates the changed ones in bulk:
+        one select, then at most one insert and one update however often
+        the fixture is loaded. Returns (created, updated, unchanged).
+        """
+        existing = self.existing()
+        new, changed, fields = [], [], set()
+        for row in self.data:
+            instance = existing.get(self.key(row))
+            if instance is None:
+                new.append(self.model(**row))
+                continue
+            differs = [
+                name for name, value in row.items() if getattr(instance, name) != value
+            ]
+            if differs:
+                for name in differs:
+                    setattr(instance, name, row[name])
+                changed.append(instance)
+                fields.update(differs)
+
+        with transaction.atomic():
+            # A conflict means a concurrent load already inserted that row
+            self.model.objects.bulk_create(new, ignore_conflicts=True)
+            if changed:
+                if hasattr(self.model, "modified_date"):
+                    now = timezone.now()
+                    for instance in changed:
+                        instance.modified_date = now
+                    fields.add("modified_date")
+                self.model.objects.bulk_update(changed, sorted(fields))
+        return len(new), len(changed), len(self.data) - len(new) - len(changed)
+
+
+def discover_fixtures(package):
+    """Every module of `package` declaring a fixture, validated, by module name."""
+    fixtures = []
+    for module_info in sorted(pkgutil.iter_modules(package.__path__)):
+        if module_info.ispkg:
+            continue
+        module = importlib.import_module(f"{package.__name__}.{module_info.name}")
+        fixture = Fixture.from_module(module)
+        if fixture is not None:
+            fixture.validate()
+            fixtures.append(fixture)
+    return fixtures
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashingPoolSaturated(Exception):
+    pass
+
+
+class PasswordHashingPool:
+    """
+    Bounded thread pool for PBKDF2 work coming from async views. hashlib
+    releases the GIL while hashing, so the event loop keeps serving cheap
+    requests and hashing uses every core. Once `max_workers + max_queue`
+    jobs are pending new ones are rejected instead of queueing forever.
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hashing"
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HashingPoolSaturated("Too many logins in progress, retry shortly")
+            self._pending += 1
+
+    def _release(self, elapsed):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._busy_seconds += elapsed
+
+    async def run(self, fn, *args):
+        self._acquire()
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+        finally:
+            self._release(time.perf_counter() - started)
+
+    async def make_password(self, password):
+        return await self.run(hashers.make_password, password)
+
+    async def check_password(self, password, encoded):
+        if encoded is None:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            await self.make_password(password)
+            return False
+        return await self.run(hashers.check_password, password, encoded)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "in_flight": min(self._pending, self.max_workers),
+                "queue_depth": max(0, self._pending - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "busy_seconds": round(self._busy_seconds, 3),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHashingPool(
+                    max_workers=getattr(settings, "PASSWORD_HASHING_WORKERS", None)
+                    or os.cpu_count(),
+                    max_queue=getattr(settings, "PASSWORD_HASHING_QUEUE", 64),
+                )
+    return _pool
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+
+
+def sql_shape(sql):
+    """
+    `sql` with its literals and IN lists replaced by placeholders, so the
+    same query run for different rows has the same shape.
+    """
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _PLACEHOLDER_LIST.sub("(...)", sql)
+
+
+class QueryRecorder:
+    """
+    A database execute wrapper recording how many statements ran, how long
+    they took and which one was slowest. Works with DEBUG off.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = None
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            self.shapes[sql_shape(sql)] += 1
+            if duration >= self.slowest_duration:
+                self.slowest_duration = duration
+                self.slowest_sql = sql
+
+    @property
+    def most_repeated(self):
+        """(shape, times) of the statement run most often."""
+        if not self.shapes:
+            return None, 0
+        return self.shapes.most_common(1)[0]
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"',
+                f"db-slowest;dur={self.slowest_duration * 1000:.1f}",
+            ]
+        )
+
+
+# The recorder of the async request being served. Its views run their
+# queries on Django's sync thread, which inherits this from the request.
+_current_recorder = ContextVar("query_recorder", default=None)
+
+
+def record_current_request(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection, feeding the recorder of
+    the async request the query runs for, if any.
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_request_recorder(connection):
+    if record_current_request not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_current_request)
+
+
+@sync_and_async_middleware
+class QueryInstrumentationMiddleware:
+    """
+    Records the SQL each request runs, reports it to the client in a
+    Server-Timing header and logs one JSON line per request. Queries a
+    streaming response runs after the view returns are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function, as MiddlewareMixin
+            # does, so the handler awaits it without a thread hop
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        response["Server-Timing"] = recorder.server_timing()
+        _, repeats = recorder.most_repeated
+        logger.info(
+            json.dumps(
+                {
+                    "event": "sql",
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "queries": recorder.count,
+                    "db_ms": round(recorder.duration * 1000, 1),
+                    "slowest_ms": round(recorder.slowest_duration * 1000, 1),
+                    "slowest_sql": recorder.slowest_sql,
+                    "most_repeated": repeats,
+                }
+            )
+        )
+        return response
@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Retry n waits RETRY_BASE_DELAY * 2 ** (n - 1), jittered, up to RETRY_MAX_DELAY
+RETRY_BASE_DELAY = timedelta(seconds=10)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+_tasks = {}
+
+
+def task(fn=None, *, max_attempts=5):
+    """
+    Registers `fn` as a job that `defer` can queue. Jobs find their
+    function again by its dotted path, so tasks must live at module level.
+    """
+
+    def register(fn):
+        fn.job_name = f"{fn.__module__}.{fn.__qualname__}"
+        fn.max_attempts = max_attempts
+        _tasks[fn.job_name] = fn
+        return fn
+
+    return register(fn) if fn is not None else register
+
+
+def get_task(name):
+    fn = _tasks.get(name)
+    if fn is None:
+        # The worker may not have imported the task's module yet
+        fn = import_string(name)
+    if getattr(fn, "job_name", None) != name:
+        raise ImportError(f"{name} is not a registered task")
+    return fn
+
+
+def defer(fn, *args, delay=None):
+    """
+    Queues the task `fn(*args)` for a worker. The Job is written in the
+    caller's transaction, so it only runs if that commits. `args` must be
+    JSON serialisable. With JOBS_EAGER the task runs right away instead.
+    """
+    if settings.JOBS_EAGER:
+        fn(*args)
+        return None
+    return Job.objects.create(
+        name=fn.job_name,
+        args=list(args),
+        max_attempts=fn.max_attempts,
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return delay * random.uniform(0.5, 1)
+
+
+def claim(worker, limit=1):
+    """
+    Marks up to `limit` due jobs RUNNING for `worker` and returns them.
+    Postgres skips rows other workers have locked, so concurrent claims
+    never wait on each other. SQLite has no row locks but runs one write
+    at a time, so a conditional UPDATE per job lets only one worker win it.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_after__lte=now).order_by(
+        "run_after"
+    )
+    running = dict(
+        status=Job.Status.RUNNING,
+        locked_by=worker,
+        started_at=now,
+        attempts=F("attempts") + 1,
+        modified_date=now,
+    )
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            locked = due.select_for_update(skip_locked=True)
+            ids = list(locked.values_list("id", flat=True)[:limit])
+            Job.objects.filter(pk__in=ids).update(**running)
+    else:
+        ids = [
+            pk
+            for pk in due.values_list("id", flat=True)[:limit]
+            if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(**running)
+        ]
+    if not ids:
+        return []
+    return list(Job.objects.filter(pk__in=ids).order_by("run_after"))
+
+
+def run_job(job):
+    """
+    Runs a claimed job and records the outcome: SUCCEEDED, QUEUED again
+    after a backoff while attempts remain, or FAILED. Returns the status
+    and how long the job ran for.
+    """
+    started = time.perf_counter()
+    error = ""
+    try:
+        get_task(job.name)(*job.args)
+    except Exception:
+        error = traceback.format_exc()
+    duration = time.perf_counter() - started
+
+    now = timezone.now()
+    outcome = dict(duration=duration, last_error=error, modified_date=now)
+    if not error:
+        outcome.update(status=Job.Status.SUCCEEDED, finished_at=now)
+    elif job.attempts < job.max_attempts:
+        outcome.update(
+            status=Job.Status.QUEUED, run_after=now + retry_delay(job.attempts)
+        )
+    else:
+        outcome.update(status=Job.Status.FAILED, finished_at=now)
+    # Skipped if the job was requeued as stale and claimed by someone else
+    Job.objects.filter(
+        pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by
+    ).update(**outcome)
+
+    logger.info(
+        json.dumps(
+            {
+                "event": "job",
+                "id": job.pk,
+                "name": job.name,
+                "status": outcome["status"],
+                "attempt": job.attempts,
+                "wait_ms": round(
+                    (job.started_at - job.run_after).total_seconds() * 1000, 1
+                ),
+                "duration_ms": round(duration * 1000, 1),
+            }
+        )
+    )
+    if error:
+        logger.warning("Job %s (%s) failed:\n%s", job.pk, job.name, error)
+    return outcome["status"], duration
+
+
+def requeue_stale(older_than):
+    """
+    Puts jobs RUNNING since before `older_than`, whose worker died, back
+    in the queue, or fails them if they are out of attempts. Returns how
+    many were requeued.
+    """
+    stale = Job.objects.filter(status=Job.Status.RUNNING, started_at__lt=older_than)
+    now = timezone.now()
+    stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED,
+        finished_at=now,
+        last_error="Worker stopped while running the job",
+        modified_date=now,
+    )
+    return stale.update(
+        status=Job.Status.QUEUED, locked_by="", run_after=now, modified_date=now
+    )
+
+
+class Worker:
+    """
+    Claims up to `threads` jobs at a time and runs them on a thread pool,
+    polling every `poll_interval` seconds while the queue is empty.
+    Keeps per-task counts and timings in `metrics()`.
+    """
+
+    def __init__(self, threads=1, poll_interval=1.0, stale_after=600, name=None):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.stale_after = timedelta(seconds=stale_after)
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self._outcomes = Counter()
+        self._durations = defaultdict(list)
+
+    def _run(self, job):
+        close_old_connections()
+        try:
+            return job, *run_job(job)
+        finally:
+            close_old_connections()
+
+    def run(self, burst=False):
+        """Works until `stop()`, or until the queue is empty with `burst`."""
+        # A single thread runs jobs itself rather than handing them to a pool
+        executor = (
+            ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="jobs")
+            if self.threads > 1
+            else None
+        )
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                requeue_stale(timezone.now() - self.stale_after)
+                jobs = claim(self.name, limit=self.threads)
+                if not jobs:
+                    if burst:
+                        return
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                results = (executor.map if executor else map)(self._run, jobs)
+                for job, status, duration in results:
+                    self._outcomes[status] += 1
+                    self._durations[job.name].append(duration)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def stop(self):
+        self.stopping.set()
+
+    def metrics(self):
+        return {
+            "worker": self.name,
+            "outcomes": dict(self._outcomes),
+            "tasks": {
+                name: {
+                    "runs": len(durations),
+                    "mean_ms": round(sum(durations) / len(durations) * 1000, 1),
+                    "max_ms": round(max(durations) * 1000, 1),
+                }
+                for name, durations in self._durations.items()
+            },
+        }
@@ -0,0 +1,139 @@
+import statistics
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from rest_framework import serializers
+
+from api.aws_integrations import s3_reset_client
+from api.downloads import DownloadUrlService
+from api.models import ClassRoom, CourseMaterial, Instructor, User
+from api.serializers import CourseMaterialSerializer
+from api.utils import get_tokens_for_user
+from api.views import CourseMaterialsListView
+
+
+class StorageUrlCourseMaterialSerializer(CourseMaterialSerializer):
+    """How listings rendered before: S3Boto3Storage.url() signs every row."""
+
+    file = serializers.FileField()
+
+    class Meta(CourseMaterialSerializer.Meta):
+        list_serializer_class = serializers.ListSerializer
+
+
+def _summarise(timings):
+    timings = sorted(timings)
+    return {
+        "p50": timings[len(timings) // 2] * 1000,
+        "p95": timings[max(0, int(len(timings) * 0.95) - 1)] * 1000,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "time an instructor's full course material listing against the number "
+        "of materials, signing each download URL through the storage backend, "
+        "in bulk, and from the URL cache"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--counts", default="50,100,250,500,1000")
+        parser.add_argument("--requests", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument(
+            "--endpoint-url",
+            default=getattr(settings, "AWS_S3_ENDPOINT_URL", None)
+            or "http://127.0.0.1:9000",
+            help="S3-compatible stand-in; signing never calls it",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        counts = [int(count) for count in options["counts"].split(",")]
+        stand_in = dict(
+            AWS_S3_ENDPOINT_URL=options["endpoint_url"],
+            AWS_S3_ACCESS_KEY_ID=settings.AWS_S3_ACCESS_KEY_ID or "benchmark",
+            AWS_S3_SECRET_ACCESS_KEY=settings.AWS_S3_SECRET_ACCESS_KEY or "benchmark",
+            AWS_S3_REGION_NAME=settings.AWS_S3_REGION_NAME or "us-east-1",
+            AWS_STORAGE_BUCKET_NAME=settings.AWS_STORAGE_BUCKET_NAME or "benchmark",
+        )
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(**stand_in):
+                self.stdout.write(
+                    f"{'materials':>10}{'storage p50':>13}{'bulk p50':>10}"
+                    f"{'cached p50':>12}{'cached p95':>12}{'speedup':>9}"
+                )
+                for count in counts:
+                    self.report(count, self.measure_count(count))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            s3_reset_client()
+
+    def measure_count(self, count):
+        user = User.objects.create_user(
+            email=f"benchmark-{count}@example.com", is_instructor=True
+        )
+        Instructor.objects.create(user=user)
+        classroom, _ = ClassRoom.objects.get_or_create(name="BENCHMARK")
+        CourseMaterial.objects.bulk_create(
+            CourseMaterial(
+                original_file_name=f"Material {i}.pdf",
+                file_name=f"benchmark/{count}/{i}.pdf",
+                file=f"file/benchmark/{count}/{i}.pdf",
+                file_type="application/pdf",
+                uploaded_by=user,
+                classroom=classroom,
+                verification=CourseMaterial.Verification.VERIFIED,
+            )
+            for i in range(count)
+        )
+        client = Client()
+        client.defaults["HTTP_AUTHORIZATION"] = (
+            f"Token {get_tokens_for_user(user)['access']}"
+        )
+
+        cache = DownloadUrlService.get_cache()
+        with mock.patch.object(
+            CourseMaterialsListView,
+            "serializer_class",
+            StorageUrlCourseMaterialSerializer,
+        ):
+            storage = self._time(client, count)
+        bulk = self._time(client, count, before=cache.clear)
+        cached = self._time(client, count)
+        return {"storage": storage, "bulk": bulk, "cached": cached}
+
+    def _time(self, client, count, before=None):
+        """Times listing every material in one streamed response."""
+        timings = []
+        warmup = self.options["warmup"]
+        for i in range(self.options["requests"] + warmup):
+            if before is not None:
+                before()
+            started = time.perf_counter()
+            response = client.get("/api/v1/course-materials", {"stream": "1"})
+            body = b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200 or body.count(b"X-Amz-Signature") != count:
+                raise RuntimeError(f"unexpected listing response: {body[:200]!r}")
+            if i >= warmup:
+                timings.append(elapsed)
+        return timings
+
+    def report(self, count, timings):
+        storage, bulk, cached = (
+            _summarise(timings[mode]) for mode in ("storage", "bulk", "cached")
+        )
+        speedup = statistics.median(timings["storage"]) / statistics.median(
+            timings["cached"]
+        )
+        self.stdout.write(
+            f"{count:>10}{storage['p50']:>11.1f}ms{bulk['p50']:>8.1f}ms"
+            f"{cached['p50']:>10.1f}ms{cached['p95']:>10.1f}ms{speedup:>8.1f}x"
+        )
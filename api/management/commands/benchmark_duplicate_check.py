@@ -0,0 +1,106 @@
+import statistics
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Assignment, ClassRoom, Instructor, Student, Submission, User
+from api.utils import submission_content_digest
+
+
+class Command(BaseCommand):
+    help = "compare the full-content duplicate check against the indexed digest lookup"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--assignments", type=int, default=200)
+        parser.add_argument("--lookups", type=int, default=50)
+
+    def handle(self, *args, **options):
+        # Everything is seeded inside a transaction that is rolled back, so
+        # the benchmark leaves the database as it found it
+        with transaction.atomic():
+            sample = self._seed(options["rows"], options["assignments"])
+            self.stdout.write(f"seeded {options['rows']} submissions")
+
+            lookups = options["lookups"]
+            before = self._measure(
+                lambda s: Submission.objects.filter(content=s.content).first(),
+                sample,
+                lookups,
+            )
+            after = self._measure(
+                lambda s: Submission.objects.filter(
+                    assignment_id=s.assignment_id,
+                    content_digest=submission_content_digest(s.content),
+                    status=Submission.Status.SUBMITTED,
+                ).exists(),
+                sample,
+                lookups,
+            )
+            transaction.set_rollback(True)
+
+        for label, timings in (("content scan", before), ("digest index", after)):
+            timings = sorted(timings)
+            self.stdout.write(
+                f"{label:>12}: mean {statistics.mean(timings) * 1000:.3f}ms "
+                f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.3f}ms"
+            )
+
+    def _seed(self, rows, assignment_count):
+        classroom = ClassRoom.objects.create(name="BENCH 000L")
+        password = make_password(None)
+        instructor = Instructor.objects.create(
+            user=User.objects.create(
+                email="bench-instructor@example.com", password=password
+            )
+        )
+        student = Student.objects.create(
+            user=User.objects.create(email="bench-student@example.com", password=password),
+            classroom=classroom,
+        )
+        Assignment.objects.bulk_create(
+            Assignment(
+                question=f"Benchmark question {i}",
+                course="BENCH",
+                instructor=instructor,
+                classroom=classroom,
+                marks=10,
+            )
+            for i in range(assignment_count)
+        )
+        assignment_ids = list(
+            Assignment.objects.filter(classroom=classroom).values_list("id", flat=True)
+        )
+
+        batch = []
+        for i in range(rows):
+            # Essay-sized bodies that only differ at the end, like real answers
+            content = f"{'lorem ipsum dolor sit amet ' * 60}answer {i}"
+            batch.append(
+                Submission(
+                    title=f"Answer {i}",
+                    content=content,
+                    content_digest=submission_content_digest(content),
+                    assignment_id=assignment_ids[i % len(assignment_ids)],
+                    student=student,
+                    instructor=instructor,
+                    classroom=classroom,
+                )
+            )
+            if len(batch) == 5000:
+                Submission.objects.bulk_create(batch)
+                batch = []
+        Submission.objects.bulk_create(batch)
+
+        return list(Submission.objects.filter(classroom=classroom).order_by("?")[:50])
+
+    def _measure(self, lookup, sample, lookups):
+        timings = []
+        for i in range(lookups):
+            submission = sample[i % len(sample)]
+            started = time.perf_counter()
+            lookup(submission)
+            timings.append(time.perf_counter() - started)
+        return timings
@@ -0,0 +1,382 @@
+import contextlib
+import io
+import json
+import platform
+import re
+import statistics
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.utils import timezone
+
+from api.caching import ClassroomResponseCache
+from api.models import Assignment, ClassRoom, Instructor, Student, Submission, User
+from api.seeding import SEED_PASSWORD, DatasetSeeder
+from api.utils import get_tokens_for_user
+
+QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+# Dataset presets for --scale. "large" is the production-sized dataset
+# generate_data builds; "small" seeds in seconds for a quick comparison.
+SCALES = {
+    "small": dict(
+        classrooms=20,
+        students=2000,
+        instructors=40,
+        assignments_per_classroom=20,
+        materials_per_classroom=5,
+        submissions=32000,
+    ),
+    "large": dict(
+        classrooms=200,
+        students=25000,
+        instructors=400,
+        assignments_per_classroom=50,
+        materials_per_classroom=10,
+        submissions=1000000,
+    ),
+}
+
+
+def percentile(timings, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return timings[max(0, min(len(timings), round(len(timings) * fraction)) - 1)]
+
+
+def summarise(timings, queries, errors):
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "mean_ms": round(statistics.mean(timings) * 1000, 2),
+        "p50_ms": round(percentile(timings, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(timings, 0.99) * 1000, 2),
+        "queries_mean": round(statistics.mean(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+def get(client, path):
+    return lambda: client.get(path)
+
+
+def post(client, path, data):
+    return lambda: client.post(path, data, content_type="application/json")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "seed a large dataset in a separate database and record p50/p95/p99 "
+        "latency and queries per request for the main endpoints as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            choices=sorted(SCALES),
+            default="large",
+            help="dataset preset; the options below override single values",
+        )
+        parser.add_argument("--classrooms", type=int)
+        parser.add_argument("--students", type=int)
+        parser.add_argument("--instructors", type=int)
+        parser.add_argument("--assignments-per-classroom", type=int)
+        parser.add_argument("--materials-per-classroom", type=int)
+        parser.add_argument(
+            "--submissions", type=int, help="roughly how many submissions to seed"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument(
+            "--login-requests",
+            type=int,
+            default=20,
+            help="logins are dominated by password hashing, so fewer are timed",
+        )
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument(
+            "--compare", help="earlier results file to print p95 changes against"
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="keep the seeded benchmark database and reuse it next run "
+            "(needs a file-backed test database, SQLite's is in memory)",
+        )
+        parser.add_argument(
+            "--endpoint-url",
+            default=getattr(settings, "AWS_S3_ENDPOINT_URL", None)
+            or "http://127.0.0.1:9000",
+            help="S3-compatible stand-in; presigning never calls it",
+        )
+
+    def handle(self, *args, **options):
+        for name, value in SCALES[options["scale"]].items():
+            if options[name] is None:
+                options[name] = value
+        possible = options["students"] * options["assignments_per_classroom"]
+        if options["submissions"] > possible:
+            raise CommandError(
+                f"At most {possible} submissions fit {options['students']} students "
+                f"and {options['assignments_per_classroom']} assignments a classroom"
+            )
+        self.options = options
+        old_config = setup_databases(
+            verbosity=0, interactive=False, keepdb=options["keepdb"]
+        )
+        try:
+            if not ClassRoom.objects.filter(name__startswith="SEED ").exists():
+                self.seed()
+            ClassroomResponseCache.get_cache().clear()
+            with override_settings(**self.s3_stand_in()):
+                endpoints = self.run_benchmarks()
+            dataset = {
+                model.__name__: model.objects.count()
+                for model in (ClassRoom, User, Student, Assignment, Submission)
+            }
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+
+        results = {
+            "commit": _git_commit(),
+            "recorded_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "dataset": dataset,
+            "endpoints": endpoints,
+        }
+        with open(options["output"], "w") as f:
+            json.dump(results, f, indent=2)
+        self.report(results)
+        self.stdout.write(self.style.SUCCESS(f"results written to {options['output']}"))
+
+    def s3_stand_in(self):
+        return dict(
+            AWS_S3_ENDPOINT_URL=self.options["endpoint_url"],
+            AWS_S3_ACCESS_KEY_ID=settings.AWS_S3_ACCESS_KEY_ID or "benchmark",
+            AWS_S3_SECRET_ACCESS_KEY=settings.AWS_S3_SECRET_ACCESS_KEY or "benchmark",
+            AWS_S3_REGION_NAME=settings.AWS_S3_REGION_NAME or "us-east-1",
+            AWS_STORAGE_BUCKET_NAME=settings.AWS_STORAGE_BUCKET_NAME or "benchmark",
+        )
+
+    def seed(self):
+        possible = self.options["students"] * self.options["assignments_per_classroom"]
+        started = time.perf_counter()
+        with transaction.atomic():
+            DatasetSeeder(
+                classrooms=self.options["classrooms"],
+                students=self.options["students"],
+                instructors=self.options["instructors"],
+                assignments_per_classroom=self.options["assignments_per_classroom"],
+                materials_per_classroom=self.options["materials_per_classroom"],
+                submission_rate=self.options["submissions"] / possible
+                if possible
+                else 0,
+                seed=self.options["seed"],
+                log=self.stdout.write,
+            ).run()
+        self.stdout.write(f"seeded in {time.perf_counter() - started:.1f}s")
+
+    def _client(self, user):
+        client = Client()
+        token = get_tokens_for_user(user)["access"]
+        client.defaults["HTTP_AUTHORIZATION"] = f"Token {token}"
+        return client
+
+    def _sample(self, queryset, count):
+        """`count` rows spread evenly over the queryset, the same every run."""
+        total = queryset.count()
+        step = max(1, total // max(1, count))
+        ids = queryset.order_by("pk").values_list("pk", flat=True)[::step][:count]
+        return list(queryset.model.objects.filter(pk__in=ids).order_by("pk"))
+
+    def measure(self, name, requests, count, expected_status):
+        """Times `requests` (callables returning a response), skipping warmup."""
+        timings, queries, errors = [], [], 0
+        warmup = self.options["warmup"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(count + warmup):
+                request = requests[i % len(requests)]
+                started = time.perf_counter()
+                response = request()
+                elapsed = time.perf_counter() - started
+                if i < warmup:
+                    continue
+                if response.status_code != expected_status:
+                    errors += 1
+                timings.append(elapsed)
+                match = QUERY_COUNT.search(response.get("Server-Timing", ""))
+                queries.append(int(match.group(1)) if match else 0)
+        self.stdout.write(f"  {name}: {count} requests")
+        return summarise(timings, queries, errors)
+
+    def run_benchmarks(self):
+        count = self.options["requests"]
+        students = self._sample(
+            User.objects.filter(email__startswith="student", is_student=True), count
+        )
+        instructors = self._sample(Instructor.objects.select_related("user"), count)
+        student_clients = [self._client(user) for user in students]
+        instructor_clients = [self._client(i.user) for i in instructors]
+        anonymous = Client()
+        classroom = ClassRoom.objects.filter(name__startswith="SEED ").first()
+
+        results = {}
+        results["login"] = self.measure(
+            "login",
+            [
+                post(
+                    anonymous,
+                    "/api/v1/login",
+                    {"email": user.email, "password": SEED_PASSWORD},
+                )
+                for user in students
+            ],
+            self.options["login_requests"],
+            200,
+        )
+        results["assignments_list"] = self.measure(
+            "assignments_list",
+            [get(client, "/api/v1/assignments") for client in student_clients],
+            count,
+            200,
+        )
+        results["submissions_list_student"] = self.measure(
+            "submissions_list_student",
+            [get(client, "/api/v1/submissions") for client in student_clients],
+            count,
+            200,
+        )
+        results["submissions_list_instructor"] = self.measure(
+            "submissions_list_instructor",
+            [get(client, "/api/v1/submissions") for client in instructor_clients],
+            count,
+            200,
+        )
+        results["profile"] = self.measure(
+            "profile",
+            [get(client, "/api/v1/profile") for client in student_clients],
+            count,
+            200,
+        )
+
+        started_ids = []
+
+        def start_upload(client, i):
+            def request():
+                response = client.post(
+                    "/api/v1/course-material/start_upload",
+                    {
+                        "file_name": f"benchmark-{i}.pdf",
+                        "file_type": "application/pdf",
+                        "classroom": classroom.name,
+                    },
+                    content_type="application/json",
+                )
+                if response.status_code == 200:
+                    started_ids.append((client, response.json()["id"]))
+                return response
+
+            return request
+
+        results["start_upload"] = self.measure(
+            "start_upload",
+            [
+                start_upload(instructor_clients[i % len(instructor_clients)], i)
+                for i in range(count + self.options["warmup"])
+            ],
+            count,
+            200,
+        )
+        # Only uploads that were actually started can be finished
+        finish_count = min(count, len(started_ids) - self.options["warmup"])
+        if finish_count > 0:
+            results["finish_upload"] = self.measure(
+                "finish_upload",
+                [
+                    post(
+                        client,
+                        "/api/v1/course-material/finish_upload",
+                        {"file_id": i},
+                    )
+                    for client, i in started_ids
+                ],
+                finish_count,
+                200,
+            )
+        else:
+            self.stdout.write("  finish_upload: skipped, no uploads were started")
+
+        results["grading"] = self.measure(
+            "grading", self.grading_requests(count), count, 200
+        )
+        return results
+
+    def grading_requests(self, count):
+        open_assignments = self._sample(
+            Assignment.objects.filter(due__gt=timezone.now()).select_related(
+                "instructor__user"
+            ),
+            count,
+        )
+        clients = {}
+        requests = []
+        for assignment in open_assignments:
+            instructor = assignment.instructor
+            if instructor.pk not in clients:
+                clients[instructor.pk] = self._client(instructor.user)
+            grades = [
+                {"id": pk, "score": assignment.marks // 2}
+                for pk in Submission.objects.filter(assignment=assignment).values_list(
+                    "pk", flat=True
+                )[:50]
+            ]
+            requests.append(
+                post(
+                    clients[instructor.pk],
+                    f"/api/v1/assignments/{assignment.pk}/grades",
+                    {"grades": grades},
+                )
+            )
+        return requests
+
+    def report(self, results):
+        previous = {}
+        if self.options["compare"]:
+            with open(self.options["compare"]) as f:
+                previous = json.load(f)["endpoints"]
+
+        self.stdout.write(
+            f"{'endpoint':<28}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'errors':>8}"
+        )
+        for name, summary in results["endpoints"].items():
+            line = (
+                f"{name:<28}{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}"
+                f"{summary['p99_ms']:>9.1f}{summary['queries_mean']:>9.1f}"
+                f"{summary['errors']:>8}"
+            )
+            if name in previous and previous[name]["p95_ms"]:
+                change = summary["p95_ms"] / previous[name]["p95_ms"] - 1
+                line += f"  p95 {change:+.0%}"
+            self.stdout.write(line)
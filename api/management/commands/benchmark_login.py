@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from api.hashing import get_hashing_pool
+from api.models import User
+
+PASSWORD = "benchmark-pAssw0rd!"
+EMAIL = "bench-login-{}@example.com"
+LOGIN_PATH = "/api/v1/login/async"
+
+
+async def asgi_request(application, method, path, payload=None):
+    """Sends one request through the ASGI application and returns its status."""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await application(scope, receive, send)
+    return response["status"]
+
+
+def _percentile(timings, fraction):
+    timings = sorted(timings)
+    return timings[max(0, int(len(timings) * fraction) - 1)] * 1000
+
+
+class Command(BaseCommand):
+    help = "measure async logins/sec per core through SIMS.asgi and the hashing pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=64)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--max-probe-ms",
+            type=float,
+            default=100,
+            help="fail if the p95 of cheap requests during the burst is slower",
+        )
+
+    def handle(self, *args, **options):
+        from SIMS.asgi import application
+
+        logins = options["logins"]
+        password_hash = make_password(PASSWORD)
+        User.objects.bulk_create(
+            User(email=EMAIL.format(i), password=password_hash) for i in range(logins)
+        )
+        try:
+            elapsed, login_latencies, probe_latencies = async_to_sync(self._run)(
+                application, logins, options["concurrency"]
+            )
+        finally:
+            User.objects.filter(email__startswith="bench-login-").delete()
+
+        cores = os.cpu_count()
+        self.stdout.write(
+            f"{logins} logins in {elapsed:.2f}s with concurrency "
+            f"{options['concurrency']} on {cores} cores"
+        )
+        self.stdout.write(
+            f"login latency p50 {_percentile(login_latencies, 0.5):.0f}ms "
+            f"p95 {_percentile(login_latencies, 0.95):.0f}ms"
+        )
+        probe_p95 = _percentile(probe_latencies, 0.95)
+        self.stdout.write(
+            f"cheap request latency during the burst p50 "
+            f"{_percentile(probe_latencies, 0.5):.1f}ms p95 {probe_p95:.1f}ms"
+        )
+        self.stdout.write(f"hashing pool: {get_hashing_pool().metrics()}")
+        if probe_p95 > options["max_probe_ms"]:
+            # Something between the server and the views blocks the event loop
+            raise CommandError(
+                f"cheap requests took {probe_p95:.1f}ms at p95 during the burst, "
+                f"over the {options['max_probe_ms']:g}ms limit"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{logins / elapsed:.1f} logins/s, "
+                f"{logins / elapsed / cores:.1f} logins/s per core"
+            )
+        )
+
+    async def _run(self, application, logins, concurrency):
+        slots = asyncio.Semaphore(concurrency)
+        login_latencies = []
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def login(i):
+            async with slots:
+                started = time.perf_counter()
+                status = await asgi_request(
+                    application,
+                    "POST",
+                    LOGIN_PATH,
+                    {"email": EMAIL.format(i), "password": PASSWORD},
+                )
+                login_latencies.append(time.perf_counter() - started)
+                assert status == 200, status
+
+        async def probe():
+            # A request that never hashes; it should stay fast while logins run
+            while not done.is_set():
+                started = time.perf_counter()
+                await asgi_request(application, "GET", LOGIN_PATH)
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        started = time.perf_counter()
+        prober = asyncio.ensure_future(probe())
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+        return elapsed, login_latencies, probe_latencies
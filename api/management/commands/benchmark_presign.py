@@ -0,0 +1,70 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from api.aws_integrations import s3_generate_presigned_post, s3_reset_client
+
+
+def _summarise(timings):
+    timings = sorted(timings)
+    return {
+        "mean": statistics.mean(timings) * 1000,
+        "p50": timings[len(timings) // 2] * 1000,
+        "p95": timings[int(len(timings) * 0.95) - 1] * 1000,
+    }
+
+
+class Command(BaseCommand):
+    help = "compare presigned POST latency with a per-call client against the pooled client"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument(
+            "--endpoint-url",
+            default=getattr(settings, "AWS_S3_ENDPOINT_URL", None)
+            or "http://127.0.0.1:9000",
+            help="S3-compatible stand-in such as MinIO or moto_server",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        stand_in = dict(
+            AWS_S3_ENDPOINT_URL=options["endpoint_url"],
+            AWS_S3_ACCESS_KEY_ID=settings.AWS_S3_ACCESS_KEY_ID or "benchmark",
+            AWS_S3_SECRET_ACCESS_KEY=settings.AWS_S3_SECRET_ACCESS_KEY or "benchmark",
+            AWS_S3_REGION_NAME=settings.AWS_S3_REGION_NAME or "us-east-1",
+            AWS_STORAGE_BUCKET_NAME=settings.AWS_STORAGE_BUCKET_NAME or "benchmark",
+        )
+
+        with override_settings(**stand_in):
+            # Rebuilding the client and credentials every call is what each
+            # start_upload request used to pay for
+            before = self._measure(iterations, reset=True)
+            after = self._measure(iterations, reset=False)
+        s3_reset_client()
+
+        for label, timings in (("per-call client", before), ("pooled client", after)):
+            summary = _summarise(timings)
+            self.stdout.write(
+                f"{label:>16}: mean {summary['mean']:.3f}ms "
+                f"p50 {summary['p50']:.3f}ms p95 {summary['p95']:.3f}ms"
+            )
+        speedup = statistics.mean(before) / statistics.mean(after)
+        self.stdout.write(self.style.SUCCESS(f"pooled client is {speedup:.1f}x faster"))
+
+    def _measure(self, iterations, reset):
+        s3_reset_client()
+        s3_generate_presigned_post(file_path="file/warmup.pdf", file_type="application/pdf")
+        timings = []
+        for i in range(iterations):
+            if reset:
+                s3_reset_client()
+            started = time.perf_counter()
+            s3_generate_presigned_post(
+                file_path=f"file/benchmark-{i}.pdf", file_type="application/pdf"
+            )
+            timings.append(time.perf_counter() - started)
+        return timings
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.services import expire_overdue_assignments
+
+
+class Command(BaseCommand):
+    help = "move pending assignments past their deadline to EXPIRED"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=0,
+            help="keep sweeping every this many seconds (0 sweeps once)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="expired assignments per downstream notification",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            started = time.perf_counter()
+            expired = expire_overdue_assignments(batch_size=options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{expired} assignments expired in "
+                    f"{(time.perf_counter() - started) * 1000:.0f}ms"
+                )
+            )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import ClassRoom
+from api.seeding import SEED_EMAIL_DOMAIN, SEED_PASSWORD, DatasetSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "bulk-generate a large, realistic and reproducible dataset of classrooms, "
+        "users, assignments, course material and submissions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--classrooms", type=int, default=200)
+        parser.add_argument("--students", type=int, default=25000)
+        parser.add_argument("--instructors", type=int, default=400)
+        parser.add_argument("--assignments-per-classroom", type=int, default=50)
+        parser.add_argument("--materials-per-classroom", type=int, default=10)
+        parser.add_argument(
+            "--submissions",
+            type=int,
+            default=1000000,
+            help="roughly how many submissions to generate; at most one per "
+            "student per assignment in their classroom",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if ClassRoom.objects.filter(name__startswith="SEED ").exists():
+            raise CommandError(
+                "Generated data is already loaded; drop it or use a fresh database"
+            )
+        for option in ("classrooms", "instructors"):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be at least 1")
+
+        possible = options["students"] * options["assignments_per_classroom"]
+        if options["submissions"] > possible:
+            raise CommandError(
+                f"At most {possible} submissions fit {options['students']} students "
+                f"and {options['assignments_per_classroom']} assignments a classroom"
+            )
+
+        seeder = DatasetSeeder(
+            classrooms=options["classrooms"],
+            students=options["students"],
+            instructors=options["instructors"],
+            assignments_per_classroom=options["assignments_per_classroom"],
+            materials_per_classroom=options["materials_per_classroom"],
+            submission_rate=options["submissions"] / possible if possible else 0,
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+        started = time.perf_counter()
+        with transaction.atomic():
+            seeder.run()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated in {time.perf_counter() - started:.1f}s. Every "
+                f"*@{SEED_EMAIL_DOMAIN} user signs in with {SEED_PASSWORD!r}"
+            )
+        )
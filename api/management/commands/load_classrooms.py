@@ -1,49 +1,40 @@
-import pkgutil
-from abc import ABC
-import sys
+import time
+
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management.base import BaseCommand, CommandError
-from api.management import commands
-from api.utils import populate_model
+from django.db import transaction
 
-thismodule = sys.modules[__name__]
-print(thismodule)
+from api.fixtures import discover_fixtures
+from api.management import commands
 
 
-class Command(BaseCommand, ABC):
-    help = "load all static objects into the database"
+class Command(BaseCommand):
+    help = (
+        "load the static fixtures declared in api/management/commands, creating "
+        "missing rows and updating changed ones in bulk"
+    )
 
     def handle(self, *args, **options):
-        all_modules = []
-        importer = None
-
-        #  get all the module files containing the different categories
-        for imp, mod_name, ispkg in pkgutil.iter_modules(commands.__path__):
-            importer = imp
-            all_modules.append(mod_name)
+        started = time.perf_counter()
+        try:
+            fixtures = discover_fixtures(commands)
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
 
-        # exclude this module if among the files specified as it is an execution file
-        if all_modules.count(thismodule.__name__.split('.')[-1]) > 0:
-            all_modules.remove(thismodule.__name__.split('.')[-1])
-            # print(all_modules)
+        # All or nothing, so a failed release leaves the previous fixtures intact
+        with transaction.atomic():
+            for fixture in fixtures:
+                fixture_started = time.perf_counter()
+                created, updated, unchanged = fixture.upsert()
+                self.stdout.write(
+                    f"{fixture.model.__name__} ({fixture.name}): {created} created, "
+                    f"{updated} updated, {unchanged} unchanged in "
+                    f"{(time.perf_counter() - fixture_started) * 1000:.0f}ms"
+                )
 
-        for name in all_modules:
-            print(name, f"{name} has been loaded")
-            module = importer.find_module(name).load_module(name)
-            print(module, f"this module is included=====")
-            if module:
-                model = module.obj.get("model")
-                data = module.obj.get("data")
-                for d in data:
-                    try:
-                        print(model, d)
-                        obj = model()
-                        obj = populate_model(d, obj)
-                        obj.save()
-                        # model.objects.create(name=d.name)
-                        print(f'{model} instance created')
-                    except Exception as e:
-                        print(
-                            f"There was an exception for {name}=====>>>>>> {e}")
-                        continue
-                    self.stdout.write(self.style.SUCCESS(
-                        'Entities were created successfully'))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {len(fixtures)} fixtures in "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+        )
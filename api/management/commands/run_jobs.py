@@ -0,0 +1,76 @@
+import json
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.jobs import Worker
+
+
+def _work(worker_options, burst):
+    # Spawned (non-forked) processes need the app registry first
+    django.setup()
+    worker = Worker(**worker_options)
+    signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+    worker.run(burst=burst)
+    return worker.metrics()
+
+
+class Command(BaseCommand):
+    help = "run queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="worker processes, each claiming and running jobs on its threads",
+        )
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="seconds to wait before looking again when the queue is empty",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=float,
+            default=600,
+            help="requeue jobs still running after this many seconds",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="exit once the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        worker_options = dict(
+            threads=options["threads"],
+            poll_interval=options["poll_interval"],
+            stale_after=options["stale_after"],
+        )
+        if options["processes"] > 1:
+            self.stdout.write(f"Starting {options['processes']} worker processes")
+            # Children must not share the parent's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options["processes"]) as executor:
+                futures = [
+                    executor.submit(_work, worker_options, options["burst"])
+                    for _ in range(options["processes"])
+                ]
+                metrics = [future.result() for future in futures]
+        else:
+            worker = Worker(**worker_options)
+            signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+            try:
+                worker.run(burst=options["burst"])
+            except KeyboardInterrupt:
+                worker.stop()
+            metrics = [worker.metrics()]
+
+        for worker_metrics in metrics:
+            self.stdout.write(json.dumps(worker_metrics))
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.services import sweep_abandoned_multipart_uploads
+
+
+class Command(BaseCommand):
+    help = "abort course material multipart uploads that were never completed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-hours",
+            type=float,
+            default=24,
+            help="only sweep uploads started at least this many hours ago",
+        )
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(hours=options["older_than_hours"])
+        aborted = sweep_abandoned_multipart_uploads(older_than=older_than)
+        self.stdout.write(
+            self.style.SUCCESS(f"{aborted} abandoned multipart uploads aborted")
+        )
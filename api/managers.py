@@ -1,5 +1,5 @@
 from django.contrib.auth.models import BaseUserManager
-from django.db.models import Manager, Q
+from django.db.models import Manager
 from django.utils.translation import ugettext_lazy as _
 
 
@@ -8,13 +8,19 @@ class UserManager(BaseUserManager):
 
     use_in_migrations = True
 
-    def _create_user(self, email, password, **extra_fields):
-        """Create and save a User with the given email and password."""
+    def _create_user(self, email, password, password_hash=None, **extra_fields):
+        """
+        Create and save a User with the given email and password.
+        `password_hash` skips hashing when the caller already did it.
+        """
         if not email:
             raise ValueError("The given email must be set")
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
-        user.set_password(password)
+        if password_hash is not None:
+            user.password = password_hash
+        else:
+            user.set_password(password)
         user.save(using=self._db)
         return user
 
@@ -39,22 +45,39 @@ class UserManager(BaseUserManager):
 
 class CourseMaterialManager(Manager):
     def get_course_materials(self, user):
+        queryset = self.select_related("uploaded_by")
         if user.is_student:
-            print(user.student.classroom)
-            # return self.filter(Q(classroom=user.student.classroom) & Q(is_valid=True))
-            return self.filter(classroom=user.student.classroom)
-        return self.filter(user=user)
+            return queryset.filter(
+                classroom_id=user.student.classroom_id,
+                verification=self.model.Verification.VERIFIED,
+            )
+        return queryset.filter(uploaded_by_id=user.pk)
 
 
 class SubmissionsManager(Manager):
+    # Everything SubmissionSerializer renders per row, including the nested
+    # AssignmentSerializer, so listing never goes back to the database.
+    list_related_fields = (
+        "student__user",
+        "student__classroom",
+        "instructor__user",
+        "classroom",
+        "assignment__instructor__user",
+        "assignment__classroom",
+    )
+
     def get_submissions(self, user):
+        queryset = self.select_related(*self.list_related_fields)
         if user.is_instructor:
-            return self.filter(instructor=user.instructor)
-        return self.filter(student=user.student)
+            return queryset.filter(instructor=user.instructor)
+        return queryset.filter(student=user.student)
 
 
 class AssignmentsManager(Manager):
+    list_related_fields = ("instructor__user", "classroom")
+
     def get_assignments(self, user):
+        queryset = self.select_related(*self.list_related_fields)
         if user.is_instructor:
-            return self.filter(instructor=user.instructor)
-        return self.filter(classroom=user.student.classroom)
+            return queryset.filter(instructor=user.instructor)
+        return queryset.filter(classroom_id=user.student.classroom_id)
@@ -0,0 +1,28 @@
+# Generated by Django 3.1 on 2026-10-18 09:26
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_auto_20221208_1755'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='coursematerial',
+            options={'ordering': ['-created_date', '-modified_date']},
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='created_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='modified_date',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_auto_20261018_0926'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursematerial',
+            name='upload_id',
+            field=models.CharField(blank=True, max_length=1024, null=True),
+        ),
+    ]
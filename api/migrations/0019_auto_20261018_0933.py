@@ -0,0 +1,22 @@
+# Generated by Django 3.1 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_coursematerial_upload_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='content_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['assignment', 'content_digest'], name='api_submiss_assignm_15ff93_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+from api.utils import submission_content_digest
+
+BATCH_SIZE = 2000
+
+
+def backfill_content_digest(apps, schema_editor):
+    Submission = apps.get_model("api", "Submission")
+    queryset = Submission.objects.order_by("pk").only("pk", "content")
+
+    # Walk the table in primary key ranges so memory and transaction size
+    # stay bounded however many submissions there are
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        for submission in batch:
+            submission.content_digest = submission_content_digest(submission.content)
+        Submission.objects.bulk_update(batch, ["content_digest"])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_auto_20261018_0933'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_content_digest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 3.1 on 2026-10-18 09:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_backfill_submission_content_digest'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='assignment',
+            options={'ordering': ['-created_date', '-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='coursematerial',
+            options={'ordering': ['-created_date', '-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='instructor',
+            options={'ordering': ['-created_date', '-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='student',
+            options={'ordering': ['-created_date', '-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='submission',
+            options={'ordering': ['-created_date', '-id']},
+        ),
+        migrations.AlterField(
+            model_name='assignment',
+            name='classroom',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='api.classroom'),
+        ),
+        migrations.AlterField(
+            model_name='assignment',
+            name='instructor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='api.instructor'),
+        ),
+        migrations.AlterField(
+            model_name='coursematerial',
+            name='classroom',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='course_materials', to='api.classroom'),
+        ),
+        migrations.AlterField(
+            model_name='coursematerial',
+            name='uploaded_by',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='instructor',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='api.instructor'),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='api.student'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['instructor', '-created_date', '-id'], name='api_assignm_instruc_e1e745_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['classroom', '-created_date', '-id'], name='api_assignm_classro_417273_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursematerial',
+            index=models.Index(fields=['classroom', '-created_date', '-id'], name='api_coursem_classro_aa4fe7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursematerial',
+            index=models.Index(fields=['uploaded_by', '-created_date', '-id'], name='api_coursem_uploade_aacf9d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursematerial',
+            index=models.Index(fields=['classroom', 'upload_finished_at'], name='api_coursem_classro_87eef0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['instructor', '-created_date', '-id'], name='api_submiss_instruc_4c0625_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', '-created_date', '-id'], name='api_submiss_student_eda352_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'status'], name='api_submiss_student_0e2333_idx'),
+        ),
+    ]
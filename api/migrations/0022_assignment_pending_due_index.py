@@ -0,0 +1,17 @@
+# Generated by Django 3.1 on 2026-10-18 10:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_manager_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(condition=models.Q(status='PENDING'), fields=['due'], name='assignment_pending_due_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.1 on 2026-10-18 10:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_assignment_pending_due_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Inbox',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inbox', serialize=False, to='api.user')),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('modified_date', models.DateTimeField(default=django.utils.timezone.now)),
+                ('kind', models.CharField(choices=[('ASSIGNMENT_CREATED', 'Assignment created'), ('SUBMISSION_GRADED', 'Submission graded')], max_length=30)),
+                ('message', models.CharField(max_length=400)),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('classroom', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.classroom')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_date', '-id'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_date', '-id'], name='api_notific_user_id_ccfb73_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(read_at__isnull=True), fields=['user', 'kind', 'classroom'], name='notification_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.1 on 2026-10-18 10:24
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def verify_finished_uploads(apps, schema_editor):
+    # Uploads finished before verification existed stay listed
+    CourseMaterial = apps.get_model("api", "CourseMaterial")
+    CourseMaterial.objects.filter(upload_finished_at__isnull=False).update(
+        verification="VERIFIED", verified_at=F("upload_finished_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_jobs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='coursematerial',
+            name='api_coursem_classro_aa4fe7_idx',
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='checksum',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='declared_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='etag',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='verification',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('VERIFIED', 'Verified'), ('REJECTED', 'Rejected')], default='PENDING', max_length=15),
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='verification_error',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='coursematerial',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(verify_finished_uploads, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='coursematerial',
+            index=models.Index(condition=models.Q(verification='VERIFIED'), fields=['classroom', '-created_date', '-id'], name='material_verified_idx'),
+        ),
+    ]
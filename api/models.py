@@ -9,7 +9,7 @@ from api.managers import (
     UserManager,
 )
 from django.utils import timezone
-from .utils import file_generate_upload_path
+from .utils import file_generate_upload_path, submission_content_digest
 
 
 class TimestampedModel(models.Model):
@@ -18,7 +18,15 @@ class TimestampedModel(models.Model):
 
     class Meta:
         abstract = True
-        ordering = ["-created_date", "-modified_date"]
+        # Matches keyset pagination, so one index serves both
+        ordering = ["-created_date", "-id"]
+
+    def save(self, *args, **kwargs):
+        self.modified_date = timezone.now()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "modified_date"}
+        super().save(*args, **kwargs)
 
 
 class ClassRoom(TimestampedModel):
@@ -95,11 +103,12 @@ class Assignment(TimestampedModel, models.Model):
     question = models.CharField(max_length=300, unique=True)
     code = models.CharField(max_length=15, null=True, blank=True)
     course = models.CharField(max_length=50)
+    # Indexed through the composite indexes in Meta
     instructor = models.ForeignKey(
-        Instructor, on_delete=models.CASCADE, related_name="assignments"
+        Instructor, on_delete=models.CASCADE, related_name="assignments", db_index=False
     )
     classroom = models.ForeignKey(
-        ClassRoom, on_delete=models.CASCADE, related_name="assignments"
+        ClassRoom, on_delete=models.CASCADE, related_name="assignments", db_index=False
     )
     due = models.DateTimeField(null=True, blank=True)
     status = models.CharField(
@@ -109,9 +118,31 @@ class Assignment(TimestampedModel, models.Model):
 
     objects = AssignmentsManager()
 
+    class Meta(TimestampedModel.Meta):
+        # One per AssignmentsManager access path, in list order
+        indexes = [
+            models.Index(fields=["instructor", "-created_date", "-id"]),
+            models.Index(fields=["classroom", "-created_date", "-id"]),
+            # The expiry sweep's pending, overdue rows; shrinks as they expire
+            models.Index(
+                fields=["due"],
+                name="assignment_pending_due_idx",
+                condition=models.Q(status="PENDING"),
+            ),
+        ]
+
     def __str__(self):
         return self.question
 
+    def has_expired(self, now=None):
+        """
+        True once the assignment is past its deadline. The expiry sweep
+        sets EXPIRED; `due` covers the time until the next sweep runs.
+        """
+        if self.status == self.Status.EXPIRED:
+            return True
+        return self.due is not None and self.due < (now or timezone.now())
+
 
 class Submission(TimestampedModel, models.Model):
     class Status(models.TextChoices):
@@ -119,6 +150,8 @@ class Submission(TimestampedModel, models.Model):
         SUBMITTED = "SUBMITTED", "Submitted"
 
     content = models.TextField(blank=True)
+    # Normalised hash of `content`, kept up to date by save()
+    content_digest = models.CharField(max_length=64, blank=True, editable=False)
     title = models.CharField(max_length=255, blank=False)
     status = models.CharField(
         max_length=15, blank=True, choices=Status.choices, default=Status.SUBMITTED
@@ -127,11 +160,12 @@ class Submission(TimestampedModel, models.Model):
     assignment = models.ForeignKey(
         Assignment, on_delete=models.CASCADE, related_name="submissions"
     )
+    # Indexed through the composite indexes in Meta
     student = models.ForeignKey(
-        Student, on_delete=models.CASCADE, related_name="submissions"
+        Student, on_delete=models.CASCADE, related_name="submissions", db_index=False
     )
     instructor = models.ForeignKey(
-        Instructor, on_delete=models.CASCADE, related_name="submissions"
+        Instructor, on_delete=models.CASCADE, related_name="submissions", db_index=False
     )
     classroom = models.ForeignKey(
         ClassRoom, on_delete=models.CASCADE, related_name="submissions"
@@ -145,11 +179,33 @@ class Submission(TimestampedModel, models.Model):
 
     objects = SubmissionsManager()
 
+    class Meta(TimestampedModel.Meta):
+        indexes = [
+            models.Index(fields=["assignment", "content_digest"]),
+            # SubmissionsManager access paths, in list order
+            models.Index(fields=["instructor", "-created_date", "-id"]),
+            models.Index(fields=["student", "-created_date", "-id"]),
+            # Dashboard totals by status
+            models.Index(fields=["student", "status"]),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.content_digest = submission_content_digest(self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "content_digest"}
+        super().save(*args, **kwargs)
+
+
+class CourseMaterial(TimestampedModel, models.Model):
+    class Verification(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        VERIFIED = "VERIFIED", "Verified"
+        REJECTED = "REJECTED", "Rejected"
 
-class CourseMaterial(models.Model):
     file = models.FileField(upload_to=file_generate_upload_path, blank=True, null=True)
 
     original_file_name = models.TextField(blank=True, null=True)
@@ -158,16 +214,153 @@ class CourseMaterial(models.Model):
     file_type = models.CharField(max_length=255, blank=True, null=True)
 
     upload_finished_at = models.DateTimeField(blank=True, null=True)
-    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
+    # S3 multipart upload in progress, cleared once it is completed
+    upload_id = models.CharField(max_length=1024, blank=True, null=True)
+    # Size the client declared when starting a multipart upload
+    declared_size = models.PositiveBigIntegerField(blank=True, null=True)
+
+    # What S3 reported for the object once the upload was verified
+    verification = models.CharField(
+        max_length=15, default=Verification.PENDING, choices=Verification.choices
+    )
+    verification_error = models.CharField(max_length=255, blank=True)
+    verified_at = models.DateTimeField(blank=True, null=True)
+    size = models.PositiveBigIntegerField(blank=True, null=True)
+    etag = models.CharField(max_length=255, blank=True)
+    checksum = models.CharField(max_length=255, blank=True)
+    # Indexed through the composite indexes in Meta
+    uploaded_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, db_index=False
+    )
     classroom = models.ForeignKey(
-        ClassRoom, on_delete=models.CASCADE, related_name="course_materials", null=True
+        ClassRoom,
+        on_delete=models.CASCADE,
+        related_name="course_materials",
+        null=True,
+        db_index=False,
     )
 
     objects = CourseMaterialManager()
 
+    class Meta(TimestampedModel.Meta):
+        indexes = [
+            # CourseMaterialManager access paths, in list order. Students
+            # only see verified materials, so their index leaves out the rest
+            models.Index(
+                fields=["classroom", "-created_date", "-id"],
+                name="material_verified_idx",
+                condition=models.Q(verification="VERIFIED"),
+            ),
+            models.Index(fields=["uploaded_by", "-created_date", "-id"]),
+            # Finished uploads of a classroom, and every upload of a deleted one
+            models.Index(fields=["classroom", "upload_finished_at"]),
+        ]
+
     @property
     def is_valid(self):
-        return bool(self.upload_finished_at)
+        return self.verification == self.Verification.VERIFIED
 
     def __str__(self) -> str:
         return f"{self.original_file_name} for {self.classroom}"
+
+
+class Notification(TimestampedModel, models.Model):
+    """
+    One inbox entry. Events of the same kind for the same user and
+    classroom arriving while an entry is unread and recent are coalesced
+    into it as a digest: `count` grows and `message` describes the latest.
+    """
+
+    class Kind(models.TextChoices):
+        ASSIGNMENT_CREATED = "ASSIGNMENT_CREATED", "Assignment created"
+        SUBMISSION_GRADED = "SUBMISSION_GRADED", "Submission graded"
+
+    # Indexed through the composite indexes in Meta
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notifications", db_index=False
+    )
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    classroom = models.ForeignKey(
+        ClassRoom, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    message = models.CharField(max_length=400)
+    count = models.PositiveIntegerField(default=1)
+    read_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta(TimestampedModel.Meta):
+        indexes = [
+            # A user's inbox, in list order
+            models.Index(fields=["user", "-created_date", "-id"]),
+            # Open digests the fan-out coalesces into
+            models.Index(
+                fields=["user", "kind", "classroom"],
+                name="notification_unread_idx",
+                condition=models.Q(read_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} for {self.user_id}"
+
+
+class Inbox(models.Model):
+    """
+    Per-user unread notification counter, kept in step with Notification
+    rows so the unread badge is a primary key lookup instead of a COUNT.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="inbox"
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.unread} unread for {self.user_id}"
+
+
+class Job(TimestampedModel, models.Model):
+    """
+    A unit of deferred work for `manage.py run_jobs`: the registered task
+    `name` called with `args`. Failed attempts are retried with backoff
+    until `max_attempts` is reached.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
+        RUNNING = "RUNNING", "Running"
+        SUCCEEDED = "SUCCEEDED", "Succeeded"
+        FAILED = "FAILED", "Failed"
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True)
+    status = models.CharField(
+        max_length=15, default=Status.QUEUED, choices=Status.choices
+    )
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=255, blank=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    # Seconds the last attempt ran for
+    duration = models.FloatField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta(TimestampedModel.Meta):
+        indexes = [
+            # Claim order of the jobs waiting to run
+            models.Index(
+                fields=["run_after"],
+                name="job_queued_idx",
+                condition=models.Q(status="QUEUED"),
+            ),
+            # Running jobs whose worker went away
+            models.Index(
+                fields=["started_at"],
+                name="job_running_idx",
+                condition=models.Q(status="RUNNING"),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from itertools import groupby, islice
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .jobs import task
+from .models import Assignment, Inbox, Notification, Student, Submission
+
+# Events arriving this soon after an unread entry are folded into it
+DIGEST_WINDOW = timedelta(minutes=15)
+# Recipients written per statement, well under SQLite's variable limit
+FAN_OUT_BATCH_SIZE = 500
+
+
+def fan_out(kind, classroom_id, user_ids, message, now=None):
+    """
+    Delivers one event to every user in `user_ids`: folds it into their
+    open digest of the same kind and classroom where there is one, and
+    bulk-creates a new unread entry, bumping their inbox counter, where
+    there isn't. Works through the users in batches.
+    """
+    now = now or timezone.now()
+    user_ids = iter(user_ids)
+    while True:
+        batch = list(islice(user_ids, FAN_OUT_BATCH_SIZE))
+        if not batch:
+            return
+        with transaction.atomic():
+            digests = Notification.objects.filter(
+                user_id__in=batch,
+                kind=kind,
+                classroom_id=classroom_id,
+                read_at__isnull=True,
+                created_date__gte=now - DIGEST_WINDOW,
+            )
+            coalesced = set(
+                digests.select_for_update()
+                .order_by()
+                .values_list("user_id", flat=True)
+            )
+            if coalesced:
+                digests.update(count=F("count") + 1, message=message, modified_date=now)
+
+            fresh = [user_id for user_id in batch if user_id not in coalesced]
+            if not fresh:
+                continue
+            Notification.objects.bulk_create(
+                Notification(
+                    user_id=user_id,
+                    kind=kind,
+                    classroom_id=classroom_id,
+                    message=message,
+                    created_date=now,
+                    modified_date=now,
+                )
+                for user_id in fresh
+            )
+            Inbox.objects.bulk_create(
+                (Inbox(user_id=user_id) for user_id in fresh), ignore_conflicts=True
+            )
+            Inbox.objects.filter(user_id__in=fresh).update(unread=F("unread") + 1)
+
+
+@task
+def notify_assignment_created(assignment_id):
+    assignment = (
+        Assignment.objects.select_related("classroom")
+        .only("question", "classroom__name")
+        .get(pk=assignment_id)
+    )
+    # Read up front: a cursor left open across the writes below would
+    # hold SQLite's read lock and deadlock with other writers
+    user_ids = list(
+        Student.objects.filter(classroom_id=assignment.classroom_id)
+        .order_by()
+        .values_list("user_id", flat=True)
+    )
+    fan_out(
+        Notification.Kind.ASSIGNMENT_CREATED,
+        assignment.classroom_id,
+        user_ids,
+        f"New assignment in {assignment.classroom.name}: {assignment.question}",
+    )
+
+
+@task
+def notify_submissions_graded(submission_ids):
+    submissions = (
+        Submission.objects.filter(pk__in=submission_ids)
+        .order_by("assignment_id")
+        .values_list(
+            "assignment_id", "assignment__question", "classroom_id", "student__user_id"
+        )
+    )
+    for (_, question, classroom_id), graded in groupby(
+        list(submissions), key=lambda row: row[:3]
+    ):
+        fan_out(
+            Notification.Kind.SUBMISSION_GRADED,
+            classroom_id,
+            [user_id for *_, user_id in graded],
+            f"Your submission for {question} was graded",
+        )
+
+
+def mark_read(user, notification_ids=None):
+    """
+    Marks the user's unread notifications read, only those in
+    `notification_ids` when given, and lowers their counter to match.
+    Returns the number marked.
+    """
+    unread = Notification.objects.filter(user_id=user.pk, read_at__isnull=True)
+    if notification_ids is not None:
+        unread = unread.filter(pk__in=notification_ids)
+    with transaction.atomic():
+        marked = unread.update(read_at=timezone.now())
+        if marked:
+            Inbox.objects.filter(user_id=user.pk).update(
+                unread=Greatest(F("unread") - marked, 0)
+            )
+    return marked
+
+
+def unread_count(user):
+    unread = Inbox.objects.filter(user_id=user.pk).values_list("unread", flat=True)
+    return unread.first() or 0
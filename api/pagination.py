@@ -0,0 +1,112 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+
+class KeysetPagination:
+    """
+    Opaque-cursor pagination ordered on (created_date, id), newest first.
+    Each page is a single indexed range query, so paging deep into a
+    list costs the same as reading the first page.
+    """
+
+    page_size = 25
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering = ("-created_date", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request):
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = cursor
+
+        if reverse:
+            queryset = queryset.order_by("created_date", "id")
+            if position is not None:
+                queryset = queryset.filter(
+                    Q(created_date__gt=position[0])
+                    | Q(created_date=position[0], id__gt=position[1])
+                )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+            if position is not None:
+                queryset = queryset.filter(
+                    Q(created_date__lt=position[0])
+                    | Q(created_date=position[0], id__lt=position[1])
+                )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_prev = has_more
+        else:
+            self.has_next = has_more
+            self.has_prev = position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_prev_cursor(self):
+        if not self.has_prev or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response_data(self, data, message):
+        return {
+            "success": True,
+            "message": message,
+            "data": data,
+            "next": self.get_next_cursor(),
+            "prev": self.get_prev_cursor(),
+        }
+
+    def encode_cursor(self, instance, reverse):
+        payload = {
+            "d": instance.created_date.isoformat(),
+            "i": instance.pk,
+            "r": int(reverse),
+        }
+        encoded = json.dumps(payload, separators=(",", ":")).encode("ascii")
+        return base64.urlsafe_b64encode(encoded).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            created_date = parse_datetime(payload["d"])
+            pk = int(payload["i"])
+            reverse = bool(payload["r"])
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, (created_date, pk)
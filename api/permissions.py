@@ -1,15 +1,15 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
-from .models import User
-from django.shortcuts import get_object_or_404
 
 
 class IsInstructorOrReadOnly(BasePermission):
     edit_methods = ("PUT", "PATCH", "POST")
 
     def has_permission(self, request, view):
-        print("executed--")
-        user = get_object_or_404(User, pk=request.user.pk)
-        if request.user.is_superuser:
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+
+        if user.is_superuser:
             return True
 
         if request.method in SAFE_METHODS:
@@ -27,8 +27,11 @@ class IsStudentOrReadOnly(BasePermission):
     edit_methods = ("PUT", "PATCH", "POST")
 
     def has_permission(self, request, view):
-        user = get_object_or_404(User, pk=request.user.pk)
-        if request.user.is_superuser:
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+
+        if user.is_superuser:
             return True
 
         if request.method in SAFE_METHODS:
@@ -0,0 +1,258 @@
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from .models import (
+    Assignment,
+    ClassRoom,
+    CourseMaterial,
+    Instructor,
+    Student,
+    Submission,
+    User,
+)
+from .utils import submission_content_digest
+
+SEED_PASSWORD = "pAssw0rd!"
+SEED_EMAIL_DOMAIN = "seed.sims.test"
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class DatasetSeeder:
+    """
+    Bulk-creates a reproducible dataset: classrooms of students, instructors
+    setting assignments and uploading course material for them, and
+    submissions to those assignments. Every user shares one precomputed
+    password hash and all randomness comes from `seed`, so two runs build
+    the same rows.
+
+    The shape follows real classes rather than a uniform spread: a few
+    classrooms are much larger than the rest, each student has a diligence
+    that decides how many assignments they submit (`submission_rate` on
+    average), scores lean towards the top of the marks, and most deadlines
+    are a week or two out with a long tail.
+    """
+
+    def __init__(
+        self,
+        classrooms=10,
+        students=1000,
+        instructors=20,
+        assignments_per_classroom=20,
+        materials_per_classroom=5,
+        submission_rate=0.8,
+        seed=0,
+        batch_size=5000,
+        log=None,
+    ):
+        self.classrooms = classrooms
+        self.students = students
+        self.instructors = instructors
+        self.assignments_per_classroom = assignments_per_classroom
+        self.materials_per_classroom = materials_per_classroom
+        self.submission_rate = submission_rate
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    @staticmethod
+    def email(role, i):
+        return f"{role}{i}@{SEED_EMAIL_DOMAIN}"
+
+    def run(self):
+        self.password = make_password(SEED_PASSWORD)
+        classroom_ids = self.seed_classrooms()
+        instructor_ids = self.seed_instructors()
+        students = self.seed_students(classroom_ids)
+        assignments = self.seed_assignments(classroom_ids, instructor_ids)
+        self.seed_course_materials(classroom_ids)
+        self.seed_submissions(students, assignments)
+
+    def diligence(self):
+        """How likely one student is to submit any assignment."""
+        if not 0 < self.submission_rate < 1:
+            return min(max(self.submission_rate, 0), 1)
+        # Beta with mean `submission_rate`: most students near it, some idle
+        return self.random.betavariate(
+            4 * self.submission_rate, 4 * (1 - self.submission_rate)
+        )
+
+    def score(self, marks):
+        return round(marks * self.random.betavariate(5, 2))
+
+    def deadline(self, created):
+        days = min(180, 3 + self.random.expovariate(1 / 10))
+        return created + timedelta(days=days)
+
+    def _bulk_create(self, model, rows):
+        created = 0
+        for batch in _batches(rows, self.batch_size):
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+            created += len(batch)
+        self.log(f"{model.__name__}: {created} rows")
+        return created
+
+    def _users(self, role, count, **extra_fields):
+        return (
+            User(
+                email=self.email(role, i),
+                password=self.password,
+                first_name=role.title(),
+                last_name=f"{i:06d}",
+                **extra_fields,
+            )
+            for i in range(count)
+        )
+
+    def seed_classrooms(self):
+        self._bulk_create(
+            ClassRoom,
+            (ClassRoom(name=f"SEED {i:05d}") for i in range(self.classrooms)),
+        )
+        # Backends that can't return ids from a bulk insert get them back here
+        return list(
+            ClassRoom.objects.filter(name__startswith="SEED ")
+            .order_by("name")
+            .values_list("id", flat=True)
+        )
+
+    def seed_instructors(self):
+        self._bulk_create(
+            User, self._users("instructor", self.instructors, is_instructor=True)
+        )
+        users = User.objects.filter(
+            email__endswith=SEED_EMAIL_DOMAIN, is_instructor=True
+        ).values_list("id", flat=True)
+        self._bulk_create(
+            Instructor, (Instructor(user_id=user_id) for user_id in users.iterator())
+        )
+        return list(
+            Instructor.objects.filter(user__email__endswith=SEED_EMAIL_DOMAIN)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def seed_students(self, classroom_ids):
+        self._bulk_create(User, self._users("student", self.students, is_student=True))
+        users = User.objects.filter(
+            email__endswith=SEED_EMAIL_DOMAIN, is_student=True
+        ).values_list("id", flat=True)
+        # Pareto weights give a handful of very large classrooms
+        weights = [self.random.paretovariate(1.5) for _ in classroom_ids]
+        self._bulk_create(
+            Student,
+            (
+                Student(
+                    user_id=user_id,
+                    classroom_id=self.random.choices(classroom_ids, weights)[0],
+                )
+                for user_id in users.order_by("id").iterator()
+            ),
+        )
+        return list(
+            Student.objects.filter(user__email__endswith=SEED_EMAIL_DOMAIN)
+            .order_by("id")
+            .values_list("id", "classroom_id")
+        )
+
+    def seed_assignments(self, classroom_ids, instructor_ids):
+        def assignments():
+            for classroom_id in classroom_ids:
+                for i in range(self.assignments_per_classroom):
+                    created = self.now - timedelta(days=self.random.randint(1, 120))
+                    yield Assignment(
+                        question=f"Seeded question {classroom_id}-{i}",
+                        code=f"S{i}",
+                        course=f"SEED {i % 10}",
+                        instructor_id=self.random.choice(instructor_ids),
+                        classroom_id=classroom_id,
+                        marks=self.random.choice((10, 20, 50, 100)),
+                        created_date=created,
+                        modified_date=created,
+                        due=self.deadline(created),
+                    )
+
+        self._bulk_create(Assignment, assignments())
+        return list(
+            Assignment.objects.filter(question__startswith="Seeded question ")
+            .order_by("id")
+            .values_list(
+                "id", "classroom_id", "instructor_id", "marks", "created_date", "due"
+            )
+        )
+
+    def seed_course_materials(self, classroom_ids):
+        uploaders = list(
+            User.objects.filter(
+                email__endswith=SEED_EMAIL_DOMAIN, is_instructor=True
+            ).values_list("id", flat=True)
+        )
+
+        def materials():
+            for classroom_id in classroom_ids:
+                for i in range(self.materials_per_classroom):
+                    created = self.now - timedelta(days=self.random.randint(1, 120))
+                    file_type, extension = self.random.choice(
+                        (("application/pdf", "pdf"), ("video/mp4", "mp4"))
+                    )
+                    # One upload in twenty was started and never finished
+                    finished = self.random.random() >= 0.05
+                    yield CourseMaterial(
+                        original_file_name=f"Seeded material {i}.{extension}",
+                        file_name=f"seed/{classroom_id}/{i}.{extension}",
+                        file_type=file_type,
+                        uploaded_by_id=self.random.choice(uploaders),
+                        classroom_id=classroom_id,
+                        upload_finished_at=created if finished else None,
+                        verification=CourseMaterial.Verification.VERIFIED
+                        if finished
+                        else CourseMaterial.Verification.PENDING,
+                        verified_at=created if finished else None,
+                        created_date=created,
+                        modified_date=created,
+                    )
+
+        self._bulk_create(CourseMaterial, materials())
+
+    def seed_submissions(self, students, assignments):
+        by_classroom = {}
+        for assignment in assignments:
+            by_classroom.setdefault(assignment[1], []).append(assignment)
+
+        def submissions():
+            for student_id, classroom_id in students:
+                diligence = self.diligence()
+                for assignment in by_classroom.get(classroom_id, ()):
+                    assignment_id, _, instructor_id, marks, created, due = assignment
+                    if self.random.random() >= diligence:
+                        continue
+                    content = f"Answer from {student_id} to {assignment_id}"
+                    # Most answers come in close to the deadline
+                    window = (due - created) * self.random.betavariate(4, 1.5)
+                    submitted = min(created + window, self.now)
+                    yield Submission(
+                        title=f"Answer {assignment_id}",
+                        content=content,
+                        content_digest=submission_content_digest(content),
+                        score=self.score(marks),
+                        assignment_id=assignment_id,
+                        student_id=student_id,
+                        instructor_id=instructor_id,
+                        classroom_id=classroom_id,
+                        created_date=submitted,
+                        modified_date=submitted,
+                    )
+
+        self._bulk_create(Submission, submissions())
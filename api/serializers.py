@@ -4,16 +4,24 @@ from .models import (
     ClassRoom,
     CourseMaterial,
     Instructor,
+    Notification,
     Student,
     Submission,
     User,
 )
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import update_last_login
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models import Q
+from django.db.models import Manager, Q
+from .downloads import DownloadUrlService
+from .tokens import get_profile_claims
+from .utils import submission_content_digest
 
 
 class CookieTokenRefreshSerializer(TokenRefreshSerializer):
@@ -21,14 +29,27 @@ class CookieTokenRefreshSerializer(TokenRefreshSerializer):
 
     def validate(self, attrs):
         attrs["refresh"] = self.context["request"].COOKIES.get("refresh_token")
+        if not attrs["refresh"]:
+            raise InvalidTokenError("No valid token found in cookie  'refresh_token'")
         refresh = RefreshToken(attrs["refresh"])
-        attrs["lifetime"] = int(refresh.access_token.lifetime.total_seconds())
-        attrs["access"] = str(refresh.access_token)
 
-        if attrs["refresh"]:
-            return attrs
-        else:
-            raise InvalidTokenError("No valid token found in cookie  'refresh_token'")
+        user = (
+            User.objects.filter(
+                pk=refresh[api_settings.USER_ID_CLAIM], is_active=True, is_deleted=False
+            )
+            .select_related("student", "instructor")
+            .first()
+        )
+        if user is None:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        access = refresh.access_token
+        # From the user as they are now, not as they were at login
+        for claim, value in get_profile_claims(user).items():
+            access[claim] = value
+
+        attrs["lifetime"] = int(access.lifetime.total_seconds())
+        attrs["access"] = str(access)
+        return attrs
 
 
 class AssignmentSerializer(serializers.ModelSerializer):
@@ -77,6 +98,9 @@ class SubmissionSerializer(serializers.ModelSerializer):
         slug_field="name", queryset=ClassRoom.objects.all(), many=False
     )
     assignment = AssignmentSerializer(read_only=True)
+    assignment_id = serializers.PrimaryKeyRelatedField(
+        source="assignment", queryset=Assignment.objects.all(), write_only=True
+    )
 
     class Meta:
         model = Submission
@@ -85,6 +109,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
             "student_name",
             "instructor_name",
             "assignment",
+            "assignment_id",
             "instructor",
             "classroom",
             "content",
@@ -101,12 +126,16 @@ class SubmissionSerializer(serializers.ModelSerializer):
         }
 
     def create(self, validated_data):
-        submission = Submission.objects.filter(
-            content=validated_data.get("content")
-        ).first()
-        # s = Submission.objects.get(
-        #     Q(content__icontains=validated_data.get('content') | Q(title__contains=validated_data.get('title'))))
-        if submission and submission.status == "SUBMITTED":
+        content = validated_data.get("content", "")
+        duplicate = (
+            content.strip()
+            and Submission.objects.filter(
+                assignment=validated_data["assignment"],
+                content_digest=submission_content_digest(content),
+                status=Submission.Status.SUBMITTED,
+            ).exists()
+        )
+        if duplicate:
             raise serializers.ValidationError(
                 "This submission already exists!, consider changing the Title or content"
             )
@@ -115,6 +144,27 @@ class SubmissionSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class SubmissionGradeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    score = serializers.FloatField(min_value=0)
+    remark = serializers.CharField(
+        max_length=255, allow_blank=True, allow_null=True, required=False
+    )
+
+
+class BulkGradeSerializer(serializers.Serializer):
+    max_grades = 1000
+
+    grades = SubmissionGradeSerializer(many=True, allow_empty=False)
+
+    def validate_grades(self, grades):
+        if len(grades) > self.max_grades:
+            raise serializers.ValidationError(
+                f"At most {self.max_grades} submissions can be graded at once"
+            )
+        return grades
+
+
 class ClassRoomSerializer(serializers.ModelSerializer):
     name = serializers.CharField(read_only=True)
     assignments = serializers.StringRelatedField(many=True)
@@ -167,9 +217,7 @@ class UserRegistrationSerializer(serializers.Serializer):
     is_instructor = serializers.BooleanField(required=False)
 
     def create(self, validated_data):
-        print(f"validated_data ==> {validated_data}")
         classroom = validated_data.pop("classroom")
-        print(validated_data)
         user = User.objects.filter(email=validated_data["email"]).exists()
         if not user:
             user = User.objects.create_user(**validated_data)
@@ -201,6 +249,11 @@ class UserLoginSerializer(serializers.Serializer):
         if user is None:
             raise serializers.ValidationError("Email or password is incorrect!")
 
+        return self.get_login_attrs(attrs, user)
+
+    @staticmethod
+    def get_login_attrs(attrs, user):
+        """Profile details returned to a user whose password has been checked."""
         try:
             student = Student.objects.get(user=user) if user.is_student else None
             instructor = (
@@ -221,18 +274,64 @@ class UserLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Email or password incorrect")
 
 
+class AsyncUserLoginSerializer(UserLoginSerializer):
+    """
+    Validates the login fields only; the async login view checks the
+    password itself on the hashing pool.
+    """
+
+    def validate(self, attrs):
+        return attrs
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = "__all__"
 
 
+class CourseMaterialListSerializer(serializers.ListSerializer):
+    """Presigns the download URLs of the whole page or chunk in one batch."""
+
+    def to_representation(self, data):
+        materials = list(data.all() if isinstance(data, Manager) else data)
+        self.download_urls = DownloadUrlService.get_urls(
+            material.file.name for material in materials if material.file
+        )
+        return super().to_representation(materials)
+
+
 class CourseMaterialSerializer(serializers.ModelSerializer):
     uploaded_by = serializers.StringRelatedField(many=False, read_only=True)
+    file = serializers.SerializerMethodField()
+    verified = serializers.BooleanField(source="is_valid", read_only=True)
 
     class Meta:
         model = CourseMaterial
-        fields = "__all__"
+        # Listed explicitly so the multipart upload id and what verification
+        # found in S3 stay server-side
+        fields = (
+            "id",
+            "file",
+            "original_file_name",
+            "file_name",
+            "file_type",
+            "upload_finished_at",
+            "verified",
+            "uploaded_by",
+            "classroom",
+            "created_date",
+            "modified_date",
+        )
+        list_serializer_class = CourseMaterialListSerializer
+
+    def get_file(self, material):
+        if not material.file:
+            return None
+        urls = getattr(self.parent, "download_urls", None)
+        if urls is None:
+            return DownloadUrlService.get_url(material.file.name)
+        return urls[material.file.name]
 
 
 class CourseMaterialStartSerializer(serializers.Serializer):
@@ -243,5 +342,70 @@ class CourseMaterialStartSerializer(serializers.Serializer):
     )
 
 
+class CourseMaterialMultipartStartSerializer(CourseMaterialStartSerializer):
+    file_size = serializers.IntegerField(
+        min_value=1, max_value=settings.FILE_MULTIPART_MAX_SIZE
+    )
+
+
+class CourseMaterialPartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1)
+    etag = serializers.CharField()
+
+
 class CourseMaterialFinishSerializer(serializers.Serializer):
     file_id = serializers.IntegerField()
+    # Only used to complete or abort multipart uploads
+    parts = CourseMaterialPartSerializer(many=True, required=False)
+    abort = serializers.BooleanField(default=False)
+
+
+class CourseMaterialFileSerializer(serializers.Serializer):
+    file_name = serializers.CharField()
+    file_type = serializers.CharField()
+
+
+class CourseMaterialBatchStartSerializer(serializers.Serializer):
+    max_files = 50
+
+    files = CourseMaterialFileSerializer(many=True, allow_empty=False)
+    classroom = serializers.SlugRelatedField(
+        slug_field="name", queryset=ClassRoom.objects.all(), many=False
+    )
+
+    def validate_files(self, files):
+        if len(files) > self.max_files:
+            raise serializers.ValidationError(
+                f"At most {self.max_files} files can be uploaded at once"
+            )
+        return files
+
+
+class CourseMaterialBatchFinishSerializer(serializers.Serializer):
+    file_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=CourseMaterialBatchStartSerializer.max_files,
+    )
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = (
+            "id",
+            "kind",
+            "classroom",
+            "message",
+            "count",
+            "read_at",
+            "created_date",
+            "modified_date",
+        )
+
+
+class NotificationReadSerializer(serializers.Serializer):
+    # Leave out to mark every notification read
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, required=False
+    )
@@ -1,7 +1,37 @@
+import itertools
+import math
 import pathlib
 from uuid import uuid4
-from .models import CourseMaterial
-from .aws_integrations import s3_generate_presigned_post
+from .caching import ClassroomResponseCache
+from .models import Assignment, ClassRoom, CourseMaterial, Student, Submission
+from .jobs import defer, task
+from .notifications import notify_submissions_graded
+from .aws_integrations import (
+    s3_abort_multipart_upload,
+    s3_complete_multipart_upload,
+    s3_create_multipart_upload,
+    s3_generate_presigned_part_urls,
+    s3_generate_presigned_post,
+    s3_head_objects,
+    s3_list_multipart_uploads,
+)
+from .serializers import AssignmentSerializer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    Count,
+    FilteredRelation,
+    FloatField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.utils import timezone
 
 # def create_assignment_service(reequest, validated_data):
@@ -15,6 +45,16 @@ from django.utils import timezone
 #     return Assignments.objects.create(validated_data)
 
 
+# S3 allows at most 10,000 parts per multipart upload
+S3_MAX_PARTS = 10000
+# Checksums HEAD can report, strongest first; the first present is recorded
+S3_CHECKSUMS = ("SHA256", "SHA1", "CRC32C", "CRC32")
+
+# Sent by expire_overdue_assignments with `assignment_ids` and `classroom_ids`
+# for each batch of assignments it moved to EXPIRED
+assignments_expired = Signal()
+
+
 def file_generate_name(original_file_name):
     extension = pathlib.Path(original_file_name).suffix
 
@@ -22,33 +62,555 @@ def file_generate_name(original_file_name):
 
 
 class FileDirectUploadService:
+    upload_prefix = "file"
+
     def __init__(self, user) -> None:
         self.user = user
 
-    def start(self, file_name, file_type, classroom):
-        cm = CourseMaterial(
+    def _build(self, file_name, file_type, classroom):
+        generated_name = file_generate_name(file_name)
+        return CourseMaterial(
             original_file_name=file_name,
-            file_name=file_generate_name(file_name),
+            file_name=generated_name,
             file_type=file_type,
-            uploaded_by=self.user,
+            uploaded_by_id=self.user.pk,
             classroom=classroom,
-            file=None,
+            file=f"{self.upload_prefix}/{generated_name}",
+        )
+
+    def _presign(self, cm):
+        presigned_data = s3_generate_presigned_post(
+            file_path=cm.file.name, file_type=cm.file_type
         )
+        return {"id": cm.id, **presigned_data}
+
+    def start(self, file_name, file_type, classroom):
+        cm = self._build(file_name, file_type, classroom)
         cm.save()
-        upload_path = f"file/{cm.file_name}"
-        cm.file = cm.file.field.attr_class(cm, cm.file.field, upload_path)
 
+        return self._presign(cm)
+
+    def start_many(self, files, classroom):
+        """
+        Creates every CourseMaterial in a single INSERT and presigns each
+        upload with the shared S3 client.
+        """
+        materials = [
+            self._build(file["file_name"], file["file_type"], classroom)
+            for file in files
+        ]
+        CourseMaterial.objects.bulk_create(materials)
+
+        # Backends that can't return ids from a bulk insert (SQLite) get them
+        # back through the unique, pre-generated file names
+        if any(cm.pk is None for cm in materials):
+            ids = dict(
+                CourseMaterial.objects.filter(
+                    file_name__in=[cm.file_name for cm in materials]
+                )
+                .order_by()
+                .values_list("file_name", "id")
+            )
+            for cm in materials:
+                cm.id = ids[cm.file_name]
+
+        # bulk_create sends no signals
+        ClassroomResponseCache.bump([cm.classroom_id for cm in materials])
+
+        return [self._presign(cm) for cm in materials]
+
+    def start_multipart(self, file_name, file_type, file_size, classroom):
+        """
+        Opens an S3 multipart upload and presigns a URL for every part so the
+        client can PUT them in parallel, then complete or abort through
+        `finish_multipart` / `abort_multipart`.
+        """
+        part_size = max(
+            settings.FILE_MULTIPART_PART_SIZE,
+            math.ceil(file_size / S3_MAX_PARTS),
+        )
+        part_count = math.ceil(file_size / part_size)
+
+        cm = self._build(file_name, file_type, classroom)
+        cm.declared_size = file_size
+        cm.upload_id = s3_create_multipart_upload(
+            file_path=cm.file.name, file_type=cm.file_type
+        )
         cm.save()
 
-        presigned_data = s3_generate_presigned_post(
-            file_path=upload_path, file_type=cm.file_type
+        parts = s3_generate_presigned_part_urls(
+            file_path=cm.file.name, upload_id=cm.upload_id, part_count=part_count
         )
 
-        return {"id": cm.id, **presigned_data}
+        return {
+            "id": cm.id,
+            "upload_id": cm.upload_id,
+            "part_size": part_size,
+            "parts": parts,
+        }
+
+    def finish_multipart(self, file, parts):
+        s3_complete_multipart_upload(
+            file_path=file.file.name, upload_id=file.upload_id, parts=parts
+        )
+        file.upload_id = None
+
+        return self.finish(file)
+
+    def abort_multipart(self, file):
+        s3_abort_multipart_upload(file_path=file.file.name, upload_id=file.upload_id)
+        file.delete()
 
     def finish(self, file):
+        """
+        Marks the upload finished and queues `verify_uploads` for it; the
+        material is listed to students once the object has been checked.
+        """
         file.upload_finished_at = timezone.now()
         file.full_clean()
-        file.save()
+        with transaction.atomic():
+            file.save()
+            defer(verify_uploads, [file.pk])
 
         return file
+
+    def finish_many(self, file_ids):
+        """
+        Marks the user's pending uploads among `file_ids` as finished in a
+        single UPDATE, queues one `verify_uploads` job for all of them and
+        returns the ids that were finished.
+        """
+        queryset = CourseMaterial.objects.filter(
+            id__in=file_ids, uploaded_by_id=self.user.pk, upload_finished_at__isnull=True
+        )
+        with transaction.atomic():
+            finished = list(
+                queryset.select_for_update().values_list("id", "classroom_id")
+            )
+            finished_ids = [file_id for file_id, _ in finished]
+            now = timezone.now()
+            CourseMaterial.objects.filter(id__in=finished_ids).update(
+                upload_finished_at=now, modified_date=now
+            )
+            if finished_ids:
+                defer(verify_uploads, finished_ids)
+
+        # update() sends no signals
+        ClassroomResponseCache.bump([classroom_id for _, classroom_id in finished])
+
+        return finished_ids
+
+
+class GradingError(Exception):
+    pass
+
+
+class BulkGradingService:
+    """
+    Grades many submissions of one assignment at once. Ownership and the
+    deadline are checked once for the assignment and every accepted grade
+    is written with a single bulk_update.
+    """
+
+    def __init__(self, user) -> None:
+        self.user = user
+
+    def get_assignment(self, assignment_id):
+        return Assignment.objects.only(
+            "id", "due", "status", "marks", "instructor_id"
+        ).get(pk=assignment_id, instructor_id=self.user.instructor.pk)
+
+    def grade(self, assignment, grades):
+        if assignment.has_expired():
+            raise GradingError("Cannot mark submission after submission date")
+
+        results = {}
+        seen = set()
+        for grade in grades:
+            if grade["id"] in seen:
+                results[grade["id"]] = "Submission appears more than once"
+            elif grade["score"] > assignment.marks:
+                results[grade["id"]] = f"Score cannot exceed {assignment.marks}"
+            seen.add(grade["id"])
+        accepted = {
+            grade["id"]: grade for grade in grades if grade["id"] not in results
+        }
+
+        now = timezone.now()
+        with transaction.atomic():
+            submissions = list(
+                Submission.objects.select_for_update()
+                .select_related("student")
+                .only("id", "score", "remark", "modified_date", "student__user_id")
+                .filter(assignment=assignment, id__in=accepted)
+            )
+            for submission in submissions:
+                grade = accepted[submission.id]
+                submission.score = grade["score"]
+                if "remark" in grade:
+                    submission.remark = grade["remark"]
+                submission.modified_date = now
+            Submission.objects.bulk_update(
+                submissions, ["score", "remark", "modified_date"]
+            )
+
+        # bulk_update sends no signals, so refresh the graded students' dashboards
+        StudentDashboardService.invalidate(
+            {submission.student.user_id for submission in submissions}
+        )
+
+        graded = {submission.id for submission in submissions}
+        if graded:
+            defer(notify_submissions_graded, sorted(graded))
+        for submission_id in accepted:
+            if submission_id not in graded:
+                results[submission_id] = "Submission not found for this assignment"
+
+        return [
+            {"id": grade["id"], "success": True}
+            if grade["id"] in graded
+            else {"id": grade["id"], "success": False, "message": results[grade["id"]]}
+            for grade in grades
+        ]
+
+
+class GradebookService:
+    """
+    Builds an instructor's gradebook for a classroom: one row per student,
+    one column per assignment and a total. Every cell comes from a single
+    grouped query that is read through a cursor, so rows can be streamed
+    out as they arrive.
+    """
+
+    chunk_size = 2000
+
+    def __init__(self, user) -> None:
+        self.user = user
+
+    def get_classroom(self, classroom_id):
+        """Only classrooms the instructor has set assignments for."""
+        return ClassRoom.objects.filter(
+            assignments__instructor_id=self.user.instructor.pk
+        ).distinct().get(pk=classroom_id)
+
+    def get_assignments(self, classroom):
+        return list(
+            Assignment.objects.filter(
+                classroom=classroom, instructor_id=self.user.instructor.pk
+            )
+            .order_by("created_date", "id")
+            .only("id", "code", "question", "marks")
+        )
+
+    def get_scores(self, classroom, assignments):
+        # LEFT JOIN so students without submissions still get a row, grouped
+        # to one best score per (student, assignment)
+        return (
+            Student.objects.filter(classroom=classroom)
+            .annotate(
+                graded=FilteredRelation(
+                    "submissions",
+                    condition=Q(submissions__assignment__in=assignments),
+                )
+            )
+            .values(
+                "id",
+                "user__email",
+                "user__first_name",
+                "user__last_name",
+                "graded__assignment_id",
+            )
+            .annotate(score=Max("graded__score"))
+            .order_by("user__last_name", "user__first_name", "id")
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+    def rows(self, classroom):
+        assignments = self.get_assignments(classroom)
+        yield [
+            "Email",
+            "First name",
+            "Last name",
+            *(
+                f"{assignment.code or assignment.question} ({assignment.marks})"
+                for assignment in assignments
+            ),
+            f"Total ({sum(assignment.marks for assignment in assignments)})",
+        ]
+
+        columns = {assignment.id: i for i, assignment in enumerate(assignments)}
+        scores = self.get_scores(classroom, assignments)
+        for _, cells in itertools.groupby(scores, key=lambda cell: cell["id"]):
+            cells = list(cells)
+            row = [None] * len(columns)
+            for cell in cells:
+                if cell["graded__assignment_id"] is not None:
+                    row[columns[cell["graded__assignment_id"]]] = cell["score"]
+            student = cells[0]
+            yield [
+                student["user__email"],
+                student["user__first_name"],
+                student["user__last_name"],
+                *row,
+                sum(score for score in row if score is not None),
+            ]
+
+
+def sweep_abandoned_multipart_uploads(older_than):
+    """
+    Aborts multipart uploads started before `older_than` that were never
+    completed, including ones S3 still holds for rows that no longer exist,
+    and deletes their CourseMaterial rows. Returns the number aborted.
+    """
+    stale = CourseMaterial.objects.filter(
+        upload_id__isnull=False,
+        upload_finished_at__isnull=True,
+        created_date__lt=older_than,
+    )
+    aborted = set()
+    for file_path, upload_id in stale.values_list("file", "upload_id").iterator():
+        s3_abort_multipart_upload(file_path=file_path, upload_id=upload_id)
+        aborted.add(upload_id)
+    stale.delete()
+
+    prefix = f"{FileDirectUploadService.upload_prefix}/"
+    for upload in s3_list_multipart_uploads(prefix=prefix):
+        upload_id = upload["UploadId"]
+        if upload_id in aborted or upload["Initiated"] >= older_than:
+            continue
+        if CourseMaterial.objects.filter(upload_id=upload_id).exists():
+            continue
+        s3_abort_multipart_upload(file_path=upload["Key"], upload_id=upload_id)
+        aborted.add(upload_id)
+
+    return len(aborted)
+
+
+class UploadVerificationError(Exception):
+    pass
+
+
+def upload_verification_error(material, head):
+    """Why S3's `head` of the object doesn't match the upload, or "" if it does."""
+    if head is None:
+        return "File was not found in storage"
+    size = head["ContentLength"]
+    if material.declared_size is not None and size != material.declared_size:
+        return f"File is {size} bytes, {material.declared_size} were declared"
+    max_size = settings.FILE_MAX_SIZE
+    if material.declared_size is None and not 0 < size <= max_size:
+        return f"File is {size} bytes, outside the allowed 1 to {max_size}"
+    if material.file_type and head.get("ContentType") != material.file_type:
+        return f"File is {head.get('ContentType')}, {material.file_type} was declared"
+    return ""
+
+
+@task
+def verify_uploads(material_ids):
+    """
+    Checks finished uploads against the bucket, off the request path: the
+    objects are HEADed concurrently, then a single bulk_update records their
+    size, ETag and checksum and marks each VERIFIED or REJECTED. Uploads S3
+    didn't answer for stay PENDING and the job fails so they are retried.
+    """
+    materials = list(
+        CourseMaterial.objects.filter(
+            pk__in=material_ids,
+            upload_finished_at__isnull=False,
+            verification=CourseMaterial.Verification.PENDING,
+        )
+        .order_by("pk")
+        .only("file", "file_type", "declared_size", "classroom_id")
+    )
+    if not materials:
+        return
+    heads = s3_head_objects(material.file.name for material in materials)
+
+    now = timezone.now()
+    checked, errors = [], []
+    for material in materials:
+        head = heads[material.file.name]
+        if isinstance(head, Exception):
+            errors.append(f"{material.file.name}: {head!r}")
+            continue
+        reported = head or {}
+        material.size = reported.get("ContentLength")
+        material.etag = reported.get("ETag", "").strip('"')
+        material.checksum = next(
+            (
+                f"{algorithm.lower()}:{reported['Checksum' + algorithm]}"
+                for algorithm in S3_CHECKSUMS
+                if reported.get("Checksum" + algorithm)
+            ),
+            "",
+        )
+        material.verification_error = upload_verification_error(material, head)
+        material.verification = (
+            CourseMaterial.Verification.REJECTED
+            if material.verification_error
+            else CourseMaterial.Verification.VERIFIED
+        )
+        material.verified_at = material.modified_date = now
+        checked.append(material)
+
+    CourseMaterial.objects.bulk_update(
+        checked,
+        [
+            "size",
+            "etag",
+            "checksum",
+            "verification",
+            "verification_error",
+            "verified_at",
+            "modified_date",
+        ],
+    )
+    # bulk_update sends no signals; newly verified materials join the listings
+    ClassroomResponseCache.bump(
+        [
+            material.classroom_id
+            for material in checked
+            if material.verification == CourseMaterial.Verification.VERIFIED
+        ]
+    )
+    if errors:
+        raise UploadVerificationError(
+            f"Could not check {len(errors)} uploads: {'; '.join(errors)}"
+        )
+
+
+def expire_overdue_assignments(now=None, batch_size=1000):
+    """
+    Locks every PENDING assignment past its deadline and moves exactly
+    those rows to EXPIRED, `batch_size` primary keys per UPDATE, then sends
+    `assignments_expired` once per batch after the commit. Returns the
+    number expired.
+    """
+    now = now or timezone.now()
+    overdue = Assignment.objects.filter(status=Assignment.Status.PENDING, due__lt=now)
+    with transaction.atomic():
+        # Locked, so a concurrent sweep waits and then finds nothing to expire
+        expired = list(
+            overdue.select_for_update().order_by().values_list("id", "classroom_id")
+        )
+        if not expired:
+            return 0
+        # Only the locked rows; re-running `overdue` could catch newly due ones
+        for start in range(0, len(expired), batch_size):
+            Assignment.objects.filter(
+                pk__in=[pk for pk, _ in expired[start : start + batch_size]]
+            ).update(status=Assignment.Status.EXPIRED, modified_date=now)
+
+    for start in range(0, len(expired), batch_size):
+        assignment_ids, classroom_ids = zip(*expired[start : start + batch_size])
+        assignments_expired.send(
+            sender=Assignment,
+            assignment_ids=list(assignment_ids),
+            classroom_ids=set(classroom_ids),
+        )
+    return len(expired)
+
+
+def _scalar_subquery(queryset, group_by, aggregate, default):
+    aggregated = (
+        queryset.order_by().values(group_by).annotate(value=aggregate).values("value")
+    )
+    return Coalesce(Subquery(aggregated), default)
+
+
+class StudentDashboardService:
+    """
+    Builds the student profile dashboard. Totals come from a single
+    aggregated query and the whole payload is cached per user until a
+    Submission or Assignment in the student's classroom changes.
+    """
+
+    cache_timeout = 60 * 15
+    latest_entities_count = 15
+
+    def __init__(self, user) -> None:
+        self.user = user
+
+    @staticmethod
+    def cache_key(user_id):
+        return f"dashboard:user:{user_id}"
+
+    @classmethod
+    def invalidate(cls, user_ids):
+        cache.delete_many([cls.cache_key(user_id) for user_id in user_ids])
+
+    def get(self):
+        key = self.cache_key(self.user.pk)
+        data = cache.get(key)
+        if data is None:
+            data = self._build()
+            cache.set(key, data, self.cache_timeout)
+        return data
+
+    def _build(self):
+        totals = self._get_totals()
+        latest_assignments = Assignment.objects.select_related(
+            *Assignment.objects.list_related_fields
+        ).filter(classroom_id=totals["classroom_id"])[: self.latest_entities_count]
+
+        total_marks = totals["total_marks"]
+        total_submissions = totals["total_submissions"]
+        return {
+            "cumulative_grades": (
+                round(totals["total_score"] / total_marks * 100, 2)
+                if total_marks
+                else 0
+            ),
+            "total_score": totals["total_score"],
+            "total_marks": total_marks,
+            "total_assignments": totals["total_assignments"],
+            "total_submissions": total_submissions,
+            "submissions_progress": (
+                round(totals["submitted"] / total_submissions * 100, 2)
+                if total_submissions
+                else 0
+            ),
+            "latest_assignments": AssignmentSerializer(
+                latest_assignments, many=True
+            ).data,
+        }
+
+    def _get_totals(self):
+        assignments = Assignment.objects.filter(classroom=OuterRef("classroom"))
+        submissions = Submission.objects.filter(student=OuterRef("pk"))
+
+        return (
+            Student.objects.filter(user_id=self.user.pk)
+            .annotate(
+                total_assignments=_scalar_subquery(
+                    assignments, "classroom", Count("id"), Value(0)
+                ),
+                total_marks=_scalar_subquery(
+                    assignments, "classroom", Sum("marks"), Value(0)
+                ),
+                total_submissions=_scalar_subquery(
+                    submissions, "student", Count("id"), Value(0)
+                ),
+                submitted=_scalar_subquery(
+                    submissions,
+                    "student",
+                    Count("id", filter=Q(status=Submission.Status.SUBMITTED)),
+                    Value(0),
+                ),
+                total_score=_scalar_subquery(
+                    submissions,
+                    "student",
+                    Sum("score"),
+                    Value(0.0, output_field=FloatField()),
+                ),
+            )
+            .values(
+                "classroom_id",
+                "total_assignments",
+                "total_marks",
+                "total_submissions",
+                "submitted",
+                "total_score",
+            )
+            .get()
+        )
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+
+from .aws_integrations import s3_reset_client
+from .caching import ClassroomResponseCache
+from .instrumentation import install_request_recorder
+from .models import Assignment, ClassRoom, CourseMaterial, Student, Submission, User
+from .jobs import defer
+from .notifications import notify_assignment_created
+from .services import StudentDashboardService, assignments_expired
+from .tokens import user_active_key
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_user_active(sender, instance, **kwargs):
+    # Deactivated or deleted users are rejected from their next request on
+    cache.delete(user_active_key(instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Submission)
+def invalidate_student_dashboard(sender, instance, **kwargs):
+    user_ids = Student.objects.filter(pk=instance.student_id).values_list(
+        "user_id", flat=True
+    )
+    StudentDashboardService.invalidate(user_ids)
+
+
+def _affected_classroom_ids(instance):
+    classroom_ids = {instance.classroom_id}
+    previous = getattr(instance, "_previous_classroom_id", None)
+    if previous is not None:
+        classroom_ids.add(previous)
+    return sorted(classroom_ids)
+
+
+@receiver(pre_save, sender=Assignment)
+def remember_previous_classroom(sender, instance, raw=False, **kwargs):
+    # A moved assignment also leaves the listings of the classroom it was in
+    instance._previous_classroom_id = None
+    if instance.pk is not None and not raw:
+        instance._previous_classroom_id = (
+            Assignment.objects.filter(pk=instance.pk)
+            .values_list("classroom_id", flat=True)
+            .first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+def invalidate_classroom_dashboards(sender, instance, **kwargs):
+    user_ids = Student.objects.filter(
+        classroom_id__in=_affected_classroom_ids(instance)
+    ).values_list("user_id", flat=True)
+    StudentDashboardService.invalidate(user_ids)
+
+
+@receiver(post_save, sender=Assignment)
+def notify_classroom_of_new_assignment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        defer(notify_assignment_created, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Assignment)
+@receiver([post_save, post_delete], sender=CourseMaterial)
+def bump_classroom_response_cache(sender, instance, **kwargs):
+    ClassroomResponseCache.bump(_affected_classroom_ids(instance))
+
+
+@receiver([post_save, post_delete], sender=ClassRoom)
+def bump_renamed_classroom_response_cache(sender, instance, **kwargs):
+    # Listings render the classroom name
+    ClassroomResponseCache.bump([instance.pk])
+
+
+@receiver(assignments_expired)
+def refresh_expired_assignment_listings(sender, classroom_ids, **kwargs):
+    # update() sends no post_save, so do what the receivers above would
+    ClassroomResponseCache.bump(classroom_ids)
+    user_ids = Student.objects.filter(classroom_id__in=classroom_ids).values_list(
+        "user_id", flat=True
+    )
+    StudentDashboardService.invalidate(user_ids)
+
+
+@receiver(connection_created)
+def record_async_request_queries(sender, connection, **kwargs):
+    install_request_recorder(connection)
+
+
+@receiver(setting_changed)
+def reset_s3_client(sender, setting, **kwargs):
+    if setting.startswith("AWS_") or setting == "FILE_MAX_SIZE":
+        s3_reset_client()
@@ -0,0 +1,53 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class JSONListStreamer:
+    """
+    Streams a whole list endpoint as JSON instead of rendering it in memory.
+    Rows are read with a database cursor in chunks and serialized one chunk
+    at a time, so peak memory is bounded by chunk_size whatever the row count.
+    The body keeps the paginated envelope, with no next or previous page.
+    """
+
+    chunk_size = 500
+    stream_query_param = "stream"
+    ordering = ("-created_date", "-id")
+    content_type = "application/json"
+
+    def __init__(self, serializer_class, chunk_size=None):
+        self.serializer_class = serializer_class
+        if chunk_size is not None:
+            self.chunk_size = chunk_size
+        self.encoder = JSONEncoder()
+
+    def should_stream(self, request):
+        value = request.query_params.get(self.stream_query_param, "")
+        return value.lower() in ("1", "true", "yes")
+
+    def get_response(self, queryset, message):
+        response = StreamingHttpResponse(
+            self.stream(queryset, message), content_type=self.content_type
+        )
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def stream(self, queryset, message):
+        rows = queryset.order_by(*self.ordering).iterator(chunk_size=self.chunk_size)
+        yield '{"success": true, "message": %s, "data": [' % self.encoder.encode(
+            message
+        )
+
+        separator = ""
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            data = self.serializer_class(chunk, many=True).data
+            yield separator + ", ".join(self.encoder.encode(item) for item in data)
+            separator = ", "
+
+        yield '], "next": null, "prev": null}'
+
@@ -0,0 +1,71 @@
+import functools
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.urls import resolve
+
+from api.instrumentation import QueryRecorder
+
+# Running one statement shape more often than this in a request is an N+1
+DEFAULT_MAX_REPEATS = 2
+
+
+def _check(testcase, recorder, budget, max_repeats, label):
+    testcase.assertLessEqual(
+        recorder.count,
+        budget,
+        f"{label} ran {recorder.count} queries, over its budget of {budget}",
+    )
+    shape, repeats = recorder.most_repeated
+    testcase.assertLessEqual(
+        repeats,
+        max_repeats,
+        f"{label} ran the same query {repeats} times (N+1?):\n{shape}",
+    )
+
+
+def query_budget(budget, max_repeats=DEFAULT_MAX_REPEATS):
+    """Fails the decorated test if its body goes over `budget` queries."""
+
+    def decorator(test):
+        @functools.wraps(test)
+        def wrapper(testcase, *args, **kwargs):
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                result = test(testcase, *args, **kwargs)
+            _check(testcase, recorder, budget, max_repeats, test.__name__)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+class QueryBudgetMixin:
+    """
+    Requests a view and fails unless it stays within the `query_budgets`
+    the view class declares for that method, without repeating a query.
+    Streamed bodies are read inside the budget.
+    """
+
+    max_repeats = DEFAULT_MAX_REPEATS
+
+    def request_within_budget(self, method, path, **kwargs):
+        view = resolve(urlsplit(path).path).func.view_class
+        budget = getattr(view, "query_budgets", {}).get(method.upper())
+        if budget is None:
+            self.fail(f"{view.__name__} declares no {method.upper()} query budget")
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = getattr(self.client, method.lower())(path, **kwargs)
+            if response.streaming:
+                response.streaming_content = [b"".join(response.streaming_content)]
+        _check(
+            self,
+            recorder,
+            budget,
+            self.max_repeats,
+            f"{method.upper()} {view.__name__}",
+        )
+        return response
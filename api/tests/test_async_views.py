@@ -0,0 +1,121 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.utils.module_loading import import_string
+
+from api.hashing import HashingPoolSaturated, PasswordHashingPool
+from api.models import ClassRoom, Student, User
+
+PASSWORD = "pAssw0rd!"
+
+# Cheap hasher so the tests exercise the pool, not PBKDF2
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AsyncAuthViewsTest(TransactionTestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.user = User.objects.create_user(
+            email="student@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Student",
+            is_student=True,
+        )
+        Student.objects.create(user=self.user, classroom=self.classroom)
+
+    def test_login(self):
+        response = self.client.post(
+            "/api/v1/login/async",
+            {"email": "student@example.com", "password": PASSWORD},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data["success"])
+        self.assertIn("token", data)
+        self.assertEqual(data["user"]["pk"], str(self.user.pk))
+        self.assertIn("refresh_token", response.cookies)
+        self.assertIn("X-Password-Queue-Depth", response)
+
+    def test_login_with_wrong_password(self):
+        response = self.client.post(
+            "/api/v1/login/async",
+            {"email": "student@example.com", "password": "wrong"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            "/api/v1/login/async",
+            {"email": "nobody@example.com", "password": PASSWORD},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_register(self):
+        response = self.client.post(
+            "/api/v1/register/async",
+            {
+                "email": "new@example.com",
+                "password": PASSWORD,
+                "first_name": "New",
+                "last_name": "Student",
+                "is_student": True,
+                "classroom": "CPE 500L",
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(email="new@example.com")
+        self.assertTrue(user.check_password(PASSWORD))
+        self.assertEqual(user.student.classroom, self.classroom)
+
+    def test_saturated_pool_rejects_logins(self):
+        with mock.patch(
+            "api.async_views.get_hashing_pool",
+            return_value=PasswordHashingPool(max_workers=1, max_queue=0),
+        ) as get_pool:
+            get_pool.return_value._pending = 1
+            response = self.client.post(
+                "/api/v1/login/async",
+                {"email": "student@example.com", "password": PASSWORD},
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class PasswordHashingPoolTest(TransactionTestCase):
+    def test_metrics_and_bound(self):
+        pool = PasswordHashingPool(max_workers=2, max_queue=1)
+        encoded = make_password(PASSWORD)
+
+        async def burst():
+            return await asyncio.gather(
+                *(pool.check_password(PASSWORD, encoded) for _ in range(4)),
+                return_exceptions=True,
+            )
+
+        results = async_to_sync(burst)()
+        self.assertEqual(results[:3], [True, True, True])
+        self.assertIsInstance(results[3], HashingPoolSaturated)
+        metrics = pool.metrics()
+        self.assertEqual(metrics["completed"], 3)
+        self.assertEqual(metrics["rejected"], 1)
+        self.assertEqual(metrics["queue_depth"], 0)
+        pool.shutdown()
+
+
+class AsyncMiddlewareStackTest(SimpleTestCase):
+    def test_every_middleware_is_async_capable(self):
+        # One sync-only middleware runs every ASGI request through a thread
+        for path in settings.MIDDLEWARE:
+            with self.subTest(middleware=path):
+                self.assertTrue(getattr(import_string(path), "async_capable", False))
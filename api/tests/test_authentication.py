@@ -0,0 +1,128 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.authentication import ProfileTokenUser
+from api.models import Assignment, ClassRoom, Instructor, Student, User
+from api.utils import get_tokens_for_user
+
+PASSWORD = "pAssw0rd!"
+
+
+class ProfileTokenAuthenticationTest(APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        instructor_user = User.objects.create_user(
+            email="instructor@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        self.instructor = Instructor.objects.create(user=instructor_user)
+        student_user = User.objects.create_user(
+            email="student@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Student",
+            is_student=True,
+        )
+        self.student = Student.objects.create(
+            user=student_user, classroom=self.classroom
+        )
+        Assignment.objects.create(
+            question="Question",
+            course="CPE 501",
+            instructor=self.instructor,
+            classroom=self.classroom,
+            marks=10,
+        )
+
+    def _authenticate(self, user):
+        token = get_tokens_for_user(user)["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+    def test_tokens_carry_profile_claims(self):
+        refresh = RefreshToken(get_tokens_for_user(self.student.user)["refresh"])
+        access = refresh.access_token
+        self.assertTrue(access["is_student"])
+        self.assertFalse(access["is_instructor"])
+        self.assertEqual(access["student_id"], self.student.pk)
+        self.assertEqual(access["classroom_id"], self.classroom.pk)
+        self.assertIsNone(access["instructor_id"])
+
+    def test_student_list_needs_no_auth_queries(self):
+        self._authenticate(self.student.user)
+        # The ETag validators and the assignments page are the only queries
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/assignments")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 1)
+
+    def test_instructor_list_needs_no_auth_queries(self):
+        self._authenticate(self.instructor.user)
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/v1/assignments")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 1)
+
+    def test_roles_from_claims_gate_writes(self):
+        self._authenticate(self.student.user)
+        response = self.client.post(
+            "/api/v1/assignments",
+            {"question": "New", "course": "CPE 501", "classroom": "CPE 500L", "marks": 5},
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self._authenticate(self.instructor.user)
+        response = self.client.post(
+            "/api/v1/assignments",
+            {"question": "New", "course": "CPE 501", "classroom": "CPE 500L", "marks": 5},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["data"]["instructor"], self.instructor.pk)
+
+    def test_tokens_without_claims_fall_back_to_database(self):
+        token = RefreshToken.for_user(self.student.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        response = self.client.get("/api/v1/assignments")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIsInstance(response.wsgi_request.user, ProfileTokenUser)
+
+    def test_deactivated_users_are_rejected(self):
+        self._authenticate(self.student.user)
+        self.assertEqual(
+            self.client.get("/api/v1/assignments").status_code, status.HTTP_200_OK
+        )
+
+        self.student.user.is_active = False
+        self.student.user.save()
+        response = self.client.get("/api/v1/assignments")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_users_are_rejected(self):
+        self._authenticate(self.student.user)
+        self.student.user.delete()
+        response = self.client.get("/api/v1/assignments")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_access_tokens_are_short_lived(self):
+        refresh = RefreshToken(get_tokens_for_user(self.student.user)["refresh"])
+        self.assertLessEqual(refresh.access_token.lifetime.total_seconds(), 3600)
+
+    def test_refresh_reads_claims_from_the_user(self):
+        tokens = get_tokens_for_user(self.student.user)
+        other = ClassRoom.objects.create(name="CPE 400L")
+        self.student.classroom = other
+        self.student.save()
+
+        self.client.cookies["refresh_token"] = tokens["refresh"]
+        response = self.client.post("/api/v1/token/refresh")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data["access"])
+        self.assertEqual(access["classroom_id"], other.pk)
+
+        self.student.user.is_active = False
+        self.student.user.save()
+        response = self.client.post("/api/v1/token/refresh")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
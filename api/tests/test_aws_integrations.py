@@ -0,0 +1,111 @@
+import threading
+from datetime import datetime, timezone
+from unittest import mock
+
+import boto3
+import botocore.auth
+from botocore.config import Config
+from django.test import SimpleTestCase, override_settings
+
+from api import aws_integrations
+from api.aws_integrations import (
+    s3_generate_presigned_get_urls,
+    s3_generate_presigned_post,
+    s3_get_client,
+    s3_get_credentials,
+    s3_reset_client,
+)
+
+S3_SETTINGS = dict(
+    AWS_S3_ACCESS_KEY_ID="test",
+    AWS_S3_SECRET_ACCESS_KEY="test",
+    AWS_S3_REGION_NAME="us-east-1",
+    AWS_STORAGE_BUCKET_NAME="test-bucket",
+    AWS_S3_ENDPOINT_URL="http://127.0.0.1:9000",
+)
+
+
+@override_settings(**S3_SETTINGS)
+class S3ClientCacheTest(SimpleTestCase):
+    def tearDown(self):
+        s3_reset_client()
+
+    def test_client_and_credentials_are_reused(self):
+        self.assertIs(s3_get_client(), s3_get_client())
+        self.assertIs(s3_get_credentials(), s3_get_credentials())
+
+    def test_client_is_shared_across_threads(self):
+        clients = []
+        threads = [
+            threading.Thread(target=lambda: clients.append(s3_get_client()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+    def test_reset_rebuilds_client(self):
+        client = s3_get_client()
+        s3_reset_client()
+        self.assertIsNot(client, s3_get_client())
+
+    def test_settings_change_resets_credentials(self):
+        self.assertEqual(s3_get_credentials().bucket_name, "test-bucket")
+        with override_settings(AWS_STORAGE_BUCKET_NAME="rotated-bucket"):
+            self.assertEqual(s3_get_credentials().bucket_name, "rotated-bucket")
+
+    def test_client_is_rebuilt_after_fork(self):
+        client = s3_get_client()
+        aws_integrations._s3_client_pid = -1
+        self.assertIsNot(client, s3_get_client())
+
+    def test_presigned_post_uses_stand_in_endpoint(self):
+        presigned = s3_generate_presigned_post(
+            file_path="file/notes.pdf", file_type="application/pdf"
+        )
+        self.assertTrue(presigned["url"].startswith("http://127.0.0.1:9000"))
+        self.assertEqual(presigned["fields"]["key"], "file/notes.pdf")
+
+
+@override_settings(**S3_SETTINGS)
+class S3PresignedGetTest(SimpleTestCase):
+    signed_at = datetime(2026, 10, 18, 10, 0, tzinfo=timezone.utc)
+    file_path = "file/lecture notes+1~.pdf"
+
+    def tearDown(self):
+        s3_reset_client()
+
+    def botocore_url(self, addressing_style):
+        credentials = s3_get_credentials()
+        client = boto3.session.Session().client(
+            "s3",
+            aws_access_key_id=credentials.access_key_id,
+            aws_secret_access_key=credentials.secret_access_key,
+            region_name=credentials.region_name,
+            endpoint_url=credentials.endpoint_url,
+            config=Config(
+                signature_version="s3v4", s3={"addressing_style": addressing_style}
+            ),
+        )
+        now = self.signed_at.replace(tzinfo=None)
+        with mock.patch.object(botocore.auth, "get_current_datetime", return_value=now):
+            return client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": credentials.bucket_name, "Key": self.file_path},
+                ExpiresIn=3600,
+            )
+
+    def sign(self):
+        urls = s3_generate_presigned_get_urls(
+            [self.file_path], signed_at=self.signed_at, expires_in=3600
+        )
+        return urls[self.file_path]
+
+    def test_matches_botocore_on_a_stand_in(self):
+        self.assertEqual(self.sign(), self.botocore_url("path"))
+
+    @override_settings(AWS_S3_ENDPOINT_URL=None, AWS_S3_REGION_NAME="eu-west-1")
+    def test_matches_botocore_on_aws(self):
+        self.assertEqual(self.sign(), self.botocore_url("virtual"))
@@ -0,0 +1,155 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.fixtures import Fixture
+from api.models import ClassRoom, Student, User
+
+
+class ImportRosterTest(TestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 100L")
+        User.objects.create_user(email="existing@example.com", password="secret")
+
+    def _write_roster(self, lines):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as roster:
+            roster.write("\n".join(lines))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_imports_students_in_batches(self):
+        path = self._write_roster(
+            [
+                "email,first_name,last_name,classroom,password,class_representative",
+                "ada@example.com,Ada,Obi,CPE 100L,pAssw0rd!,yes",
+                "bayo@example.com,Bayo,Ade,CPE 100L,,",
+                "chidi@example.com,Chidi,Eze,CPE 100L,pAssw0rd!,",
+                "existing@example.com,Old,User,CPE 100L,,",
+                "nobody@example.com,No,Class,CPE 900L,,",
+            ]
+        )
+        out = StringIO()
+        call_command(
+            "import_roster",
+            path,
+            batch_size=2,
+            workers=0,
+            stdout=out,
+            stderr=StringIO(),
+        )
+
+        self.assertEqual(Student.objects.count(), 3)
+        ada = Student.objects.get(user__email="ada@example.com")
+        self.assertTrue(ada.class_representative)
+        self.assertEqual(ada.classroom, self.classroom)
+        chidi = authenticate(email="chidi@example.com", password="pAssw0rd!")
+        self.assertIsNotNone(chidi)
+        bayo = User.objects.get(email="bayo@example.com")
+        self.assertFalse(bayo.has_usable_password())
+        self.assertIn("Imported 3 students", out.getvalue())
+        self.assertIn("skipped 2", out.getvalue())
+
+
+    def test_reports_bad_lines(self):
+        path = self._write_roster(
+            [
+                "email,first_name,last_name,classroom",
+                "ada@example.com,Ada,Obi,CPE 100L",
+                "bayo@example.com,Bayo",
+                "chidi@example.com,Chidi,Eze,CPE 900L",
+                "ada@example.com,Ada,Again,CPE 100L",
+                "dee@example.com,Dee,Ola,CPE 100L",
+            ]
+        )
+        out, err = StringIO(), StringIO()
+        call_command("import_roster", path, workers=0, stdout=out, stderr=err)
+
+        self.assertEqual(
+            sorted(Student.objects.values_list("user__email", flat=True)),
+            ["ada@example.com", "dee@example.com"],
+        )
+        self.assertEqual(
+            err.getvalue().splitlines(),
+            [
+                "line 3: missing classroom, last_name, skipped",
+                "line 4: unknown classroom 'CPE 900L', skipped",
+                "line 5: repeats ada@example.com, skipped",
+            ],
+        )
+        self.assertIn("Imported 2 students", out.getvalue())
+
+    def test_concurrent_signup_skips_only_that_user(self):
+        path = self._write_roster(
+            [
+                "email,first_name,last_name,classroom",
+                "ada@example.com,Ada,Obi,CPE 100L",
+                "bayo@example.com,Bayo,Ade,CPE 100L",
+            ]
+        )
+
+        def sign_up_while_hashing(password):
+            # Bayo registers after the import checked for existing users
+            if not User.objects.filter(email="bayo@example.com").exists():
+                User.objects.create_user(email="bayo@example.com", password="x")
+            return make_password(password)
+
+        out = StringIO()
+        with mock.patch(
+            "api.management.commands.import_roster.make_password",
+            side_effect=sign_up_while_hashing,
+        ):
+            call_command("import_roster", path, workers=0, stdout=out)
+
+        self.assertEqual(
+            list(Student.objects.values_list("user__email", flat=True)),
+            ["ada@example.com"],
+        )
+        self.assertIn("Imported 1 students", out.getvalue())
+        self.assertIn("skipped 1", out.getvalue())
+
+
+class LoadClassroomsTest(TestCase):
+    def test_reloading_is_idempotent(self):
+        ClassRoom.objects.create(name="CPE 100L")
+        out = StringIO()
+        call_command("load_classrooms", stdout=out)
+        call_command("load_classrooms", stdout=out)
+
+        self.assertEqual(ClassRoom.objects.count(), 5)
+        self.assertIn("4 created, 0 updated, 1 unchanged", out.getvalue())
+        self.assertIn("0 created, 0 updated, 5 unchanged", out.getvalue())
+
+    def test_upsert_updates_changed_rows(self):
+        User.objects.create(email="ada@example.com", first_name="Ada", last_name="O")
+        fixture = Fixture(
+            "users",
+            User,
+            [
+                dict(email="ada@example.com", first_name="Ada", last_name="Obi"),
+                dict(email="bayo@example.com", first_name="Bayo", last_name="Ade"),
+            ],
+        )
+        fixture.validate()
+
+        self.assertEqual(fixture.upsert(), (1, 1, 0))
+        self.assertEqual(User.objects.get(email="ada@example.com").last_name, "Obi")
+        self.assertEqual(fixture.upsert(), (0, 0, 2))
+
+    def test_validate_reports_bad_rows(self):
+        fixture = Fixture(
+            "classrooms",
+            ClassRoom,
+            [dict(name="CPE 100L"), dict(name="CPE 100L"), dict(title="CPE 200L")],
+        )
+        with self.assertRaisesMessage(ImproperlyConfigured, "row 1 repeats"):
+            fixture.validate()
+        with self.assertRaisesMessage(ImproperlyConfigured, "row 2 has unknown title"):
+            fixture.validate()
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Assignment, ClassRoom, Instructor, Student, Submission, User
+from api.serializers import AssignmentSerializer
+from api.services import expire_overdue_assignments
+
+PASSWORD = "pAssw0rd!"
+
+
+class ModifiedDateTest(APITestCase):
+    def test_modified_date_follows_saves(self):
+        classroom = ClassRoom.objects.create(name="CPE 500L")
+        long_ago = timezone.now() - timedelta(days=1)
+        ClassRoom.objects.filter(pk=classroom.pk).update(modified_date=long_ago)
+
+        classroom.refresh_from_db()
+        classroom.name = "CPE 501L"
+        classroom.save(update_fields=["name"])
+        classroom.refresh_from_db()
+        self.assertGreater(classroom.modified_date, long_ago)
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.user = User.objects.create_user(
+            email="instructor@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        self.instructor = Instructor.objects.create(user=self.user)
+        self.assignments = [
+            Assignment.objects.create(
+                question=f"Question {i}",
+                course="CPE 501",
+                instructor=self.instructor,
+                classroom=self.classroom,
+                marks=10,
+            )
+            for i in range(3)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def _not_serialized(self):
+        return mock.patch.object(
+            AssignmentSerializer, "to_representation", side_effect=AssertionError
+        )
+
+    def test_list_is_not_serialized_when_unchanged(self):
+        response = self.client.get("/api/v1/assignments")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        with self._not_serialized():
+            response = self.client.get("/api/v1/assignments", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_list_changes_on_save_and_delete(self):
+        etag = self.client.get("/api/v1/assignments")["ETag"]
+
+        self.assignments[0].marks = 20
+        self.assignments[0].save()
+        response = self.client.get("/api/v1/assignments", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        self.assignments[1].delete()
+        response = self.client.get("/api/v1/assignments", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 2)
+
+    def test_list_revalidation_after_delete(self):
+        detail = self.client.get(f"/api/v1/assignments/{self.assignments[2].pk}")
+        since = detail["Last-Modified"]
+        etag = self.client.get("/api/v1/assignments")["ETag"]
+
+        # The oldest row goes, so MAX(modified_date) stays where it was
+        self.assignments[0].delete()
+        response = self.client.get(
+            "/api/v1/assignments", HTTP_IF_MODIFIED_SINCE=since
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(
+            "/api/v1/assignments", HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE=since
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 2)
+
+    def test_submission_list_follows_its_assignments(self):
+        student = Student.objects.create(
+            user=User.objects.create_user(
+                email="student@example.com", password=PASSWORD, is_student=True
+            ),
+            classroom=self.classroom,
+        )
+        assignment = self.assignments[0]
+        Submission.objects.create(
+            title="Answer",
+            content="Answer",
+            assignment=assignment,
+            student=student,
+            instructor=self.instructor,
+            classroom=self.classroom,
+        )
+        etag = self.client.get("/api/v1/submissions")["ETag"]
+
+        # Rewrites the assignment only; no Submission row changes
+        Assignment.objects.filter(pk=assignment.pk).update(
+            due=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(expire_overdue_assignments(), 1)
+
+        response = self.client.get("/api/v1/submissions", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["data"][0]["assignment"]["status"],
+            Assignment.Status.EXPIRED,
+        )
+
+    def test_detail(self):
+        path = f"/api/v1/assignments/{self.assignments[0].pk}"
+        etag = self.client.get(path)["ETag"]
+
+        with self._not_serialized():
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get("/api/v1/assignments/0", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
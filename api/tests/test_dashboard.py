@@ -0,0 +1,102 @@
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import (
+    Assignment,
+    ClassRoom,
+    Instructor,
+    Student,
+    Submission,
+    User,
+)
+
+PASSWORD = "pAssw0rd!"
+
+
+class StudentDashboardTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        instructor_user = User.objects.create_user(
+            email="instructor@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        self.instructor = Instructor.objects.create(user=instructor_user)
+        self.user = User.objects.create_user(
+            email="student@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Student",
+            is_student=True,
+        )
+        self.student = Student.objects.create(user=self.user, classroom=self.classroom)
+        self.assignments = [
+            Assignment.objects.create(
+                question=f"Question {i}",
+                course="CPE 501",
+                instructor=self.instructor,
+                classroom=self.classroom,
+                marks=10,
+            )
+            for i in range(4)
+        ]
+        Submission.objects.create(
+            title="Answer",
+            content="Answer",
+            score=6,
+            assignment=self.assignments[0],
+            student=self.student,
+            instructor=self.instructor,
+            classroom=self.classroom,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_returns_aggregated_payload(self):
+        response = self.client.get("/api/v1/profile")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data["data"]
+        self.assertEqual(data["total_assignments"], 4)
+        self.assertEqual(data["total_marks"], 40)
+        self.assertEqual(data["total_score"], 6)
+        self.assertEqual(data["cumulative_grades"], 15)
+        self.assertEqual(data["submissions_progress"], 100)
+        self.assertEqual(len(data["latest_assignments"]), 4)
+
+    def test_cached_payload_needs_no_queries(self):
+        self.client.get("/api/v1/profile")
+        with self.assertNumQueries(0):
+            self.client.get("/api/v1/profile")
+
+    def test_submission_change_invalidates_cache(self):
+        self.client.get("/api/v1/profile")
+        Submission.objects.create(
+            title="Another answer",
+            content="Another answer",
+            score=4,
+            assignment=self.assignments[1],
+            student=self.student,
+            instructor=self.instructor,
+            classroom=self.classroom,
+            status=Submission.Status.DRAFT,
+        )
+        data = self.client.get("/api/v1/profile").data["data"]
+        self.assertEqual(data["total_score"], 10)
+        self.assertEqual(data["submissions_progress"], 50)
+
+    def test_assignment_change_invalidates_cache(self):
+        self.client.get("/api/v1/profile")
+        self.assignments[3].delete()
+        data = self.client.get("/api/v1/profile").data["data"]
+        self.assertEqual(data["total_assignments"], 3)
+
+    def test_moving_an_assignment_invalidates_the_old_classroom(self):
+        self.client.get("/api/v1/profile")
+        assignment = Assignment.objects.get(pk=self.assignments[3].pk)
+        assignment.classroom = ClassRoom.objects.create(name="CPE 400L")
+        assignment.save()
+        data = self.client.get("/api/v1/profile").data["data"]
+        self.assertEqual(data["total_assignments"], 3)
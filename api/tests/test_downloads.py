@@ -0,0 +1,105 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from api import downloads
+from api.downloads import DownloadUrlService
+from api.models import ClassRoom, CourseMaterial, Instructor, User
+from api.tests.test_uploads import S3_SETTINGS
+from api.utils import get_tokens_for_user
+
+DOWNLOAD_SETTINGS = dict(
+    S3_SETTINGS,
+    AWS_QUERYSTRING_EXPIRE=3600,
+    RESPONSE_CACHE_TIMEOUT=600,
+    DOWNLOAD_URL_MIN_LIFETIME=300,
+)
+
+
+@override_settings(**DOWNLOAD_SETTINGS)
+class DownloadUrlServiceTest(APITestCase):
+    def setUp(self):
+        caches[DownloadUrlService.alias].clear()
+        self.signer = mock.patch.object(
+            downloads,
+            "s3_generate_presigned_get_urls",
+            wraps=downloads.s3_generate_presigned_get_urls,
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_urls_are_signed_once_per_window(self):
+        now = timezone.now()
+        first = DownloadUrlService.get_urls(["file/a.pdf", "file/b.pdf"], now=now)
+        self.assertEqual(self.signer.call_count, 1)
+
+        later = now + timedelta(seconds=30)
+        again = DownloadUrlService.get_urls(["file/a.pdf", "file/c.pdf"], now=later)
+        self.assertEqual(again["file/a.pdf"], first["file/a.pdf"])
+        self.assertEqual(self.signer.call_count, 2)
+        self.assertEqual(self.signer.call_args[0][0], ["file/c.pdf"])
+
+        next_window = now + timedelta(seconds=DownloadUrlService.window_length())
+        renewed = DownloadUrlService.get_urls(["file/a.pdf"], now=next_window)
+        self.assertNotEqual(renewed["file/a.pdf"], first["file/a.pdf"])
+
+    def test_urls_are_the_same_across_processes(self):
+        now = timezone.now()
+        url = DownloadUrlService.get_url("file/a.pdf", now=now)
+        caches[DownloadUrlService.alias].clear()
+        self.assertEqual(DownloadUrlService.get_url("file/a.pdf", now=now), url)
+
+    def test_urls_outlive_the_window_and_response_cache(self):
+        length = DownloadUrlService.window_length()
+        self.assertEqual(length, 3600 - 600 - 300)
+        now = timezone.now()
+        start = DownloadUrlService.window_start(now)
+        self.assertLessEqual(start, now)
+        self.assertGreater(start + timedelta(seconds=length), now)
+
+    @override_settings(AWS_QUERYSTRING_EXPIRE=900)
+    def test_expiry_must_cover_the_response_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            DownloadUrlService.window_length()
+
+    def test_listing_signs_the_page_in_one_batch(self):
+        instructor = Instructor.objects.create(
+            user=User.objects.create_user(
+                email="instructor@example.com", password="x", is_instructor=True
+            )
+        )
+        classroom = ClassRoom.objects.create(name="CPE 500L")
+        CourseMaterial.objects.bulk_create(
+            CourseMaterial(
+                file_name=f"{i}.pdf",
+                file=f"file/{i}.pdf",
+                uploaded_by=instructor.user,
+                classroom=classroom,
+            )
+            for i in range(30)
+        )
+        token = get_tokens_for_user(instructor.user)["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+        response = self.client.get("/api/v1/course-materials", {"page_size": 30})
+        self.assertEqual(self.signer.call_count, 1)
+        for material in response.json()["data"]:
+            key = f"file/{material['file_name']}"
+            self.assertIn(f"/test-bucket/{key}?", material["file"])
+            self.assertIn("X-Amz-Signature=", material["file"])
+
+        next_window = timezone.now() + timedelta(
+            seconds=DownloadUrlService.window_length()
+        )
+        with mock.patch.object(downloads.timezone, "now", return_value=next_window):
+            renewed = self.client.get(
+                "/api/v1/course-materials",
+                {"page_size": 30},
+                HTTP_IF_NONE_MATCH=response["ETag"],
+            )
+        self.assertEqual(renewed.status_code, 200)
+        self.assertNotEqual(renewed["ETag"], response["ETag"])
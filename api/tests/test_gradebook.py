@@ -0,0 +1,192 @@
+import csv
+import io
+import zipfile
+from xml.etree import ElementTree
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Assignment, ClassRoom, Instructor, Student, Submission, User
+
+PASSWORD = "pAssw0rd!"
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+class GradebookExportTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.classroom = ClassRoom.objects.create(name="CPE 500L")
+        other_classroom = ClassRoom.objects.create(name="CPE 400L")
+        cls.instructor = cls._create_instructor("instructor@example.com")
+        other_instructor = cls._create_instructor("other@example.com")
+
+        cls.students = [
+            Student.objects.create(
+                user=User.objects.create_user(
+                    email=f"student{i}@example.com",
+                    password=PASSWORD,
+                    first_name="Test",
+                    last_name=f"Student{i}",
+                    is_student=True,
+                ),
+                classroom=cls.classroom,
+            )
+            for i in range(3)
+        ]
+        cls.assignments = [
+            Assignment.objects.create(
+                question=f"Question {i}",
+                code=f"Q{i}",
+                course="CPE 501",
+                instructor=cls.instructor,
+                classroom=cls.classroom,
+                marks=10,
+            )
+            for i in range(2)
+        ]
+        # Neither of these belong in the instructor's gradebook
+        foreign = [
+            Assignment.objects.create(
+                question="Someone else's question",
+                course="CPE 502",
+                instructor=other_instructor,
+                classroom=cls.classroom,
+                marks=10,
+            ),
+            Assignment.objects.create(
+                question="Another classroom's question",
+                course="CPE 401",
+                instructor=cls.instructor,
+                classroom=other_classroom,
+                marks=10,
+            ),
+        ]
+
+        scores = [
+            (0, cls.assignments[0], 7.5),
+            (0, cls.assignments[1], 9),
+            (0, foreign[0], 10),
+            (1, cls.assignments[1], 4),
+            (1, foreign[1], 10),
+        ]
+        for student, assignment, score in scores:
+            Submission.objects.create(
+                title="Answer",
+                content=f"Answer {student} {assignment.pk}",
+                assignment=assignment,
+                student=cls.students[student],
+                instructor=assignment.instructor,
+                classroom=cls.classroom,
+                score=score,
+            )
+
+    @staticmethod
+    def _create_instructor(email):
+        user = User.objects.create_user(
+            email=email,
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        return Instructor.objects.create(user=user)
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.instructor.user)
+
+    def _export(self, file_format):
+        response = self.client.get(
+            f"/api/v1/classrooms/{self.classroom.pk}/gradebook.{file_format}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response
+
+    @staticmethod
+    def _xlsx_rows(body):
+        with zipfile.ZipFile(io.BytesIO(body)) as workbook:
+            sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+        return [
+            [
+                "".join(cell.itertext())
+                if cell.get("t")
+                else cell.findtext(f"{SHEET_NS}v")
+                for cell in row
+            ]
+            for row in sheet.iter(f"{SHEET_NS}row")
+        ]
+
+    expected = [
+        ["Email", "First name", "Last name", "Q0 (10)", "Q1 (10)", "Total (20)"],
+        ["student0@example.com", "Test", "Student0", "7.5", "9.0", "16.5"],
+        ["student1@example.com", "Test", "Student1", "", "4.0", "4.0"],
+        ["student2@example.com", "Test", "Student2", "", "", "0"],
+    ]
+
+    def test_csv_export(self):
+        response = self._export("csv")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("cpe-500l-gradebook.csv", response["Content-Disposition"])
+
+        with CaptureQueriesContext(connection) as context:
+            body = b"".join(response.streaming_content).decode()
+        # assignment columns, then every cell in one grouped query
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertEqual(list(csv.reader(io.StringIO(body))), self.expected)
+
+    def test_xlsx_export(self):
+        response = self._export("xlsx")
+        body = b"".join(response.streaming_content)
+
+        with zipfile.ZipFile(io.BytesIO(body)) as workbook:
+            self.assertIsNone(workbook.testzip())
+            self.assertIn(b"CPE 500L", workbook.read("xl/workbook.xml"))
+
+        rows = self._xlsx_rows(body)
+        # empty cells come back as None
+        expected = [[value or None for value in row] for row in self.expected]
+        self.assertEqual(rows, expected)
+
+    def test_formulas_are_not_exported(self):
+        Student.objects.create(
+            user=User.objects.create_user(
+                email="student3@example.com",
+                password=PASSWORD,
+                first_name='=HYPERLINK("http://example.com","Click")',
+                last_name="-1+1",
+                is_student=True,
+            ),
+            classroom=self.classroom,
+        )
+        expected = [
+            "student3@example.com",
+            '\'=HYPERLINK("http://example.com","Click")',
+            "'-1+1",
+        ]
+
+        body = b"".join(self._export("csv").streaming_content).decode()
+        self.assertIn(expected, [row[:3] for row in csv.reader(io.StringIO(body))])
+        body = b"".join(self._export("xlsx").streaming_content)
+        self.assertIn(expected, [row[:3] for row in self._xlsx_rows(body)])
+
+    def test_unknown_format_and_classroom(self):
+        response = self.client.get(
+            f"/api/v1/classrooms/{self.classroom.pk}/gradebook.pdf"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        other = self._create_instructor("stranger@example.com")
+        self.client.force_authenticate(user=other.user)
+        response = self.client.get(
+            f"/api/v1/classrooms/{self.classroom.pk}/gradebook.csv"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_students_cannot_export(self):
+        self.client.force_authenticate(user=self.students[0].user)
+        response = self.client.get(
+            f"/api/v1/classrooms/{self.classroom.pk}/gradebook.csv"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,202 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.instrumentation import (
+    QueryInstrumentationMiddleware,
+    QueryRecorder,
+    sql_shape,
+)
+from api.models import Assignment, ClassRoom, Instructor, Student, Submission, User
+from api.services import StudentDashboardService
+from api.tests.budgets import QueryBudgetMixin, query_budget
+from api.utils import get_tokens_for_user
+
+PASSWORD = "pAssw0rd!"
+
+
+class SQLShapeTest(SimpleTestCase):
+    def test_literals_are_normalised(self):
+        self.assertEqual(
+            sql_shape("SELECT * FROM t WHERE id = 12 AND name = 'it''s'"),
+            sql_shape("SELECT * FROM t WHERE id = 7 AND name = 'other'"),
+        )
+        self.assertEqual(
+            sql_shape("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id IN (...)",
+        )
+
+
+class QueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Every budgeted view, with enough rows to expose an N+1."""
+
+    rows = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.classroom = ClassRoom.objects.create(name="CPE 500L")
+        cls.instructor = Instructor.objects.create(
+            user=cls._create_user("instructor@example.com", is_instructor=True)
+        )
+        cls.students = [
+            Student.objects.create(
+                user=cls._create_user(f"student{i}@example.com", is_student=True),
+                classroom=cls.classroom,
+            )
+            for i in range(cls.rows)
+        ]
+        cls.assignments = [
+            Assignment.objects.create(
+                question=f"Question {i}",
+                code=f"Q{i}",
+                course="CPE 501",
+                instructor=cls.instructor,
+                classroom=cls.classroom,
+                marks=10,
+            )
+            for i in range(cls.rows)
+        ]
+        cls.submissions = [
+            Submission.objects.create(
+                title="Answer",
+                content=f"Answer {i}",
+                assignment=cls.assignments[0],
+                student=student,
+                instructor=cls.instructor,
+                classroom=cls.classroom,
+            )
+            for i, student in enumerate(cls.students)
+        ]
+
+    @staticmethod
+    def _create_user(email, **extra_fields):
+        return User.objects.create_user(
+            email=email,
+            password=PASSWORD,
+            first_name="Test",
+            last_name="User",
+            **extra_fields,
+        )
+
+    def setUp(self):
+        StudentDashboardService.invalidate([self.students[0].user_id])
+
+    def _authenticate(self, user):
+        token = get_tokens_for_user(user)["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+    def test_student_views(self):
+        self._authenticate(self.students[0].user)
+        for path in (
+            "/api/v1/profile",
+            "/api/v1/assignments",
+            f"/api/v1/assignments/{self.assignments[0].pk}",
+            "/api/v1/submissions",
+            f"/api/v1/submissions/{self.submissions[0].pk}",
+            "/api/v1/course-materials",
+        ):
+            with self.subTest(path=path):
+                response = self.request_within_budget("get", path)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_instructor_views(self):
+        self._authenticate(self.instructor.user)
+        for path in (
+            "/api/v1/assignments",
+            "/api/v1/submissions",
+            "/api/v1/submissions?stream=1",
+            f"/api/v1/classrooms/{self.classroom.pk}/gradebook.csv",
+        ):
+            with self.subTest(path=path):
+                response = self.request_within_budget("get", path)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        grades = [{"id": s.pk, "score": 5} for s in self.submissions]
+        response = self.request_within_budget(
+            "post",
+            f"/api/v1/assignments/{self.assignments[0].pk}/grades",
+            data={"grades": grades},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_repeated_queries_fail(self):
+        @query_budget(budget=100)
+        def n_plus_one(testcase):
+            for submission in Submission.objects.all():
+                submission.student.user
+
+        with self.assertRaisesRegex(AssertionError, "N\\+1"):
+            n_plus_one(self)
+
+    def test_undeclared_budget_fails(self):
+        with self.assertRaisesRegex(AssertionError, "declares no POST query budget"):
+            self.request_within_budget("post", "/api/v1/submissions", data={})
+
+
+class QueryInstrumentationMiddlewareTest(APITestCase):
+    def test_reports_queries(self):
+        classroom = ClassRoom.objects.create(name="CPE 500L")
+        user = User.objects.create_user(
+            email="student@example.com", password=PASSWORD, is_student=True
+        )
+        Student.objects.create(user=user, classroom=classroom)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Token {get_tokens_for_user(user)['access']}"
+        )
+
+        with self.assertLogs("api.instrumentation", "INFO") as logs:
+            response = self.client.get("/api/v1/submissions")
+
+        self.assertRegex(
+            response["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="2 queries", db-slowest;dur=[\d.]+$',
+        )
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line["path"], "/api/v1/submissions")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["queries"], 2)
+        self.assertIn("api_submission", line["slowest_sql"])
+
+    def test_recorder_without_debug(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            list(ClassRoom.objects.all())
+            ClassRoom.objects.count()
+        self.assertEqual(recorder.count, 2)
+        self.assertGreater(recorder.duration, 0)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
+class AsyncQueryInstrumentationTest(TransactionTestCase):
+    def test_is_awaited_directly_under_asgi(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(
+            asyncio.iscoroutinefunction(QueryInstrumentationMiddleware(get_response))
+        )
+
+    def test_reports_queries_of_async_views(self):
+        User.objects.create_user(email="student@example.com", password=PASSWORD)
+
+        with self.assertLogs("api.instrumentation", "INFO") as logs:
+            response = async_to_sync(self.async_client.post)(
+                "/api/v1/login/async",
+                {"email": "student@example.com", "password": PASSWORD},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line["path"], "/api/v1/login/async")
+        self.assertGreater(line["queries"], 0)
+        self.assertIn(f'desc="{line["queries"]} queries"', response["Server-Timing"])
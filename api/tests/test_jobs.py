@@ -0,0 +1,135 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from api.jobs import Worker, claim, defer, requeue_stale, run_job, task
+from api.models import (
+    Assignment,
+    ClassRoom,
+    Inbox,
+    Instructor,
+    Job,
+    Notification,
+    Student,
+    User,
+)
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_defer_queues_a_job(self):
+        job = defer(record, 1)
+
+        self.assertEqual(job.name, "api.tests.test_jobs.record")
+        self.assertEqual(job.args, [1])
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(calls, [])
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_runs_right_away(self):
+        self.assertIsNone(defer(record, 1))
+        self.assertEqual(calls, [1])
+        self.assertFalse(Job.objects.exists())
+
+    def test_claimed_jobs_are_not_claimed_twice(self):
+        defer(record, 1)
+        defer(record, 2, delay=timedelta(hours=1))
+
+        (job,) = claim("worker-a", limit=5)
+        self.assertEqual(job.status, Job.Status.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.locked_by, "worker-a")
+        self.assertEqual(claim("worker-b", limit=5), [])
+
+        self.assertEqual(run_job(job)[0], Job.Status.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.SUCCEEDED)
+        self.assertIsNotNone(job.duration)
+        self.assertEqual(calls, [1])
+
+    def test_failures_back_off_then_fail(self):
+        defer(explode)
+
+        (job,) = claim("worker")
+        with self.assertLogs("api.jobs", "INFO"):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+
+        Job.objects.update(run_after=timezone.now())
+        (job,) = claim("worker")
+        with self.assertLogs("api.jobs", "INFO"):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_jobs_are_requeued(self):
+        defer(record, 1)
+        claim("worker")
+
+        self.assertEqual(requeue_stale(timezone.now() - timedelta(minutes=5)), 0)
+        self.assertEqual(requeue_stale(timezone.now() + timedelta(seconds=1)), 1)
+        self.assertEqual(Job.objects.get().status, Job.Status.QUEUED)
+
+
+class WorkerTest(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_delivers_notifications(self):
+        classroom = ClassRoom.objects.create(name="CPE 500L")
+        instructor = Instructor.objects.create(
+            user=User.objects.create(email="instructor@example.com", is_instructor=True)
+        )
+        student = Student.objects.create(
+            user=User.objects.create(email="student@example.com", is_student=True),
+            classroom=classroom,
+        )
+        Assignment.objects.create(
+            question="Question 1",
+            course="CPE 501",
+            instructor=instructor,
+            classroom=classroom,
+            marks=10,
+        )
+        self.assertFalse(Notification.objects.exists())
+
+        worker = Worker(threads=1)
+        with self.assertLogs("api.jobs", "INFO"):
+            worker.run(burst=True)
+
+        self.assertEqual(Notification.objects.get().user_id, student.user_id)
+        self.assertEqual(Inbox.objects.get(user_id=student.user_id).unread, 1)
+        self.assertEqual(worker.metrics()["outcomes"], {Job.Status.SUCCEEDED: 1})
+
+    def test_command_reports_metrics(self):
+        for value in range(3):
+            defer(record, value)
+        out = StringIO()
+        with self.assertLogs("api.jobs", "INFO"):
+            call_command("run_jobs", threads=1, burst=True, stdout=out)
+
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        metrics = json.loads(out.getvalue())
+        self.assertEqual(metrics["tasks"]["api.tests.test_jobs.record"]["runs"], 3)
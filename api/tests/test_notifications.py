@@ -0,0 +1,187 @@
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api import notifications
+from api.models import (
+    Assignment,
+    ClassRoom,
+    Inbox,
+    Instructor,
+    Notification,
+    Student,
+    Submission,
+    User,
+)
+from api.tests.budgets import QueryBudgetMixin
+from api.utils import get_tokens_for_user
+
+PASSWORD = "pAssw0rd!"
+
+
+@override_settings(JOBS_EAGER=True)
+class NotificationFanOutTest(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.instructor = Instructor.objects.create(
+            user=User.objects.create_user(
+                email="instructor@example.com", password=PASSWORD, is_instructor=True
+            )
+        )
+        self.students = [
+            Student.objects.create(
+                user=User.objects.create_user(
+                    email=f"student{i}@example.com", password=PASSWORD, is_student=True
+                ),
+                classroom=self.classroom,
+            )
+            for i in range(3)
+        ]
+        other = ClassRoom.objects.create(name="CPE 400L")
+        self.outsider = Student.objects.create(
+            user=User.objects.create_user(
+                email="outsider@example.com", password=PASSWORD, is_student=True
+            ),
+            classroom=other,
+        )
+
+    def _create_assignment(self, question):
+        return Assignment.objects.create(
+            question=question,
+            course="CPE 501",
+            instructor=self.instructor,
+            classroom=self.classroom,
+            marks=10,
+        )
+
+    def _authenticate(self, user):
+        token = get_tokens_for_user(user)["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+    def _unread(self, student):
+        return Inbox.objects.get(user_id=student.user_id).unread
+
+    def test_new_assignment_reaches_every_student_in_the_classroom(self):
+        self._create_assignment("Question 1")
+
+        for student in self.students:
+            notification = Notification.objects.get(user_id=student.user_id)
+            self.assertEqual(notification.kind, Notification.Kind.ASSIGNMENT_CREATED)
+            self.assertIn("Question 1", notification.message)
+            self.assertEqual(self._unread(student), 1)
+        self.assertFalse(Notification.objects.filter(user_id=self.outsider.user_id))
+
+    def test_bursts_coalesce_into_a_digest(self):
+        self._create_assignment("Question 1")
+        self._create_assignment("Question 2")
+
+        notification = Notification.objects.get(user_id=self.students[0].user_id)
+        self.assertEqual(notification.count, 2)
+        self.assertIn("Question 2", notification.message)
+        self.assertEqual(self._unread(self.students[0]), 1)
+
+        notifications.mark_read(self.students[0].user)
+        self._create_assignment("Question 3")
+        self.assertEqual(
+            Notification.objects.filter(user_id=self.students[0].user_id).count(), 2
+        )
+        self.assertEqual(self._unread(self.students[0]), 1)
+
+    def test_fan_out_writes_in_batches(self):
+        user_ids = [student.user_id for student in self.students]
+        with mock.patch.object(notifications, "FAN_OUT_BATCH_SIZE", 2):
+            # Per batch: savepoint, digest select, insert, inbox insert,
+            # counter update, release
+            with self.assertNumQueries(12):
+                notifications.fan_out(
+                    Notification.Kind.ASSIGNMENT_CREATED,
+                    self.classroom.pk,
+                    user_ids,
+                    "Hello",
+                )
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_grading_notifies_graded_students(self):
+        assignment = self._create_assignment("Question 1")
+        notifications.mark_read(self.students[0].user)
+        submission = Submission.objects.create(
+            title="Answer",
+            content="Answer",
+            assignment=assignment,
+            student=self.students[0],
+            instructor=self.instructor,
+            classroom=self.classroom,
+        )
+        self._authenticate(self.instructor.user)
+        response = self.client.post(
+            f"/api/v1/assignments/{assignment.pk}/grades",
+            {"grades": [{"id": submission.pk, "score": 7}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        graded = Notification.objects.get(
+            user_id=self.students[0].user_id, kind=Notification.Kind.SUBMISSION_GRADED
+        )
+        self.assertIn("Question 1", graded.message)
+        self.assertEqual(self._unread(self.students[0]), 1)
+        self.assertFalse(
+            Notification.objects.filter(
+                user_id=self.students[1].user_id,
+                kind=Notification.Kind.SUBMISSION_GRADED,
+            )
+        )
+
+    def test_marking_notifies_only_when_the_instructor_grades(self):
+        assignment = self._create_assignment("Question 1")
+        notifications.mark_read(self.students[0].user)
+        submission = Submission.objects.create(
+            title="Answer",
+            content="Answer",
+            assignment=assignment,
+            student=self.students[0],
+            instructor=self.instructor,
+            classroom=self.classroom,
+        )
+        graded = Notification.objects.filter(kind=Notification.Kind.SUBMISSION_GRADED)
+
+        self._authenticate(self.students[0].user)
+        response = self.client.patch(
+            f"/api/v1/submissions/{submission.pk}", {"score": 10}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(graded.exists())
+        submission.refresh_from_db()
+        self.assertEqual(submission.score, 0)
+
+        self._authenticate(self.instructor.user)
+        response = self.client.patch(
+            f"/api/v1/submissions/{submission.pk}", {"score": 7}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(graded.get().user_id, self.students[0].user_id)
+
+    def test_inbox_endpoints(self):
+        self._create_assignment("Question 1")
+        student = self.students[0]
+        self._authenticate(student.user)
+
+        response = self.request_within_budget(
+            "get", "/api/v1/notifications/unread_count"
+        )
+        self.assertEqual(response.data["data"], {"unread": 1})
+
+        response = self.request_within_budget("get", "/api/v1/notifications")
+        self.assertEqual(len(response.data["data"]), 1)
+        notification_id = response.data["data"][0]["id"]
+
+        response = self.request_within_budget(
+            "post",
+            "/api/v1/notifications/read",
+            data={"ids": [notification_id]},
+            format="json",
+        )
+        self.assertEqual(response.data["data"], {"marked": 1, "unread": 0})
+        self.assertEqual(self._unread(student), 0)
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Assignment, ClassRoom, Instructor, User
+from api.pagination import KeysetPagination
+
+PASSWORD = "pAssw0rd!"
+
+
+class AssignmentKeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.user = User.objects.create_user(
+            email="instructor@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        instructor = Instructor.objects.create(user=self.user)
+        now = timezone.now()
+        # Every other pair shares a created_date so the id tie-breaker is exercised
+        self.assignments = [
+            Assignment.objects.create(
+                question=f"Question {i}",
+                course="CPE 501",
+                instructor=instructor,
+                classroom=self.classroom,
+                marks=10,
+                created_date=now - timedelta(minutes=i // 2),
+            )
+            for i in range(7)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def _ids(self, response):
+        return [item["id"] for item in response.data["data"]]
+
+    def test_pages_forward_and_back_without_gaps(self):
+        expected = [
+            a.id
+            for a in sorted(
+                self.assignments, key=lambda a: (a.created_date, a.id), reverse=True
+            )
+        ]
+
+        first = self.client.get("/api/v1/assignments", {"page_size": 3})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertTrue(first.data["success"])
+        self.assertIsNone(first.data["prev"])
+        self.assertEqual(self._ids(first), expected[:3])
+
+        second = self.client.get(
+            "/api/v1/assignments", {"page_size": 3, "cursor": first.data["next"]}
+        )
+        self.assertEqual(self._ids(second), expected[3:6])
+
+        third = self.client.get(
+            "/api/v1/assignments", {"page_size": 3, "cursor": second.data["next"]}
+        )
+        self.assertEqual(self._ids(third), expected[6:])
+        self.assertIsNone(third.data["next"])
+
+        back = self.client.get(
+            "/api/v1/assignments", {"page_size": 3, "cursor": third.data["prev"]}
+        )
+        self.assertEqual(self._ids(back), expected[3:6])
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(KeysetPagination, "max_page_size", 2):
+            response = self.client.get("/api/v1/assignments", {"page_size": 10_000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/v1/assignments", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,108 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import (
+    Assignment,
+    ClassRoom,
+    Instructor,
+    Student,
+    Submission,
+    User,
+)
+from api.serializers import AssignmentSerializer, SubmissionSerializer
+
+PASSWORD = "pAssw0rd!"
+
+
+class SubmissionListQueryCountTest(TestCase):
+    """Rendering a list must cost the same number of queries at any size."""
+
+    sizes = (1, 100, 1000)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.classroom = ClassRoom.objects.create(name="CPE 500L")
+        instructor_user = User.objects.create_user(
+            email="instructor@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        cls.instructor = Instructor.objects.create(user=instructor_user)
+        cls.students = []
+        for i in range(5):
+            user = User.objects.create_user(
+                email=f"student{i}@example.com",
+                password=PASSWORD,
+                first_name="Test",
+                last_name=f"Student{i}",
+                is_student=True,
+            )
+            cls.students.append(
+                Student.objects.create(user=user, classroom=cls.classroom)
+            )
+
+    def _grow_to(self, size):
+        existing = Assignment.objects.count()
+        Assignment.objects.bulk_create(
+            Assignment(
+                question=f"Question {i}",
+                course="CPE 501",
+                instructor=self.instructor,
+                classroom=self.classroom,
+                marks=10,
+            )
+            for i in range(existing, size)
+        )
+        assignments = list(Assignment.objects.order_by("id"))
+        existing = Submission.objects.count()
+        Submission.objects.bulk_create(
+            Submission(
+                title=f"Answer {i}",
+                content=f"Answer {i}",
+                assignment=assignments[i],
+                student=self.students[i % len(self.students)],
+                instructor=self.instructor,
+                classroom=self.classroom,
+            )
+            for i in range(existing, size)
+        )
+
+    def _count_queries(self, user, render):
+        # Refetch so per-request profile lookups are counted every time
+        user = User.objects.get(pk=user.pk)
+        with CaptureQueriesContext(connection) as context:
+            render(user)
+        return len(context.captured_queries)
+
+    def _assert_constant(self, user, render):
+        counts = []
+        for size in self.sizes:
+            self._grow_to(size)
+            counts.append(self._count_queries(user, render))
+        self.assertEqual(counts, [counts[0]] * len(self.sizes))
+        return counts[0]
+
+    def test_instructor_submission_list(self):
+        def render(user):
+            submissions = Submission.objects.get_submissions(user=user)
+            self.assertTrue(SubmissionSerializer(submissions, many=True).data)
+
+        # instructor profile + submissions
+        self.assertEqual(self._assert_constant(self.instructor.user, render), 2)
+
+    def test_student_submission_list(self):
+        def render(user):
+            submissions = Submission.objects.get_submissions(user=user)
+            self.assertTrue(SubmissionSerializer(submissions, many=True).data)
+
+        self.assertEqual(self._assert_constant(self.students[0].user, render), 2)
+
+    def test_assignment_list(self):
+        def render(user):
+            assignments = Assignment.objects.get_assignments(user=user)
+            self.assertTrue(AssignmentSerializer(assignments, many=True).data)
+
+        self.assertEqual(self._assert_constant(self.students[0].user, render), 2)
@@ -0,0 +1,118 @@
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.caching import ClassroomResponseCache
+from api.models import Assignment, ClassRoom, CourseMaterial, Instructor, Student, User
+from api.utils import get_tokens_for_user
+
+PASSWORD = "pAssw0rd!"
+
+
+class ClassroomResponseCacheTest(APITestCase):
+    def setUp(self):
+        ClassroomResponseCache.get_cache().clear()
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.other_classroom = ClassRoom.objects.create(name="CPE 400L")
+        self.instructor = Instructor.objects.create(
+            user=self._create_user("instructor@example.com", is_instructor=True)
+        )
+        self.students = [
+            Student.objects.create(
+                user=self._create_user(f"student{i}@example.com", is_student=True),
+                classroom=classroom,
+            )
+            for i, classroom in enumerate(
+                [self.classroom, self.classroom, self.other_classroom]
+            )
+        ]
+        for classroom in (self.classroom, self.other_classroom):
+            self._create_assignment(classroom)
+
+    @staticmethod
+    def _create_user(email, **extra_fields):
+        return User.objects.create_user(
+            email=email,
+            password=PASSWORD,
+            first_name="Test",
+            last_name="User",
+            **extra_fields,
+        )
+
+    def _create_assignment(self, classroom):
+        return Assignment.objects.create(
+            question=f"Question {Assignment.objects.count()}",
+            course="CPE 501",
+            instructor=self.instructor,
+            classroom=classroom,
+            marks=10,
+        )
+
+    def _get(self, user, path="/api/v1/assignments", **extra):
+        token = get_tokens_for_user(user)["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        return self.client.get(path, **extra)
+
+    def test_classmates_share_one_rendered_response(self):
+        first = self._get(self.students[0].user)
+        self.assertEqual(first["X-Cache"], "MISS")
+
+        with self.assertNumQueries(0):
+            second = self._get(self.students[1].user)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertEqual(second.json(), first.json())
+
+        # A hit can still be answered with a 304 without touching the database
+        with self.assertNumQueries(0):
+            response = self._get(
+                self.students[1].user, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_invalidate_only_their_classroom(self):
+        self._get(self.students[0].user)
+        self._get(self.students[2].user)
+
+        self._create_assignment(self.classroom)
+        response = self._get(self.students[1].user)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.json()["data"]), 2)
+        self.assertEqual(self._get(self.students[2].user)["X-Cache"], "HIT")
+
+        Assignment.objects.filter(classroom=self.classroom).first().delete()
+        response = self._get(self.students[0].user)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.json()["data"]), 1)
+
+    def test_course_materials_and_query_params(self):
+        path = "/api/v1/course-materials"
+        self.assertEqual(self._get(self.students[0].user, path)["X-Cache"], "MISS")
+        paged = self._get(self.students[0].user, path, data={"page_size": 5})
+        self.assertEqual(paged["X-Cache"], "MISS")
+
+        CourseMaterial.objects.create(
+            original_file_name="notes.pdf",
+            file_name="notes.pdf",
+            classroom=self.classroom,
+            verification=CourseMaterial.Verification.VERIFIED,
+        )
+        response = self._get(self.students[1].user, path)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.json()["data"]), 1)
+
+    def test_instructors_and_streams_are_not_cached(self):
+        response = self._get(self.instructor.user)
+        self.assertFalse(response.has_header("X-Cache"))
+        response = self._get(self.students[0].user, data={"stream": "1"})
+        self.assertFalse(response.has_header("X-Cache"))
+
+    def test_metrics(self):
+        before = ClassroomResponseCache.metrics().get(
+            "assignments", {"hits": 0, "misses": 0}
+        )
+        self._get(self.students[0].user)
+        self._get(self.students[1].user)
+        after = ClassroomResponseCache.metrics()["assignments"]
+        self.assertEqual(after["hits"], before["hits"] + 1)
+        self.assertEqual(after["misses"], before["misses"] + 1)
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from api.models import (
+    Assignment,
+    ClassRoom,
+    CourseMaterial,
+    Student,
+    Submission,
+    User,
+)
+from api.seeding import SEED_PASSWORD, DatasetSeeder
+
+
+class DatasetSeederTest(TestCase):
+    def seed(self, **kwargs):
+        options = dict(
+            classrooms=3,
+            students=30,
+            instructors=4,
+            assignments_per_classroom=5,
+            materials_per_classroom=2,
+            batch_size=7,
+        )
+        options.update(kwargs)
+        DatasetSeeder(**options).run()
+
+    def test_seeds_requested_counts(self):
+        self.seed()
+
+        self.assertEqual(ClassRoom.objects.count(), 3)
+        self.assertEqual(Student.objects.count(), 30)
+        self.assertEqual(User.objects.filter(is_instructor=True).count(), 4)
+        self.assertEqual(Assignment.objects.count(), 15)
+        self.assertEqual(CourseMaterial.objects.count(), 6)
+        # Every student can submit to the 5 assignments set for their classroom
+        self.assertGreater(Submission.objects.count(), 0)
+        self.assertLessEqual(Submission.objects.count(), 30 * 5)
+        self.assertFalse(
+            Submission.objects.exclude(classroom=F("student__classroom")).exists()
+        )
+        user = User.objects.get(email=DatasetSeeder.email("student", 0))
+        self.assertTrue(user.check_password(SEED_PASSWORD))
+
+    def test_same_seed_builds_same_rows(self):
+        self.seed(seed=3)
+        first = list(Submission.objects.order_by("id").values_list("score", flat=True))
+        Submission.objects.all().delete()
+        Assignment.objects.all().delete()
+        Student.objects.all().delete()
+        User.objects.all().delete()
+        ClassRoom.objects.all().delete()
+
+        self.seed(seed=3)
+        second = list(Submission.objects.order_by("id").values_list("score", flat=True))
+        self.assertEqual(first, second)
+
+
+class GenerateDataCommandTest(TestCase):
+    def generate(self, **options):
+        call_command(
+            "generate_data",
+            classrooms=2,
+            students=20,
+            instructors=2,
+            assignments_per_classroom=4,
+            materials_per_classroom=1,
+            stdout=StringIO(),
+            **options,
+        )
+
+    def test_generates_about_the_requested_submissions(self):
+        self.generate(submissions=40)
+
+        self.assertEqual(Student.objects.count(), 20)
+        self.assertEqual(CourseMaterial.objects.count(), 2)
+        self.assertTrue(20 <= Submission.objects.count() <= 60)
+        self.assertFalse(Submission.objects.filter(score__gt=F("assignment__marks")))
+
+    def test_rejects_more_submissions_than_fit(self):
+        with self.assertRaisesMessage(CommandError, "At most 80 submissions"):
+            self.generate(submissions=81)
+
+    def test_refuses_to_generate_twice(self):
+        self.generate(submissions=10)
+        with self.assertRaisesMessage(CommandError, "already loaded"):
+            self.generate(submissions=10)
@@ -0,0 +1,96 @@
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import Assignment, ClassRoom, Instructor, Student, Submission, User
+from api.streaming import JSONListStreamer
+
+PASSWORD = "pAssw0rd!"
+
+
+class StreamingListTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.classroom = ClassRoom.objects.create(name="CPE 500L")
+        cls.user = User.objects.create_user(
+            email="instructor@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        cls.instructor = Instructor.objects.create(user=cls.user)
+        student_user = User.objects.create_user(
+            email="student@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Student",
+            is_student=True,
+        )
+        student = Student.objects.create(user=student_user, classroom=cls.classroom)
+        assignment = Assignment.objects.create(
+            question="Question",
+            course="CPE 501",
+            instructor=cls.instructor,
+            classroom=cls.classroom,
+            marks=10,
+        )
+        Submission.objects.bulk_create(
+            Submission(
+                title=f"Answer {i}",
+                content=f"Answer {i}",
+                assignment=assignment,
+                student=student,
+                instructor=cls.instructor,
+                classroom=cls.classroom,
+            )
+            for i in range(7)
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def _stream(self, path):
+        response = self.client.get(path, {"stream": "1"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response
+
+    def test_streams_every_row_in_the_envelope(self):
+        with mock.patch.object(JSONListStreamer, "chunk_size", 3):
+            response = self._stream("/api/v1/submissions")
+            body = json.loads(b"".join(response.streaming_content))
+
+        self.assertTrue(body["success"])
+        self.assertEqual(body["message"], "Submissions fetched successfully")
+        self.assertIsNone(body["next"])
+        expected = list(
+            Submission.objects.order_by("-created_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        self.assertEqual([item["id"] for item in body["data"]], expected)
+
+        paged = self.client.get("/api/v1/submissions", {"page_size": 100})
+        self.assertEqual(body["data"], json.loads(json.dumps(paged.data["data"])))
+
+    def test_rows_are_read_through_one_cursor(self):
+        with mock.patch.object(JSONListStreamer, "chunk_size", 2):
+            response = self._stream("/api/v1/submissions")
+            with CaptureQueriesContext(connection) as context:
+                chunks = list(response.streaming_content)
+
+        # envelope head, four chunks of rows, envelope tail
+        self.assertEqual(len(chunks), 6)
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_empty_list(self):
+        body = json.loads(
+            b"".join(self._stream("/api/v1/course-materials").streaming_content)
+        )
+        self.assertEqual(body["data"], [])
+        self.assertIsNone(body["prev"])
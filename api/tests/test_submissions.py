@@ -0,0 +1,274 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.models import (
+    Assignment,
+    ClassRoom,
+    Instructor,
+    Student,
+    Submission,
+    User,
+)
+from api.services import assignments_expired, expire_overdue_assignments
+from api.utils import submission_content_digest
+
+PASSWORD = "pAssw0rd!"
+
+
+class SubmissionTestCase(APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        instructor_user = User.objects.create_user(
+            email="instructor@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Instructor",
+            is_instructor=True,
+        )
+        self.instructor = Instructor.objects.create(user=instructor_user)
+        self.user = User.objects.create_user(
+            email="student@example.com",
+            password=PASSWORD,
+            first_name="Test",
+            last_name="Student",
+            is_student=True,
+        )
+        self.student = Student.objects.create(user=self.user, classroom=self.classroom)
+        self.assignments = [
+            Assignment.objects.create(
+                question=f"Question {i}",
+                course="CPE 501",
+                instructor=self.instructor,
+                classroom=self.classroom,
+                marks=10,
+            )
+            for i in range(2)
+        ]
+
+
+class DuplicateSubmissionTest(SubmissionTestCase):
+    def _submit(self, assignment, content):
+        self.client.force_authenticate(user=self.user)
+        return self.client.post(
+            "/api/v1/submissions",
+            {
+                "assignment_id": assignment.pk,
+                "instructor": self.instructor.pk,
+                "classroom": "CPE 500L",
+                "title": "Answer",
+                "content": content,
+            },
+        )
+
+    def test_digest_tracks_content(self):
+        submission = Submission.objects.create(
+            title="Answer",
+            content="An  Essay",
+            assignment=self.assignments[0],
+            student=self.student,
+            instructor=self.instructor,
+            classroom=self.classroom,
+        )
+        self.assertEqual(submission.content_digest, submission_content_digest("an essay"))
+
+        submission.content = "Another essay"
+        submission.save(update_fields=["content"])
+        submission.refresh_from_db()
+        self.assertEqual(
+            submission.content_digest, submission_content_digest("another essay")
+        )
+
+    def test_resubmitting_same_content_is_rejected(self):
+        response = self._submit(self.assignments[0], "My essay on circuits")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self._submit(self.assignments[0], "  my essay ON circuits\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_same_content_for_another_assignment_is_allowed(self):
+        self._submit(self.assignments[0], "My essay on circuits")
+        response = self._submit(self.assignments[1], "My essay on circuits")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class BulkGradingTest(SubmissionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assignment = self.assignments[0]
+        students = [self.student]
+        for i in range(299):
+            user = User.objects.create(
+                email=f"student{i}@example.com", is_student=True
+            )
+            students.append(Student(user=user, classroom=self.classroom))
+        Student.objects.bulk_create(students[1:])
+        students = list(Student.objects.all())
+        Submission.objects.bulk_create(
+            Submission(
+                title="Answer",
+                content=f"Answer {i}",
+                assignment=self.assignment,
+                student=student,
+                instructor=self.instructor,
+                classroom=self.classroom,
+            )
+            for i, student in enumerate(students)
+        )
+        self.url = f"/api/v1/assignments/{self.assignment.pk}/grades"
+        self.client.force_authenticate(user=self.instructor.user)
+
+    def test_grades_whole_class_in_a_handful_of_queries(self):
+        submission_ids = list(
+            Submission.objects.filter(assignment=self.assignment).values_list(
+                "id", flat=True
+            )
+        )
+        grades = [
+            {"id": submission_id, "score": 7, "remark": "Good"}
+            for submission_id in submission_ids
+        ]
+        # The last is the INSERT queueing the students' notifications
+        with self.assertNumQueries(7):
+            response = self.client.post(self.url, {"grades": grades}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(result["success"] for result in response.data["data"]))
+        self.assertEqual(
+            Submission.objects.filter(score=7, remark="Good").count(),
+            len(submission_ids),
+        )
+
+    def test_reports_per_item_failures(self):
+        other = Submission.objects.create(
+            title="Answer",
+            content="Other",
+            assignment=self.assignments[1],
+            student=self.student,
+            instructor=self.instructor,
+            classroom=self.classroom,
+        )
+        graded = Submission.objects.filter(assignment=self.assignment).first()
+        response = self.client.post(
+            self.url,
+            {
+                "grades": [
+                    {"id": graded.pk, "score": 9},
+                    {"id": other.pk, "score": 9},
+                    {"id": graded.pk + 100000, "score": 1},
+                ]
+            },
+            format="json",
+        )
+        results = {result["id"]: result for result in response.data["data"]}
+        self.assertTrue(results[graded.pk]["success"])
+        self.assertFalse(results[other.pk]["success"])
+        self.assertFalse(results[graded.pk + 100000]["success"])
+        other.refresh_from_db()
+        self.assertEqual(other.score, 0)
+
+    def test_rejects_scores_above_marks(self):
+        graded = Submission.objects.filter(assignment=self.assignment).first()
+        response = self.client.post(
+            self.url, {"grades": [{"id": graded.pk, "score": 11}]}, format="json"
+        )
+        self.assertFalse(response.data["data"][0]["success"])
+
+    def test_only_owner_can_grade(self):
+        other_user = User.objects.create(
+            email="other@example.com", is_instructor=True
+        )
+        Instructor.objects.create(user=other_user)
+        self.client.force_authenticate(user=other_user)
+        response = self.client.post(
+            self.url, {"grades": [{"id": 1, "score": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_students_cannot_grade(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(
+            self.url, {"grades": [{"id": 1, "score": 1}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rejects_grading_after_due_date(self):
+        self.assignment.due = timezone.now() - timedelta(days=1)
+        self.assignment.save()
+        graded = Submission.objects.filter(assignment=self.assignment).first()
+        response = self.client.post(
+            self.url, {"grades": [{"id": graded.pk, "score": 5}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_grading_expired_assignment(self):
+        self.assignment.status = Assignment.Status.EXPIRED
+        self.assignment.save()
+        graded = Submission.objects.filter(assignment=self.assignment).first()
+        response = self.client.post(
+            self.url, {"grades": [{"id": graded.pk, "score": 5}]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExpireOverdueAssignmentsTest(SubmissionTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        overdue, upcoming = self.assignments
+        Assignment.objects.filter(pk=overdue.pk).update(due=now - timedelta(hours=1))
+        Assignment.objects.filter(pk=upcoming.pk).update(due=now + timedelta(hours=1))
+        self.sent = []
+        assignments_expired.connect(self.receive)
+        self.addCleanup(assignments_expired.disconnect, self.receive)
+
+    def receive(self, sender, **kwargs):
+        self.sent.append(kwargs)
+
+    def test_expires_only_pending_overdue_assignments(self):
+        overdue, upcoming = self.assignments
+        before = Assignment.objects.get(pk=overdue.pk).modified_date
+
+        # savepoint, select, update, release and the dashboard receiver's select
+        with self.assertNumQueries(5):
+            self.assertEqual(expire_overdue_assignments(), 1)
+
+        overdue.refresh_from_db()
+        upcoming.refresh_from_db()
+        self.assertEqual(overdue.status, Assignment.Status.EXPIRED)
+        self.assertGreater(overdue.modified_date, before)
+        self.assertEqual(upcoming.status, Assignment.Status.PENDING)
+        self.assertEqual(expire_overdue_assignments(), 0)
+
+    def test_notifies_in_batches(self):
+        Assignment.objects.update(due=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(expire_overdue_assignments(batch_size=1), 2)
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(self.sent[0]["classroom_ids"], {self.classroom.pk})
+        self.assertEqual(
+            sorted(id for batch in self.sent for id in batch["assignment_ids"]),
+            sorted(assignment.pk for assignment in self.assignments),
+        )
+
+    def test_updates_only_the_locked_rows_in_batches(self):
+        Assignment.objects.update(due=timezone.now() - timedelta(hours=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(expire_overdue_assignments(batch_size=1), 2)
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 2)
+        for sql in updates:
+            self.assertIn('"api_assignment"."id" IN', sql)
+            self.assertNotIn('"due"', sql.split("WHERE")[1])
+
+    def test_command_sweeps_once(self):
+        out = StringIO()
+        call_command("expire_assignments", stdout=out)
+        self.assertIn("1 assignments expired", out.getvalue())
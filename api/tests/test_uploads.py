@@ -0,0 +1,412 @@
+from datetime import timedelta
+
+from botocore.stub import ANY, Stubber
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from api.aws_integrations import s3_get_client, s3_reset_client
+from api.models import ClassRoom, CourseMaterial, Job, Student, User
+from api.services import (
+    UploadVerificationError,
+    sweep_abandoned_multipart_uploads,
+    verify_uploads,
+)
+from api.utils import get_tokens_for_user
+
+PASSWORD = "pAssw0rd!"
+
+S3_SETTINGS = dict(
+    AWS_S3_ACCESS_KEY_ID="test",
+    AWS_S3_SECRET_ACCESS_KEY="test",
+    AWS_S3_REGION_NAME="us-east-1",
+    AWS_STORAGE_BUCKET_NAME="test-bucket",
+    AWS_S3_ENDPOINT_URL="http://127.0.0.1:9000",
+)
+
+
+@override_settings(**S3_SETTINGS)
+class CourseMaterialUploadTest(APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.user = User.objects.create_user(
+            email="rep@example.com",
+            password=PASSWORD,
+            first_name="Class",
+            last_name="Rep",
+            is_student=True,
+        )
+        Student.objects.create(
+            user=self.user, classroom=self.classroom, class_representative=True
+        )
+        token = get_tokens_for_user(self.user)["access"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+
+    def tearDown(self):
+        s3_reset_client()
+
+    def test_single_start_writes_once(self):
+        # classroom lookup + insert + user lookup in the view
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                "/api/v1/course-material/start_upload",
+                {"file_name": "notes.pdf", "file_type": "application/pdf", "classroom": "CPE 500L"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        material = CourseMaterial.objects.get(pk=response.data["id"])
+        self.assertEqual(material.file.name, f"file/{material.file_name}")
+        self.assertEqual(response.data["fields"]["key"], material.file.name)
+
+    def test_batch_start_and_finish(self):
+        files = [
+            {"file_name": f"lecture-{i}.pdf", "file_type": "application/pdf"}
+            for i in range(40)
+        ]
+        # classroom lookup + one insert, plus an id fetch without RETURNING
+        expected = 2 if connection.features.can_return_rows_from_bulk_insert else 3
+        with self.assertNumQueries(expected):
+            response = self.client.post(
+                "/api/v1/course-material/start_upload/batch",
+                {"files": files, "classroom": "CPE 500L"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        uploads = response.data["data"]
+        self.assertEqual(len(uploads), 40)
+        materials = CourseMaterial.objects.in_bulk([upload["id"] for upload in uploads])
+        for upload in uploads:
+            self.assertEqual(upload["fields"]["key"], materials[upload["id"]].file.name)
+
+        ids = [upload["id"] for upload in uploads]
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload/batch",
+            {"file_ids": ids},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(response.data["data"]["ids"], ids)
+        self.assertFalse(
+            CourseMaterial.objects.filter(upload_finished_at__isnull=True).exists()
+        )
+
+    def test_batch_finish_ignores_other_users_files(self):
+        other = CourseMaterial.objects.create(file_name="other.pdf")
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload/batch",
+            {"file_ids": [other.pk]},
+            format="json",
+        )
+        self.assertEqual(response.data["data"]["ids"], [])
+        other.refresh_from_db()
+        self.assertIsNone(other.upload_finished_at)
+
+    def test_abort_needs_a_multipart_upload(self):
+        material = CourseMaterial.objects.create(
+            file_name="notes.pdf", uploaded_by=self.user
+        )
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload",
+            {"file_id": material.pk, "abort": True},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        material.refresh_from_db()
+        self.assertIsNone(material.upload_finished_at)
+
+    def test_finish_ignores_other_users_files(self):
+        other = CourseMaterial.objects.create(file_name="other.pdf")
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload", {"file_id": other.pk}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        other.refresh_from_db()
+        self.assertIsNone(other.upload_finished_at)
+
+    def test_batch_start_is_capped(self):
+        files = [{"file_name": "a.pdf", "file_type": "application/pdf"}] * 51
+        response = self.client.post(
+            "/api/v1/course-material/start_upload/batch",
+            {"files": files, "classroom": "CPE 500L"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(**S3_SETTINGS, FILE_MULTIPART_PART_SIZE=5 * 1024 * 1024)
+class CourseMaterialMultipartUploadTest(APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.user = User.objects.create_user(
+            email="rep@example.com",
+            password=PASSWORD,
+            first_name="Class",
+            last_name="Rep",
+            is_student=True,
+        )
+        Student.objects.create(
+            user=self.user, classroom=self.classroom, class_representative=True
+        )
+        self.client.force_authenticate(user=self.user)
+        self.stubber = Stubber(s3_get_client())
+        self.stubber.activate()
+
+    def tearDown(self):
+        self.stubber.deactivate()
+        s3_reset_client()
+
+    def _start(self, file_size):
+        self.stubber.add_response(
+            "create_multipart_upload",
+            {"UploadId": "upload-1", "Bucket": "test-bucket", "Key": "file/x.mp4"},
+            {
+                "Bucket": "test-bucket",
+                "Key": ANY,
+                "ACL": "private",
+                "ContentType": "video/mp4",
+            },
+        )
+        return self.client.post(
+            "/api/v1/course-material/start_upload/multipart",
+            {
+                "file_name": "lecture.mp4",
+                "file_type": "video/mp4",
+                "file_size": file_size,
+                "classroom": "CPE 500L",
+            },
+        )
+
+    def test_start_presigns_every_part(self):
+        response = self._start(file_size=12 * 1024 * 1024)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["upload_id"], "upload-1")
+        self.assertEqual(response.data["part_size"], 5 * 1024 * 1024)
+        parts = response.data["parts"]
+        self.assertEqual([part["part_number"] for part in parts], [1, 2, 3])
+        for part in parts:
+            self.assertIn("uploadId=upload-1", part["url"])
+            self.assertIn(f"partNumber={part['part_number']}", part["url"])
+        material = CourseMaterial.objects.get(pk=response.data["id"])
+        self.assertEqual(material.upload_id, "upload-1")
+
+    def test_finish_completes_multipart_upload(self):
+        file_id = self._start(file_size=6 * 1024 * 1024).data["id"]
+        material = CourseMaterial.objects.get(pk=file_id)
+        self.stubber.add_response(
+            "complete_multipart_upload",
+            {},
+            {
+                "Bucket": "test-bucket",
+                "Key": material.file.name,
+                "UploadId": "upload-1",
+                "MultipartUpload": {
+                    "Parts": [
+                        {"PartNumber": 1, "ETag": '"a"'},
+                        {"PartNumber": 2, "ETag": '"b"'},
+                    ]
+                },
+            },
+        )
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload",
+            {
+                "file_id": file_id,
+                "parts": [
+                    {"part_number": 2, "etag": '"b"'},
+                    {"part_number": 1, "etag": '"a"'},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.stubber.assert_no_pending_responses()
+        material.refresh_from_db()
+        self.assertIsNone(material.upload_id)
+        self.assertIsNotNone(material.upload_finished_at)
+
+    def test_only_the_uploader_completes_multipart_upload(self):
+        file_id = self._start(file_size=6 * 1024 * 1024).data["id"]
+        other = User.objects.create_user(
+            email="other@example.com", password=PASSWORD, is_student=True
+        )
+        self.client.force_authenticate(user=other)
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload",
+            {"file_id": file_id, "parts": [{"part_number": 1, "etag": '"a"'}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.stubber.assert_no_pending_responses()
+        self.assertIsNone(CourseMaterial.objects.get(pk=file_id).upload_finished_at)
+
+    def test_finish_requires_parts(self):
+        file_id = self._start(file_size=6 * 1024 * 1024).data["id"]
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload", {"file_id": file_id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_abort_removes_upload(self):
+        file_id = self._start(file_size=6 * 1024 * 1024).data["id"]
+        self.stubber.add_response("abort_multipart_upload", {})
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload",
+            {"file_id": file_id, "abort": True},
+        )
+        self.assertTrue(response.data["aborted"])
+        self.assertFalse(CourseMaterial.objects.filter(pk=file_id).exists())
+
+    def test_sweeper_aborts_abandoned_uploads(self):
+        file_id = self._start(file_size=6 * 1024 * 1024).data["id"]
+        started = timezone.now() - timedelta(days=2)
+        CourseMaterial.objects.filter(pk=file_id).update(created_date=started)
+        self.stubber.add_response("abort_multipart_upload", {})
+        self.stubber.add_response(
+            "list_multipart_uploads",
+            {
+                "Uploads": [
+                    {"Key": "file/gone.mp4", "UploadId": "orphan", "Initiated": started},
+                    {"Key": "file/new.mp4", "UploadId": "fresh", "Initiated": timezone.now()},
+                ]
+            },
+        )
+        self.stubber.add_response("abort_multipart_upload", {})
+
+        aborted = sweep_abandoned_multipart_uploads(
+            older_than=timezone.now() - timedelta(days=1)
+        )
+
+        self.assertEqual(aborted, 2)
+        self.stubber.assert_no_pending_responses()
+        self.assertFalse(CourseMaterial.objects.filter(pk=file_id).exists())
+
+
+# One connection, so the stubbed HEADs are answered in order
+@override_settings(**S3_SETTINGS, AWS_S3_MAX_POOL_CONNECTIONS=1)
+class UploadVerificationTest(APITestCase):
+    def setUp(self):
+        self.classroom = ClassRoom.objects.create(name="CPE 500L")
+        self.user = User.objects.create_user(
+            email="rep@example.com",
+            password=PASSWORD,
+            first_name="Class",
+            last_name="Rep",
+            is_student=True,
+        )
+        Student.objects.create(
+            user=self.user, classroom=self.classroom, class_representative=True
+        )
+        self.client.force_authenticate(user=self.user)
+        self.stubber = Stubber(s3_get_client())
+        self.stubber.activate()
+
+    def tearDown(self):
+        self.stubber.deactivate()
+        s3_reset_client()
+
+    def _material(self, name, **kwargs):
+        fields = dict(
+            file_name=name,
+            file=f"file/{name}",
+            file_type="application/pdf",
+            uploaded_by=self.user,
+            classroom=self.classroom,
+            upload_finished_at=timezone.now(),
+        )
+        return CourseMaterial.objects.create(**{**fields, **kwargs})
+
+    def _head(self, material, **response):
+        self.stubber.add_response(
+            "head_object",
+            response,
+            {
+                "Bucket": "test-bucket",
+                "Key": material.file.name,
+                "ChecksumMode": "ENABLED",
+            },
+        )
+
+    def _listed(self):
+        response = self.client.get("/api/v1/course-materials")
+        return [material["id"] for material in response.json()["data"]]
+
+    def test_listing_hides_upload_internals(self):
+        self._material(
+            "notes.pdf",
+            upload_id="upload-1",
+            verification=CourseMaterial.Verification.VERIFIED,
+            verification_error="ChecksumSHA256 mismatch",
+            checksum="abc",
+            etag='"abc"',
+        )
+        response = self.client.get("/api/v1/course-materials")
+
+        material = response.json()["data"][0]
+        self.assertTrue(material["verified"])
+        for field in ("upload_id", "verification", "verification_error", "checksum"):
+            self.assertNotIn(field, material)
+
+    def test_finish_queues_verification(self):
+        material = self._material("notes.pdf", upload_finished_at=None)
+        response = self.client.post(
+            "/api/v1/course-material/finish_upload", {"file_id": material.pk}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        job = Job.objects.get()
+        self.assertEqual(job.name, "api.services.verify_uploads")
+        self.assertEqual(job.args, [[material.pk]])
+        material.refresh_from_db()
+        self.assertEqual(material.verification, CourseMaterial.Verification.PENDING)
+        self.assertEqual(self._listed(), [])
+
+    def test_verification_records_what_s3_reports(self):
+        good = self._material("good.pdf")
+        wrong_type = self._material("wrong.pdf")
+        missing = self._material("missing.pdf")
+        sized = self._material("lecture.pdf", declared_size=2048)
+        self._head(
+            good,
+            ContentLength=1024,
+            ContentType="application/pdf",
+            ETag='"abc"',
+            ChecksumSHA256="c2hh",
+        )
+        self._head(wrong_type, ContentLength=1024, ContentType="text/html", ETag='"d"')
+        self.stubber.add_client_error(
+            "head_object", service_error_code="404", http_status_code=404
+        )
+        self._head(sized, ContentLength=1024, ContentType="application/pdf", ETag='"e"')
+
+        with self.assertNumQueries(2):
+            verify_uploads([good.pk, wrong_type.pk, missing.pk, sized.pk])
+
+        self.stubber.assert_no_pending_responses()
+        good.refresh_from_db()
+        self.assertEqual(good.verification, CourseMaterial.Verification.VERIFIED)
+        self.assertEqual((good.size, good.etag), (1024, "abc"))
+        self.assertEqual(good.checksum, "sha256:c2hh")
+        self.assertIsNotNone(good.verified_at)
+        for material in (wrong_type, missing, sized):
+            material.refresh_from_db()
+            self.assertEqual(
+                material.verification, CourseMaterial.Verification.REJECTED
+            )
+            self.assertTrue(material.verification_error)
+        self.assertEqual(self._listed(), [good.pk])
+
+    def test_unanswered_uploads_stay_pending(self):
+        flaky = self._material("flaky.pdf")
+        good = self._material("good.pdf")
+        self.stubber.add_client_error(
+            "head_object", service_error_code="InternalError", http_status_code=500
+        )
+        self._head(good, ContentLength=10, ContentType="application/pdf", ETag='"a"')
+
+        with self.assertRaises(UploadVerificationError):
+            verify_uploads([flaky.pk, good.pk])
+
+        flaky.refresh_from_db()
+        good.refresh_from_db()
+        self.assertEqual(flaky.verification, CourseMaterial.Verification.PENDING)
+        self.assertEqual(good.verification, CourseMaterial.Verification.VERIFIED)
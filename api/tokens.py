@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Present on every token issued by ProfileRefreshToken; older tokens
+# without it are resolved against the database as before.
+PROFILE_CLAIM = "is_student"
+
+
+def user_active_key(user_id):
+    return f"auth:user:{user_id}:active"
+
+
+def is_user_active(user_id):
+    """
+    Whether the user still exists and may sign in. Cached for
+    AUTH_USER_CACHE_TIMEOUT so authenticating stays query free; saving or
+    deleting the user drops the entry, and other processes catch up when
+    their entry expires.
+    """
+    key = user_active_key(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = (
+            get_user_model()
+            .objects.filter(pk=user_id, is_active=True, is_deleted=False)
+            .exists()
+        )
+        cache.set(key, active, settings.AUTH_USER_CACHE_TIMEOUT)
+    return active
+
+
+def get_profile_claims(user):
+    """
+    Role and profile ids that permission checks and managers read from
+    `request.user`, so they can be served from the token alone.
+    """
+    claims = {
+        "is_student": user.is_student,
+        "is_instructor": user.is_instructor,
+        "is_staff": user.is_staff,
+        "is_superuser": user.is_superuser,
+        "student_id": None,
+        "classroom_id": None,
+        "instructor_id": None,
+    }
+    try:
+        if user.is_student:
+            claims["student_id"] = user.student.pk
+            claims["classroom_id"] = user.student.classroom_id
+        if user.is_instructor:
+            claims["instructor_id"] = user.instructor.pk
+    except ObjectDoesNotExist:
+        pass
+    return claims
+
+
+class ProfileRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's profile claims. Access tokens derived
+    from it copy the same claims; CookieTokenRefreshSerializer reads them
+    from the user again when minting a new one.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, value in get_profile_claims(user).items():
+            token[claim] = value
+        cache.set(
+            user_active_key(user.pk),
+            user.is_active and not user.is_deleted,
+            settings.AUTH_USER_CACHE_TIMEOUT,
+        )
+        return token
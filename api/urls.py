@@ -1,4 +1,5 @@
 from django.urls import path
+from api import async_views
 from api.views import (
     CookieTokenRefreshView,
     UserRegistrationView,
@@ -7,22 +8,50 @@ from api.views import (
     SubmissionsDetailView,
     AssignmentsDetailView,
     AssignmentsListView,
+    AssignmentGradesView,
+    ClassroomGradebookExport,
     CourseMaterialsListView,
     CourseMaterialFinishUpload,
     CourseMaterialStartUpload,
+    CourseMaterialBatchFinishUpload,
+    CourseMaterialBatchStartUpload,
+    CourseMaterialMultipartStartUpload,
     AccountInformation,
+    NotificationsListView,
+    NotificationsMarkRead,
+    NotificationsUnreadCount,
 )
 
 urlpatterns = [
     path("token/refresh", CookieTokenRefreshView.as_view(), name="token_refresh"),
     path("register", UserRegistrationView.as_view(), name="register"),
     path("login", UserLoginView.as_view(), name="login"),
+    path("register/async", async_views.register, name="register_async"),
+    path("login/async", async_views.login, name="login_async"),
     path("assignments/<int:pk>", AssignmentsDetailView.as_view()),
     path("assignments", AssignmentsListView.as_view()),
+    path("assignments/<int:pk>/grades", AssignmentGradesView.as_view()),
+    path(
+        "classrooms/<int:pk>/gradebook.<str:file_format>",
+        ClassroomGradebookExport.as_view(),
+    ),
     path("submissions/<int:pk>", SubmissionsDetailView.as_view()),
     path("submissions", SubmissionListView.as_view()),
     path("course-materials", CourseMaterialsListView.as_view()),
     path("course-material/start_upload", CourseMaterialStartUpload.as_view()),
     path("course-material/finish_upload", CourseMaterialFinishUpload.as_view()),
+    path(
+        "course-material/start_upload/batch", CourseMaterialBatchStartUpload.as_view()
+    ),
+    path(
+        "course-material/start_upload/multipart",
+        CourseMaterialMultipartStartUpload.as_view(),
+    ),
+    path(
+        "course-material/finish_upload/batch", CourseMaterialBatchFinishUpload.as_view()
+    ),
     path("profile", AccountInformation.as_view()),
+    path("notifications", NotificationsListView.as_view()),
+    path("notifications/unread_count", NotificationsUnreadCount.as_view()),
+    path("notifications/read", NotificationsMarkRead.as_view()),
 ]
@@ -1,10 +1,13 @@
+import hashlib
+
 from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.exceptions import ImproperlyConfigured
+from .tokens import ProfileRefreshToken
 
 cookie_details = dict(
     key=settings.SIMPLE_JWT["AUTH_COOKIE"],
-    expires=settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"],
+    # The cookie holds the refresh token
+    expires=settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
     secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
     httponly=settings.SIMPLE_JWT["AUTH_COOKIE_HTTP_ONLY"],
     samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
@@ -15,8 +18,17 @@ def file_generate_upload_path(instance, filename):
     return f"{upload_type}/{instance.file_name}"
 
 
+def submission_content_digest(content):
+    """
+    SHA-256 of the submission content with case and whitespace normalised,
+    so resubmitting the same essay with cosmetic edits still matches.
+    """
+    normalized = " ".join((content or "").split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
 def get_tokens_for_user(user):
-    refresh = RefreshToken.for_user(user)
+    refresh = ProfileRefreshToken.for_user(user)
     return dict(refresh=str(refresh), access=str(refresh.access_token))
 
 
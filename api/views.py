@@ -1,24 +1,39 @@
-from django.db.models import Sum, Q
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
+from django.utils.text import slugify
 from rest_framework import parsers, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-import time
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenRefreshView
 from api.permissions import IsInstructorOrReadOnly, IsStudentOrReadOnly
-from .services import FileDirectUploadService
+from .caching import ClassroomResponseCache
+from .conditional import ResourceVersion
+from .downloads import DownloadUrlService
+from .exports import stream_csv, stream_xlsx
+from .jobs import defer
+from .notifications import mark_read, notify_submissions_graded, unread_count
+from .pagination import KeysetPagination
+from .streaming import JSONListStreamer
+from .services import (
+    BulkGradingService,
+    FileDirectUploadService,
+    GradebookService,
+    GradingError,
+    StudentDashboardService,
+)
 from .models import (
     Assignment,
+    ClassRoom,
     CourseMaterial,
+    Notification,
     Submission,
     User,
 )
-from django.apps import apps
 
 from .serializers import (
     AssignmentSerializer,
+    BulkGradeSerializer,
     CookieTokenRefreshSerializer,
     CourseMaterialSerializer,
     SubmissionSerializer,
@@ -26,6 +41,11 @@ from .serializers import (
     UserRegistrationSerializer,
     CourseMaterialStartSerializer,
     CourseMaterialFinishSerializer,
+    CourseMaterialMultipartStartSerializer,
+    CourseMaterialBatchStartSerializer,
+    CourseMaterialBatchFinishSerializer,
+    NotificationReadSerializer,
+    NotificationSerializer,
     UserSerializer,
 )
 from .utils import cookie_details, get_tokens_for_user
@@ -43,26 +63,19 @@ class CookieTokenRefreshView(TokenRefreshView):
 
 class AccountInformation(APIView):
     permission_classes = (IsAuthenticated,)
+    query_budgets = {"GET": 2}
 
     def get(self, request):
-        user = User.objects.get(pk=request.user.pk)
-        if user.is_instructor:
-            data = {}
+        if request.user.is_student:
+            data = StudentDashboardService(request.user).get()
         else:
-            profile = user.student
-            data = {
-                "cumulative_grades": self._get_cumulative_grades(profile),
-                "total_assignments": self._get_total_assignments(profile),
-                "submissions_progress": self._get_submissions_progress(profile),
-                # "latest_course_materials": self.get_latest_entities(
-                #     profile, "CourseMaterials"
-                # ),
-                "latest_assignments": self._get_latest_entities(profile, "Assignment"),
-            }
-        from pprint import pprint
-
-        pprint(data)
-        return Response(status=status.HTTP_200_OK)
+            data = {}
+        response_data = {
+            "success": True,
+            "message": "Profile fetched successfully",
+            "data": data,
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
 
     def patch(self, request):
         user = get_object_or_404(User, pk=request.user.pk)
@@ -78,35 +91,6 @@ class AccountInformation(APIView):
         }
         return Response(data=data, status=status.HTTP_200_OK)
 
-    def _get_cumulative_grades(self, profile):
-
-        total_score = profile.submissions.all().aggregate(total_score=Sum("score"))
-        total_marks = profile.classroom.assignments.aggregate(total_score=Sum("marks"))
-
-        print(total_score, total_marks)
-        return ""
-        # return total_score / total_marks * 100
-
-    def _get_total_assignments(self, profile):
-        return profile.classroom.assignments.all().count()
-
-    def _get_submissions_progress(self, profile):
-        aqs = profile.submissions.all().count()
-        sqs = profile.submissions.filter(
-            Q(status="SUBMITTED") & Q(student=profile)
-        ).count()
-        # sqs = Submission.objects.filter(student=user.student).count()
-        # aqs = Submission.objects.filter(
-        #     Q(status="SUBMITTED") & Q(student=user.student)
-        # ).count()
-        if aqs == 0 and sqs == 0:
-            return 0
-        return sqs / aqs * 100
-
-    def _get_latest_entities(self, profile, klass):
-        Model = apps.get_model("api", klass)
-        return Model.objects.filter(classroom=profile.classroom)[:15]
-
 
 class UserLoginView(APIView):
     serializer_class = UserLoginSerializer
@@ -167,16 +151,50 @@ class AssignmentsListView(APIView):
 
     serializer_class = AssignmentSerializer
     permission_classes = (IsInstructorOrReadOnly,)
+    pagination_class = KeysetPagination
+    streaming_class = JSONListStreamer
+    response_cache = ClassroomResponseCache("assignments")
+    query_budgets = {"GET": 2}
 
     def get(self, request):
+        streamer = self.streaming_class(self.serializer_class)
+        # Every student in a classroom gets the same list, so it is cached
+        cache_key = None
+        if request.user.is_student and not streamer.should_stream(request):
+            cache_key = self.response_cache.get_key(
+                request, request.user.student.classroom_id
+            )
+            cached = self.response_cache.get_response(request, cache_key)
+            if cached is not None:
+                return cached
+
         assignments = Assignment.objects.get_assignments(user=request.user)
-        serializer = self.serializer_class(assignments, many=True)
-        response_data = {
-            "success": True,
-            "message": "Assignments fetched successfully",
-            "data": serializer.data,
-        }
-        return Response(response_data, status=status.HTTP_200_OK)
+        version = ResourceVersion(
+            assignments,
+            many=True,
+            related=Assignment.objects.list_related_fields,
+        )
+        not_modified = version.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
+        if streamer.should_stream(request):
+            return version.set_headers(
+                streamer.get_response(assignments, "Assignments fetched successfully")
+            )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(assignments, request)
+        serializer = self.serializer_class(page, many=True)
+        response_data = paginator.get_paginated_response_data(
+            serializer.data, "Assignments fetched successfully"
+        )
+        response = version.set_headers(
+            Response(response_data, status=status.HTTP_200_OK)
+        )
+        if cache_key is not None:
+            self.response_cache.set_response(cache_key, response)
+        return response
 
     def post(self, request):
         serializer = self.serializer_class(
@@ -200,14 +218,27 @@ class AssignmentsDetailView(APIView):
 
     serializer_class = AssignmentSerializer
     permission_classes = (IsInstructorOrReadOnly,)
+    query_budgets = {"GET": 2}
 
     def get_object(self, pk):
         try:
-            return Assignment.objects.get(pk=pk)
+            return Assignment.objects.select_related(
+                *Assignment.objects.list_related_fields
+            ).get(pk=pk)
         except Assignment.DoesNotExist:
             raise Http404
 
     def get(self, request, pk):
+        version = ResourceVersion(
+            Assignment.objects.filter(pk=pk),
+            related=Assignment.objects.list_related_fields,
+        )
+        if not version.exists:
+            raise Http404
+        not_modified = version.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
         assignment = self.get_object(pk)
         serializer = self.serializer_class(assignment)
         response_data = {
@@ -215,7 +246,7 @@ class AssignmentsDetailView(APIView):
             "message": "Assignment fetched successfully",
             "data": serializer.data,
         }
-        return Response(response_data)
+        return version.set_headers(Response(response_data))
 
     def patch(self, request, pk):
         if request.user.is_instructor:
@@ -246,6 +277,92 @@ class AssignmentsDetailView(APIView):
         return Response(response_data, status=status.HTTP_204_NO_CONTENT)
 
 
+class AssignmentGradesView(APIView):
+    """
+    Grade many submissions of an assignment in one request.
+    Only the instructor who owns the assignment can grade it.
+    """
+
+    serializer_class = BulkGradeSerializer
+    permission_classes = (IsInstructorOrReadOnly,)
+    # Savepoints included: the select_for_update runs in an atomic block.
+    # The last query queues the graded students' notifications
+    query_budgets = {"POST": 6}
+
+    def post(self, request, pk):
+        if not request.user.is_instructor:
+            response_data = {
+                "success": False,
+                "message": "Only Instructors can mark assignments",
+            }
+            return Response(response_data, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        service = BulkGradingService(request.user)
+        try:
+            assignment = service.get_assignment(pk)
+        except Assignment.DoesNotExist:
+            raise Http404
+
+        try:
+            results = service.grade(assignment, serializer.validated_data["grades"])
+        except GradingError as e:
+            response_data = {"success": False, "message": str(e)}
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+        response_data = {
+            "success": True,
+            "message": "Submissions graded successfully",
+            "data": results,
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class ClassroomGradebookExport(APIView):
+    """
+    Download an instructor's gradebook for a classroom as CSV or XLSX.
+    The sheet is streamed row by row as it is read from the database.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    writers = {
+        "csv": (stream_csv, "text/csv"),
+        "xlsx": (
+            stream_xlsx,
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        ),
+    }
+    query_budgets = {"GET": 3}
+
+    def get(self, request, pk, file_format):
+        if not request.user.is_instructor:
+            response_data = {
+                "success": False,
+                "message": "Only Instructors can export gradebooks",
+            }
+            return Response(response_data, status=status.HTTP_403_FORBIDDEN)
+        if file_format not in self.writers:
+            raise Http404
+
+        service = GradebookService(request.user)
+        try:
+            classroom = service.get_classroom(pk)
+        except ClassRoom.DoesNotExist:
+            raise Http404
+
+        writer, content_type = self.writers[file_format]
+        if file_format == "xlsx":
+            content = writer(service.rows(classroom), sheet_name=classroom.name)
+        else:
+            content = writer(service.rows(classroom))
+        response = StreamingHttpResponse(content, content_type=content_type)
+        filename = f"{slugify(classroom.name)}-gradebook.{file_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class SubmissionListView(APIView):
     """
     List all Submission or create a new one.
@@ -256,16 +373,34 @@ class SubmissionListView(APIView):
 
     serializer_class = SubmissionSerializer
     permission_classes = (IsStudentOrReadOnly,)
+    pagination_class = KeysetPagination
+    streaming_class = JSONListStreamer
+    query_budgets = {"GET": 2}
 
     def get(self, request):
         submissions = Submission.objects.get_submissions(user=request.user)
-        serializer = self.serializer_class(submissions, many=True)
-        response_data = {
-            "success": True,
-            "message": "Submissions fetched successfully",
-            "data": serializer.data,
-        }
-        return Response(response_data, status=status.HTTP_200_OK)
+        version = ResourceVersion(
+            submissions,
+            many=True,
+            related=Submission.objects.list_related_fields,
+        )
+        not_modified = version.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
+        streamer = self.streaming_class(self.serializer_class)
+        if streamer.should_stream(request):
+            return version.set_headers(
+                streamer.get_response(submissions, "Submissions fetched successfully")
+            )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(submissions, request)
+        serializer = self.serializer_class(page, many=True)
+        response_data = paginator.get_paginated_response_data(
+            serializer.data, "Submissions fetched successfully"
+        )
+        return version.set_headers(Response(response_data, status=status.HTTP_200_OK))
 
     def post(self, request):
         serializer = self.serializer_class(
@@ -289,46 +424,63 @@ class SubmissionsDetailView(APIView):
 
     serializer_class = SubmissionSerializer
     # permission_classes = (IsStudentOrReadOnly, )
+    query_budgets = {"GET": 2}
 
     def get_object(self, pk):
         try:
-            return Submission.objects.get(pk=pk)
+            return Submission.objects.select_related(
+                *Submission.objects.list_related_fields
+            ).get(pk=pk)
         except Submission.DoesNotExist:
             raise Http404
 
     def get(self, request, pk, format=None):
+        version = ResourceVersion(
+            Submission.objects.filter(pk=pk),
+            related=Submission.objects.list_related_fields,
+        )
+        if not version.exists:
+            raise Http404
+        not_modified = version.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
         submission = self.get_object(pk)
         serializer = self.serializer_class(submission)
-        return Response(serializer.data)
+        return version.set_headers(Response(serializer.data))
 
     def patch(self, request, pk, format=None):  # Mark Submission
         """
         Only Instructors are capable of editing submissions after submission
         """
         submission = self.get_object(pk)
-        print(submission.assignment.due.timestamp() * 1000, time.time(), "here====")
         serializer = self.serializer_class(submission, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        if submission.assignment.due.timestamp() * 1000 < time.time():
+        if submission.assignment.has_expired():
             response_data = {
                 "success": False,
                 "message": "Cannot mark submission after submission date",
             }
             return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-        if request.user.is_student:
-            serializer.save()
+        if not request.user.is_instructor:
             response_data = {
-                "success": True,
-                "message": "Submission marked successfully",
-                "data": serializer.data,
+                "success": False,
+                "message": "Only Instructors can mark assignments",
             }
-            return Response(response_data, status=status.HTTP_200_OK)
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        if submission.assignment.instructor_id != request.user.instructor.pk:
+            raise Http404
+
+        serializer.save()
+        if "score" in serializer.validated_data:
+            defer(notify_submissions_graded, [submission.pk])
         response_data = {
-            "success": False,
-            "message": "Only Instructors can mark assignments",
+            "success": True,
+            "message": "Submission marked successfully",
+            "data": serializer.data,
         }
-        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(response_data, status=status.HTTP_200_OK)
 
     def delete(self, request, pk):
         print(pk)
@@ -344,18 +496,54 @@ class SubmissionsDetailView(APIView):
 class CourseMaterialsListView(APIView):
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
     serializer_class = CourseMaterialSerializer
+    pagination_class = KeysetPagination
+    streaming_class = JSONListStreamer
+    response_cache = ClassroomResponseCache("course_materials")
+    query_budgets = {"GET": 2}
 
     def get(self, request):
+        streamer = self.streaming_class(self.serializer_class)
+        cache_key = None
+        if request.user.is_student and not streamer.should_stream(request):
+            cache_key = self.response_cache.get_key(
+                request, request.user.student.classroom_id
+            )
+            cached = self.response_cache.get_response(request, cache_key)
+            if cached is not None:
+                return cached
+
         course_materials = CourseMaterial.objects.get_course_materials(
             user=request.user
         )
-        serializer = self.serializer_class(course_materials, many=True)
-        response_data = {
-            "success": True,
-            "message": "Course Materials fetched successfully",
-            "data": serializer.data,
-        }
-        return Response(response_data, status=status.HTTP_200_OK)
+        version = ResourceVersion(
+            course_materials,
+            many=True,
+            related=("uploaded_by",),
+            renewed_at=DownloadUrlService.window_start(),
+        )
+        not_modified = version.get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+
+        if streamer.should_stream(request):
+            return version.set_headers(
+                streamer.get_response(
+                    course_materials, "Course Materials fetched successfully"
+                )
+            )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(course_materials, request)
+        serializer = self.serializer_class(page, many=True)
+        response_data = paginator.get_paginated_response_data(
+            serializer.data, "Course Materials fetched successfully"
+        )
+        response = version.set_headers(
+            Response(response_data, status=status.HTTP_200_OK)
+        )
+        if cache_key is not None:
+            self.response_cache.set_response(cache_key, response)
+        return response
 
 
 class CourseMaterialStartUpload(APIView):
@@ -385,7 +573,142 @@ class CourseMaterialFinishUpload(APIView):
         auth_user = get_object_or_404(User, id=request.user.pk)
         service = FileDirectUploadService(auth_user)
 
-        file = get_object_or_404(CourseMaterial, id=file_id)
-        service.finish(file=file)
+        file = get_object_or_404(
+            CourseMaterial, id=file_id, uploaded_by_id=request.user.pk
+        )
+        if serializer.validated_data["abort"]:
+            if not file.upload_id:
+                response_data = {
+                    "success": False,
+                    "message": "Only multipart uploads in progress can be aborted",
+                }
+                return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+            service.abort_multipart(file=file)
+            return Response({"id": file_id, "aborted": True})
+
+        if not file.upload_id:
+            service.finish(file=file)
+            return Response({"id": file.id})
+
+        parts = serializer.validated_data.get("parts")
+        if not parts:
+            response_data = {
+                "success": False,
+                "message": "Uploaded parts are required to complete a multipart upload",
+            }
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        service.finish_multipart(file=file, parts=parts)
 
         return Response({"id": file.id})
+
+
+class CourseMaterialMultipartStartUpload(APIView):
+    serializer_class = CourseMaterialMultipartStartSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        service = FileDirectUploadService(request.user)
+
+        multipart_data = service.start_multipart(**serializer.validated_data)
+
+        return Response(data=multipart_data)
+
+
+class CourseMaterialBatchStartUpload(APIView):
+    serializer_class = CourseMaterialBatchStartSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        service = FileDirectUploadService(request.user)
+
+        presigned_data = service.start_many(**serializer.validated_data)
+
+        response_data = {
+            "success": True,
+            "message": "Uploads started successfully",
+            "data": presigned_data,
+        }
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+class CourseMaterialBatchFinishUpload(APIView):
+    serializer_class = CourseMaterialBatchFinishSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        service = FileDirectUploadService(request.user)
+
+        finished_ids = service.finish_many(serializer.validated_data["file_ids"])
+
+        response_data = {
+            "success": True,
+            "message": "Uploads finished successfully",
+            "data": {"ids": finished_ids},
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class NotificationsListView(APIView):
+    """
+    List the signed in user's notifications, newest first.
+    """
+
+    serializer_class = NotificationSerializer
+    permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    query_budgets = {"GET": 1}
+
+    def get(self, request):
+        notifications = Notification.objects.filter(user_id=request.user.pk)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(notifications, request)
+        serializer = self.serializer_class(page, many=True)
+        response_data = paginator.get_paginated_response_data(
+            serializer.data, "Notifications fetched successfully"
+        )
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class NotificationsUnreadCount(APIView):
+    """
+    The unread badge, read from the user's inbox counter. Cheap enough to
+    poll instead of the list endpoints.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    query_budgets = {"GET": 1}
+
+    def get(self, request):
+        response_data = {
+            "success": True,
+            "message": "Unread count fetched successfully",
+            "data": {"unread": unread_count(request.user)},
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class NotificationsMarkRead(APIView):
+    """
+    Mark the given notifications, or all of them, as read.
+    """
+
+    serializer_class = NotificationReadSerializer
+    permission_classes = (IsAuthenticated,)
+    # Savepoints included: both updates run in an atomic block
+    query_budgets = {"POST": 5}
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        marked = mark_read(request.user, serializer.validated_data.get("ids"))
+
+        response_data = {
+            "success": True,
+            "message": "Notifications marked as read",
+            "data": {"marked": marked, "unread": unread_count(request.user)},
+        }
+        return Response(response_data, status=status.HTTP_200_OK)